@@ -1,5 +1,14 @@
 from django.contrib import admin
-from .models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from .models import (
+    CollectionAgency,
+    Client,
+    Consumer,
+    Account,
+    AccountConsumer,
+    ImportCheckpoint,
+    ImportUpload,
+)
+from .validation import SSN_PATTERN
 
 
 @admin.register(CollectionAgency)
@@ -24,7 +33,13 @@ class ConsumerAdmin(admin.ModelAdmin):
     """Admin configuration for Consumer model."""
 
     list_display = ("name", "ssn", "created_at")
-    search_fields = ("name", "ssn")
+    search_fields = ("name",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Encrypted SSNs can only be matched exactly, through their blind index
+        if SSN_PATTERN.fullmatch(search_term.strip()):
+            return queryset.with_ssn(search_term.strip()), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 class AccountConsumerInline(admin.TabularInline):
@@ -42,3 +57,22 @@ class AccountAdmin(admin.ModelAdmin):
     list_filter = ("status", "client")
     search_fields = ("client_reference_no",)
     inlines = [AccountConsumerInline]
+
+
+@admin.register(ImportCheckpoint)
+class ImportCheckpointAdmin(admin.ModelAdmin):
+    """Admin configuration for ImportCheckpoint model."""
+
+    list_display = ("file_name", "client", "status", "rows_committed", "updated_at")
+    list_filter = ("status", "client")
+    readonly_fields = ("headers", "rows_committed", "byte_offset", "stats")
+
+
+@admin.register(ImportUpload)
+class ImportUploadAdmin(admin.ModelAdmin):
+    """Admin configuration for ImportUpload model."""
+
+    list_display = ("file_name", "client", "size", "created_at")
+    list_filter = ("client",)
+    search_fields = ("file_name", "sha256")
+    readonly_fields = ("sha256", "stats", "import_job")
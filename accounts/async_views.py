@@ -0,0 +1,147 @@
+from typing import Any, Dict, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse, HttpResponseNotModified
+from django.views.decorators.http import require_safe
+from django_filters.utils import translate_validation
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .caching import AccountListCache, etag_matches, make_etag
+from .models import Account
+from .pagination import AccountCursorPagination
+from .serializers import account_values_serializer
+from .views import AccountFilter, parse_sparse_fields, validate_list_params
+
+# The async endpoints only render JSON
+MEDIA_TYPE = "application/json"
+
+
+def render(
+    data: Any, status_code: int = status.HTTP_200_OK, etag: Optional[str] = None
+) -> HttpResponse:
+    """
+    Return a JSON response rendered like the API's other responses.
+    """
+    response = HttpResponse(
+        JSONRenderer().render(data), content_type=MEDIA_TYPE, status=status_code
+    )
+    if etag:
+        response["ETag"] = etag
+    return response
+
+
+def render_error(exc: exceptions.APIException) -> HttpResponse:
+    """
+    Return the response the API's exception handler gives for an exception.
+    """
+    data = exc.detail
+    if not isinstance(data, (list, dict)):
+        data = {"detail": data}
+    return render(data, exc.status_code)
+
+
+def not_modified(etag: str) -> HttpResponse:
+    response = HttpResponseNotModified()
+    response["ETag"] = etag
+    return response
+
+
+@require_safe
+async def account_list(request):
+    """
+    List accounts like GET /api/accounts/, through Django's async ORM.
+
+    Takes the same filters and cursor, count, fields and expand parameters and
+    returns the same pages, cached and with ETags like the list of AccountViewSet
+    (under their own cache keys, as the pagination links differ).
+
+    NOTE: Pages are always serialized by account_values_serializer, whatever
+    ACCOUNT_LIST_FAST_SERIALIZER is set to
+    """
+    request = Request(request)
+    try:
+        fields = parse_sparse_fields(request.query_params)
+        validate_list_params(request)
+        cache = AccountListCache()
+        key = await cache.aget_key(request)
+        etag = make_etag(key, MEDIA_TYPE)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        data = await cache.aget(key) if cache.enabled else None
+        if data is None:
+            data = await list_page(request, fields)
+            if cache.enabled:
+                await cache.aset(key, data)
+    except exceptions.APIException as e:
+        return render_error(e)
+    return render(data, etag=etag)
+
+
+async def list_page(request: Request, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """
+    Return the body of a page of accounts.
+
+    Raises:
+        ValidationError: If a filter or the count mode is invalid
+    """
+    filterset = AccountFilter(request.query_params, queryset=Account.objects.all())
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+
+    paginator = AccountCursorPagination()
+    # Cursors are built from the ordering columns, so they are always loaded
+    extra = [name.lstrip("-") for name in paginator.ordering]
+    page = await paginator.apaginate_queryset(
+        account_values_serializer.get_values(filterset.qs, fields, extra=extra),
+        request,
+    )
+    return paginator.get_paginated_data(
+        await account_values_serializer.aserialize(page, fields)
+    )
+
+
+@require_safe
+async def account_detail(request, pk: str):
+    """
+    Return an account like GET /api/accounts/<pk>/, through Django's async ORM.
+
+    Takes the same fields and expand parameters and answers a matching
+    If-None-Match with 304, like the retrieve of AccountViewSet.
+    """
+    request = Request(request)
+    try:
+        fields = parse_sparse_fields(request.query_params)
+    except exceptions.APIException as e:
+        return render_error(e)
+
+    not_found = exceptions.NotFound(
+        f"No {Account._meta.object_name} matches the given query."
+    )
+    try:
+        # Every change to the account or what is shown with it bumps the
+        # generation of its client
+        version = (
+            await Account.objects.filter(pk=pk)
+            .values_list("updated_at", "client_id", "client__data_generation")
+            .afirst()
+        )
+    except (TypeError, ValueError, ValidationError):
+        return render_error(exceptions.NotFound())
+    if version is None:
+        return render_error(not_found)
+
+    etag = make_etag(request.get_full_path(), version, MEDIA_TYPE)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    try:
+        row = await account_values_serializer.get_values(
+            Account.objects.all(), fields
+        ).aget(pk=pk)
+    except Account.DoesNotExist:
+        return render_error(not_found)
+    data = await account_values_serializer.aserialize([row], fields)
+    return render(data[0], etag=etag)
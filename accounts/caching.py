@@ -0,0 +1,101 @@
+import hashlib
+from typing import Any, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+
+from .models import Client
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Return a strong ETag identifying a representation by the given parts.
+    """
+    return '"' + hashlib.sha256(repr(parts).encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Any, etag: str) -> bool:
+    """
+    Return whether a request's If-None-Match header matches an ETag.
+
+    If-None-Match uses the weak comparison, so ``W/`` prefixes are ignored.
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return "*" in etags or etag in etags or f"W/{etag}" in etags
+
+
+class AccountListCache:
+    """
+    Cache of account list responses.
+
+    Entries are keyed on the normalized query parameters (cursor included), the
+    base URL the pagination links point to and the data generation of every
+    client. Any write that bumps a generation (see models.bump_data_generation())
+    changes the key of every list, so stale pages are never served and nothing has
+    to be deleted; the old entries expire on their own.
+
+    The cache alias and timeout are the ACCOUNT_LIST_CACHE and
+    ACCOUNT_LIST_CACHE_TIMEOUT settings. A timeout of 0 disables caching.
+
+    NOTE: Reading the generations is one query over the clients table per request.
+    """
+
+    PREFIX = "accounts:list:"
+
+    def __init__(self):
+        self.cache = caches[settings.ACCOUNT_LIST_CACHE]
+        self.timeout = settings.ACCOUNT_LIST_CACHE_TIMEOUT
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.timeout)
+
+    def get_key(self, request: Any) -> str:
+        """
+        Return the cache key of a list request.
+        """
+        return self._make_key(
+            request, Client.objects.values_list("id", "data_generation")
+        )
+
+    async def aget_key(self, request: Any) -> str:
+        """
+        Like get_key(), through the async ORM.
+        """
+        generations = Client.objects.values_list("id", "data_generation")
+        return self._make_key(request, [row async for row in generations])
+
+    def _make_key(self, request: Any, generations: Iterable[Tuple[int, int]]) -> str:
+        params = sorted((key, request.GET.getlist(key)) for key in request.GET)
+        content = repr(
+            (request.build_absolute_uri(request.path), params, sorted(generations))
+        )
+        return self.PREFIX + hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached response data for a key, if any.
+        """
+        return self.cache.get(key)
+
+    def set(self, key: str, data: Any) -> None:
+        """
+        Cache response data under a key.
+        """
+        self.cache.set(key, data, self.timeout)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """
+        Like get(), without blocking the event loop.
+        """
+        return await self.cache.aget(key)
+
+    async def aset(self, key: str, data: Any) -> None:
+        """
+        Like set(), without blocking the event loop.
+        """
+        await self.cache.aset(key, data, self.timeout)
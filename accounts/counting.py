@@ -0,0 +1,184 @@
+import hashlib
+import json
+import random
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError, connections, transaction
+from django.db.models import Max, Min, QuerySet
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+# Primary keys probed to estimate a count without planner statistics
+SAMPLE_SIZE = 2000
+# Fewer matches than this in the sample are too few to extrapolate from
+MIN_SAMPLE_MATCHES = 20
+# SQLite checks the deadline of a timed count every this many VM instructions
+PROGRESS_INTERVAL = 1000
+
+CACHE_PREFIX = "accounts:count:"
+
+
+class CountTimeout(Exception):
+    """
+    Exception raised when a count does not finish within its timeout.
+    """
+
+    pass
+
+
+@contextmanager
+def statement_timeout(seconds: float, using: str = "default") -> Iterator[None]:
+    """
+    Cancel the queries run in the block once they have taken ``seconds``.
+
+    PostgreSQL uses ``statement_timeout`` for the duration of a transaction (or
+    savepoint), SQLite a progress handler that interrupts the query; other
+    databases are not limited.
+
+    Raises:
+        CountTimeout: If a query was cancelled
+    """
+    connection = connections[using]
+    try:
+        if connection.vendor == "postgresql":
+            with transaction.atomic(using=using):
+                with connection.cursor() as cursor:
+                    cursor.execute("SHOW statement_timeout")
+                    previous = cursor.fetchone()[0]
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)",
+                        [str(max(int(seconds * 1000), 1))],
+                    )
+                yield
+                # A released savepoint keeps the setting until the transaction ends
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true)", [previous]
+                    )
+        elif connection.vendor == "sqlite":
+            # No transaction: BEGIN IMMEDIATE would take the write lock
+            connection.ensure_connection()
+            deadline = time.monotonic() + seconds
+            connection.connection.set_progress_handler(
+                lambda: time.monotonic() > deadline, PROGRESS_INTERVAL
+            )
+            try:
+                yield
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        else:
+            yield
+    except OperationalError as e:
+        if _is_cancelled(e, connection.vendor):
+            raise CountTimeout(str(e))
+        raise
+
+
+def _is_cancelled(error: OperationalError, vendor: str) -> bool:
+    # Whether a query failed because statement_timeout() cancelled it
+    if vendor == "sqlite":
+        return "interrupted" in str(error)
+    if vendor == "postgresql":
+        cause = error.__cause__
+        # query_canceled, as reported by psycopg 2 and 3
+        code = getattr(cause, "pgcode", None) or getattr(cause, "sqlstate", None)
+        return code == "57014"
+    return False
+
+
+def exact_count(queryset: QuerySet, timeout: Optional[float] = None) -> int:
+    """
+    Return ``queryset.count()``, giving up after ``timeout`` seconds if set.
+
+    Raises:
+        CountTimeout: If the count took too long
+    """
+    if not timeout:
+        return queryset.count()
+    with statement_timeout(timeout, queryset.db):
+        return queryset.count()
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Return an estimate of ``queryset.count()`` that is much cheaper to compute.
+
+    On PostgreSQL this is the planner's row estimate for the query. Elsewhere a
+    random sample of primary keys between the lowest and the highest is probed
+    with the query's filters and the matches extrapolated to the whole key range;
+    filters that match too few of the sampled keys are counted exactly (within the
+    count timeout). Sampled estimates are cached for LIST_COUNT_CACHE_TIMEOUT
+    seconds.
+    """
+    connection = connections[queryset.db]
+    queryset = queryset.order_by()
+    if connection.vendor == "postgresql":
+        return _planner_estimate(queryset)
+
+    sql, params = queryset.query.sql_with_params()
+    cache = caches[settings.ACCOUNT_LIST_CACHE]
+    key = CACHE_PREFIX + hashlib.sha256(repr((sql, params)).encode()).hexdigest()
+    estimate = cache.get(key)
+    if estimate is None:
+        estimate = _sampled_estimate(queryset)
+        cache.set(key, estimate, settings.LIST_COUNT_CACHE_TIMEOUT)
+    return estimate
+
+
+def count_queryset(queryset: QuerySet, mode: str) -> Tuple[int, bool]:
+    """
+    Count a queryset in one of the COUNT_MODES (other than "none").
+
+    Exact counts that exceed LIST_COUNT_TIMEOUT seconds are replaced with an
+    estimate.
+
+    Returns:
+        Tuple of (count, whether the count is exact)
+    """
+    if mode == COUNT_EXACT:
+        try:
+            return exact_count(queryset, settings.LIST_COUNT_TIMEOUT), True
+        except CountTimeout:
+            pass
+    return estimate_count(queryset), False
+
+
+def _planner_estimate(queryset: QuerySet) -> int:
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _sampled_estimate(queryset: QuerySet) -> int:
+    bounds = queryset.model._default_manager.using(queryset.db).aggregate(
+        low=Min("pk"), high=Max("pk")
+    )
+    if bounds["low"] is None:
+        return 0
+    span = bounds["high"] - bounds["low"] + 1
+    if span <= SAMPLE_SIZE:
+        # Small enough to count
+        return queryset.count()
+
+    sample = random.sample(range(bounds["low"], bounds["high"] + 1), SAMPLE_SIZE)
+    matches = queryset.filter(pk__in=sample).count()
+    estimate = round(span * matches / SAMPLE_SIZE)
+    if matches < MIN_SAMPLE_MATCHES:
+        # Too few matches to extrapolate; selective filters are usually cheap to
+        # count exactly
+        try:
+            return exact_count(queryset, settings.LIST_COUNT_TIMEOUT)
+        except CountTimeout:
+            pass
+    return estimate
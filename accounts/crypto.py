@@ -0,0 +1,111 @@
+import base64
+import hmac
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.crypto import salted_hmac
+
+NONCE_SIZE = 12
+
+# Blind indexes are truncated to 128 bits, which keeps them unique in practice
+# while halving the size of the index
+BLIND_INDEX_SIZE = 16
+
+
+class DecryptionError(Exception):
+    """
+    Exception raised when a value cannot be decrypted with the configured key.
+    """
+
+    pass
+
+
+@lru_cache(maxsize=None)
+def _derive_keys(
+    encryption_key: str, blind_index_key: str, secret_key: str
+) -> Tuple[AESGCM, bytes]:
+    """
+    Return the cipher and the blind index key for the given settings.
+
+    Keys that are not set are derived from SECRET_KEY.
+    """
+    if encryption_key:
+        try:
+            key = base64.urlsafe_b64decode(encryption_key)
+        except ValueError:
+            key = b""
+        if len(key) != 32:
+            raise ImproperlyConfigured(
+                "PII_ENCRYPTION_KEY must be 32 bytes encoded as URL-safe base64."
+            )
+    else:
+        key = salted_hmac(
+            "accounts.crypto.encryption", "", secret_key, algorithm="sha256"
+        ).digest()
+
+    if blind_index_key:
+        index_key = blind_index_key.encode()
+    else:
+        index_key = salted_hmac(
+            "accounts.crypto.blind_index", "", secret_key, algorithm="sha256"
+        ).digest()
+    return AESGCM(key), index_key
+
+
+def _keys() -> Tuple[AESGCM, bytes]:
+    return _derive_keys(
+        settings.PII_ENCRYPTION_KEY, settings.PII_BLIND_INDEX_KEY, settings.SECRET_KEY
+    )
+
+
+def encrypt(value: str) -> str:
+    """
+    Encrypt a string with AES-GCM and a random nonce.
+
+    The same value encrypts differently every time, so encrypted values cannot
+    be compared; use blind_index() to look values up.
+
+    Args:
+        value: Plain text
+
+    Returns:
+        URL-safe base64 of the nonce, cipher text and tag
+    """
+    cipher, _ = _keys()
+    nonce = os.urandom(NONCE_SIZE)
+    token = nonce + cipher.encrypt(nonce, value.encode(), None)
+    return base64.urlsafe_b64encode(token).decode()
+
+
+def decrypt(token: str) -> str:
+    """
+    Decrypt a string encrypted with encrypt().
+
+    Raises:
+        DecryptionError: If the token is malformed or was encrypted with another key
+    """
+    cipher, _ = _keys()
+    try:
+        data = base64.urlsafe_b64decode(token)
+        return cipher.decrypt(data[:NONCE_SIZE], data[NONCE_SIZE:], None).decode()
+    except (ValueError, InvalidTag):
+        raise DecryptionError("Value cannot be decrypted with the configured key.")
+
+
+def blind_index(value: str) -> str:
+    """
+    Return a deterministic keyed hash of a value, for equality lookups.
+
+    Args:
+        value: Plain text
+
+    Returns:
+        Hex digest of the HMAC-SHA256 of the value, truncated to 128 bits
+    """
+    _, key = _keys()
+    return hmac.digest(key, value.encode(), "sha256")[:BLIND_INDEX_SIZE].hex()
@@ -0,0 +1,75 @@
+from typing import Any, Optional
+
+from django.db import models
+
+from . import crypto
+
+
+class EncryptedCharField(models.CharField):
+    """
+    CharField stored encrypted with a random nonce (see crypto.encrypt()).
+
+    Values are plain text in Python and encrypted only in the database. Because
+    the same value encrypts differently every time, the column cannot be searched
+    or compared in SQL: only ``isnull`` lookups are supported. Pair the field with
+    a BlindIndexField to look rows up by value.
+
+    NOTE: ``max_length`` applies to the encrypted value, which is about 52
+    characters longer than the plain text (in base64).
+    TODO: Support key rotation by prefixing encrypted values with a key ID
+    """
+
+    def from_db_value(self, value: Optional[str], expression, connection) -> Any:
+        if not value:
+            return value
+        return crypto.decrypt(value)
+
+    def get_prep_value(self, value: Any) -> Any:
+        value = super().get_prep_value(value)
+        if not value:
+            return value
+        return crypto.encrypt(value)
+
+    def get_lookup(self, lookup_name: str) -> Any:
+        # Anything but isnull would compare against a freshly encrypted value
+        if lookup_name != "isnull":
+            return None
+        return super().get_lookup(lookup_name)
+
+
+class BlindIndexField(models.CharField):
+    """
+    Keyed hash of another field (see crypto.blind_index()), kept up to date on
+    save() and bulk_create().
+
+    Looking a value up is an index probe on this column with the value's blind
+    index, and a unique constraint on it makes the source field unique.
+
+    NOTE: QuerySet.update() and bulk_update() do not recompute the index; change
+    the source field with save() instead.
+    """
+
+    def __init__(self, *args, source: str = "", **kwargs):
+        """
+        Args:
+            source: Name of the field to index
+        """
+        self.source = source
+        kwargs.setdefault("max_length", 2 * crypto.BLIND_INDEX_SIZE)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self) -> Any:
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["source"] = self.source
+        if kwargs.get("max_length") == 2 * crypto.BLIND_INDEX_SIZE:
+            del kwargs["max_length"]
+        if kwargs.get("editable") is False:
+            del kwargs["editable"]
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance: models.Model, add: bool) -> Optional[str]:
+        value = getattr(model_instance, self.source)
+        index = crypto.blind_index(value) if value else None
+        setattr(model_instance, self.attname, index)
+        return index
@@ -0,0 +1,258 @@
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, List, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import ImportCheckpoint, ImportJob
+from .services import CSVImportService, CSVImportError, CSVValidationError
+from .uploads import register_upload
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide pool that runs import jobs, creating it on first use.
+
+    NOTE: The pool lives inside the web process, so no external broker is needed.
+    Every worker thread gets its own database connection.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMPORT_JOB_WORKERS,
+                thread_name_prefix="import-job",
+            )
+        return _executor
+
+
+def spool_upload(uploaded_file: Any) -> str:
+    """
+    Copy an uploaded file to the spool directory, chunk by chunk.
+
+    Args:
+        uploaded_file: Django UploadedFile to copy
+
+    Returns:
+        Path of the spooled file
+    """
+    os.makedirs(settings.IMPORT_SPOOL_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=settings.IMPORT_SPOOL_DIR, suffix=".csv", delete=False
+    ) as spooled:
+        for chunk in uploaded_file.chunks():
+            spooled.write(chunk)
+    return spooled.name
+
+
+def create_import_job(
+    uploaded_file: Any,
+    collection_agency_id: int,
+    client_id: int,
+    file_sha256: str = "",
+) -> ImportJob:
+    """
+    Spool an upload to disk and queue it for import in the background.
+
+    Args:
+        uploaded_file: Django UploadedFile to import
+        collection_agency_id: ID of the collection agency
+        client_id: ID of the client
+        file_sha256: SHA-256 of the file, to register it once the import succeeds
+
+    Returns:
+        The pending import job
+
+    Raises:
+        CSVImportError: If the collection agency or client is invalid
+    """
+    # Fail fast on bad IDs instead of queuing a job that can never succeed
+    CSVImportService(collection_agency_id, client_id)
+
+    job = ImportJob.objects.create(
+        collection_agency_id=collection_agency_id,
+        client_id=client_id,
+        file_name=getattr(uploaded_file, "name", None) or "",
+        file_path=spool_upload(uploaded_file),
+        file_sha256=file_sha256,
+    )
+    enqueue_import_job(job)
+    return job
+
+
+def enqueue_import_job(job: ImportJob) -> None:
+    """
+    Submit a job to the worker pool once the current transaction commits.
+    """
+    transaction.on_commit(lambda: get_executor().submit(_run_in_worker, job.id))
+
+
+def _run_in_worker(job_id: int) -> None:
+    """
+    Run a job on a worker thread and release the thread's database connections.
+    """
+    try:
+        run_import_job(job_id)
+    except Exception:
+        logger.exception("Import job %s crashed", job_id)
+    finally:
+        connections.close_all()
+
+
+def run_import_job(job_id: int) -> ImportJob:
+    """
+    Import the spooled file of a job, recording progress and the final result.
+
+    Args:
+        job_id: ID of the job to run
+
+    Returns:
+        The finished job, or the job as it is if it was no longer pending (taken
+        by another worker, or already finished)
+    """
+    # Claimed with a conditional update, so a job queued twice (see
+    # find_stale_jobs()) only runs once
+    now = timezone.now()
+    claimed = ImportJob.objects.filter(
+        id=job_id, status=ImportJob.STATUS_PENDING
+    ).update(status=ImportJob.STATUS_RUNNING, started_at=now, updated_at=now)
+    job = ImportJob.objects.get(id=job_id)
+    if not claimed:
+        return job
+
+    def report_progress(rows_parsed: int, rows_written: int) -> None:
+        # updated_at doubles as a heartbeat for find_stale_jobs()
+        ImportJob.objects.filter(id=job.id).update(
+            rows_parsed=rows_parsed,
+            rows_written=rows_written,
+            updated_at=timezone.now(),
+        )
+
+    service = None
+    try:
+        service = CSVImportService(job.collection_agency_id, job.client_id)
+        with open(job.file_path, "rb") as csv_file:
+            checkpoint = _get_checkpoint(job, service, csv_file)
+            if checkpoint and checkpoint.status == ImportCheckpoint.STATUS_COMPLETED:
+                # The process stopped after the import but before the job was saved
+                service.checkpoint = checkpoint
+                service.rows_parsed = service.rows_written = checkpoint.rows_committed
+                stats = checkpoint.stats
+            else:
+                stats = service.import_csv(
+                    csv_file, checkpoint=checkpoint, progress=report_progress
+                )
+    except CSVValidationError as e:
+        job.status = ImportJob.STATUS_FAILED
+        # Keep the full report; the first line is the usual error message
+        job.error = "\n".join([str(e)] + [str(error) for error in e.errors])
+    except CSVImportError as e:
+        job.status = ImportJob.STATUS_FAILED
+        job.error = str(e)
+    except Exception as e:
+        job.status = ImportJob.STATUS_FAILED
+        job.error = f"Unexpected error: {str(e)}"
+    else:
+        job.status = ImportJob.STATUS_SUCCEEDED
+        job.stats = stats
+        if job.file_sha256:
+            register_upload(
+                job.client_id,
+                job.file_sha256,
+                stats,
+                file_name=job.file_name,
+                size=os.path.getsize(job.file_path),
+                import_job=job,
+            )
+    # Only a job interrupted with its process is resumed (see find_stale_jobs());
+    # nothing runs a failed job again, so its file is removed too
+    remove_spooled_file(job)
+
+    if service is not None:
+        job.checkpoint = service.checkpoint or job.checkpoint
+        job.rows_parsed = service.rows_parsed
+        if job.status == ImportJob.STATUS_SUCCEEDED:
+            job.rows_written = service.rows_written
+        else:
+            # Only rows in committed chunks survive a failure
+            job.rows_written = (
+                service.checkpoint.rows_committed if service.checkpoint else 0
+            )
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def _get_checkpoint(
+    job: ImportJob, service: CSVImportService, csv_file: Any
+) -> Optional[ImportCheckpoint]:
+    """
+    Return the checkpoint of a job, creating and saving it on a first run.
+
+    The checkpoint is stored on the job before any chunk is committed, so a run
+    interrupted with its process is resumed after the last committed chunk.
+    Columnar files are imported in a single transaction and get no checkpoint.
+    """
+    if job.checkpoint_id is not None:
+        return job.checkpoint
+    if service.is_columnar(csv_file):
+        return None
+    job.checkpoint = ImportCheckpoint.objects.create(
+        client_id=job.client_id,
+        file_name=job.file_name,
+        commit_every=settings.IMPORT_JOB_COMMIT_EVERY,
+    )
+    ImportJob.objects.filter(id=job.id).update(checkpoint=job.checkpoint)
+    return job.checkpoint
+
+
+def remove_spooled_file(job: ImportJob) -> None:
+    """
+    Remove the spooled file of a finished job, if it is still there.
+    """
+    try:
+        os.remove(job.file_path)
+    except FileNotFoundError:
+        pass
+
+
+def find_stale_jobs(stale_after: timedelta) -> List[ImportJob]:
+    """
+    Return the jobs left behind by a web process that stopped, ready to run again.
+
+    The worker pool lives in the web process, so a restart loses the jobs it had
+    queued and the ones it was running. Pending jobs created more than
+    ``stale_after`` ago and running jobs that have not reported progress for that
+    long are treated as lost. Running ones are reset to pending; run_import_job()
+    then resumes their spooled file after the last chunk the interrupted run
+    committed.
+
+    NOTE: A job that is still queued in a live process is not run twice: whichever
+    worker claims it first runs it.
+
+    Args:
+        stale_after: How long a job may go without progress
+
+    Returns:
+        The lost jobs, oldest first, all pending
+    """
+    cutoff = timezone.now() - stale_after
+    ImportJob.objects.filter(
+        status=ImportJob.STATUS_RUNNING, updated_at__lt=cutoff
+    ).update(status=ImportJob.STATUS_PENDING, started_at=None)
+    return list(
+        ImportJob.objects.filter(
+            status=ImportJob.STATUS_PENDING, updated_at__lt=cutoff
+        ).order_by("created_at")
+    )
@@ -0,0 +1,181 @@
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import ImportLock
+
+# First key of the PostgreSQL advisory locks taken by imports; the second one is
+# the client ID
+ADVISORY_LOCK_NAMESPACE = 0x61637473
+
+
+class ImportLockTimeout(Exception):
+    """
+    Exception raised when the import lock of a client cannot be acquired in time.
+    """
+
+    pass
+
+
+class ClientImportLock:
+    """
+    Lock that serializes the imports of one client.
+
+    On PostgreSQL it is a session-level advisory lock, which is released when the
+    connection closes even if the process dies. Elsewhere (SQLite) it is a row in
+    the ImportLock table, inserted and deleted in autocommit mode so other
+    connections see it right away.
+
+    Imports of different clients take different locks and do not wait for each
+    other.
+
+    NOTE: Advisory locks belong to the database session, so they do not work
+    through a pooler in transaction mode (e.g. PgBouncer).
+    NOTE: Client IDs above 2**31 share advisory locks with lower IDs, which only
+    serializes those clients' imports.
+    """
+
+    # Seconds between attempts while the lock is held by another import
+    POLL_INTERVAL = 0.05
+    MAX_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        client_id: int,
+        timeout: Optional[float] = None,
+        using: str = "default",
+    ):
+        """
+        Args:
+            client_id: ID of the client
+            timeout: Seconds to wait for the lock (defaults to IMPORT_LOCK_TIMEOUT)
+            using: Database alias
+        """
+        self.client_id = client_id
+        self.timeout = settings.IMPORT_LOCK_TIMEOUT if timeout is None else timeout
+        self.using = using
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def acquire(self) -> None:
+        """
+        Wait for the lock.
+
+        Raises:
+            ImportLockTimeout: If another import still holds the lock after
+                ``timeout`` seconds
+        """
+        deadline = time.monotonic() + self.timeout
+        interval = self.POLL_INTERVAL
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                raise ImportLockTimeout(
+                    f"Another import for client {self.client_id} is in progress."
+                )
+            time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+            interval = min(interval * 2, self.MAX_POLL_INTERVAL)
+
+    def try_acquire(self) -> bool:
+        """
+        Take the lock if it is free.
+
+        Returns:
+            Whether the lock was taken
+        """
+        if self.connection.vendor == "postgresql":
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_try_advisory_lock(%s, %s)",
+                    [ADVISORY_LOCK_NAMESPACE, self.client_id % 2**31],
+                )
+                return cursor.fetchone()[0]
+
+        # Locks left behind by an import that crashed are taken over
+        ImportLock.objects.using(self.using).filter(
+            client_id=self.client_id,
+            acquired_at__lt=timezone.now()
+            - timedelta(seconds=settings.IMPORT_LOCK_MAX_AGE),
+        ).delete()
+        try:
+            with transaction.atomic(using=self.using):
+                ImportLock.objects.using(self.using).create(
+                    client_id=self.client_id, owner=self.owner
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    def release(self) -> None:
+        """
+        Release the lock.
+        """
+        if self.connection.vendor == "postgresql":
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_unlock(%s, %s)",
+                    [ADVISORY_LOCK_NAMESPACE, self.client_id % 2**31],
+                )
+        else:
+            ImportLock.objects.using(self.using).filter(
+                client_id=self.client_id, owner=self.owner
+            ).delete()
+
+
+@contextmanager
+def write_transaction(using: str = "default") -> Iterator[None]:
+    """
+    Run the block in ``transaction.atomic``, taking the database's write lock when
+    the transaction begins.
+
+    SQLite transactions are deferred: one that reads before it writes cannot take
+    the write lock while another connection holds it, and fails with "database is
+    locked" instead of waiting for the busy timeout. Transactions that write after
+    looking rows up (imports, rollup rebuilds) therefore begin in IMMEDIATE mode
+    on SQLite. Other databases lock rows as they go, so this is plain
+    ``transaction.atomic`` there, as it is inside an existing transaction.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # The transaction mode is read from the settings on every connect
+    connection.ensure_connection()
+    mode = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+@contextmanager
+def client_import_lock(
+    client_id: int, timeout: Optional[float] = None, using: str = "default"
+) -> Iterator[ClientImportLock]:
+    """
+    Hold the import lock of a client for the duration of the block.
+
+    Raises:
+        ImportLockTimeout: If the lock cannot be acquired in time
+    """
+    lock = ClientImportLock(client_id, timeout, using)
+    lock.acquire()
+    try:
+        yield lock
+    finally:
+        lock.release()
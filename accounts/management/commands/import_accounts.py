@@ -0,0 +1,227 @@
+import glob
+import os
+import time
+from functools import partial
+from contextlib import nullcontext
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.locks import ImportLockTimeout, client_import_lock
+from accounts.columnar import detect_columnar_format
+from accounts.services import (
+    COMPRESSION_HEADER_SIZE,
+    CSVImportError,
+    CSVImportService,
+    detect_compression,
+)
+
+
+class ProgressMeter:
+    """
+    Prints the number of rows imported and the rows/sec, at most every
+    ``interval`` seconds.
+    """
+
+    def __init__(self, out: Any, interval: float = 0.5):
+        self.out = out
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_report = 0.0
+        self.rows_done = 0
+        self.rows_by_file: Dict[str, int] = {}
+
+    @property
+    def rows(self) -> int:
+        return self.rows_done + sum(self.rows_by_file.values())
+
+    def rows_per_sec(self) -> float:
+        return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+    def update(self, path: str, rows_written: int) -> None:
+        self.rows_by_file[path] = rows_written
+        now = time.perf_counter()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.out.write(
+                f"{self.rows:,} rows, {self.rows_per_sec():,.0f} rows/sec",
+                ending="\r",
+            )
+            self.out.flush()
+
+    def finish_file(self, path: str, rows_written: int) -> None:
+        self.rows_by_file.pop(path, None)
+        self.rows_done += rows_written
+
+
+class Command(BaseCommand):
+    help = (
+        "Import accounts for a client from local CSV, Parquet or Arrow files, "
+        "with the same validation as the upload endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="+", help="Files or glob patterns (** is supported)"
+        )
+        parser.add_argument(
+            "--agency", type=int, required=True, help="ID of the collection agency"
+        )
+        parser.add_argument(
+            "--client", type=int, required=True, help="ID of the client"
+        )
+        parser.add_argument(
+            "--commit-every",
+            type=int,
+            help="Commit every N rows of a CSV file instead of once per file",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what the import would change without writing anything",
+        )
+        parser.add_argument(
+            "--parse-workers",
+            type=int,
+            help="Parse and validate each uncompressed CSV file on N processes "
+            "before writing it in one transaction (other files are imported as "
+            "usual)",
+        )
+        parser.add_argument(
+            "--staged",
+            action="store_true",
+            help="Load each file into a temporary staging table and merge it with "
+            "set-based statements, the fastest way to import very large files",
+        )
+
+    def handle(self, *args, **options):
+        paths = self.expand_paths(options["paths"])
+        if options["parse_workers"] is not None and options["parse_workers"] < 1:
+            raise CommandError("--parse-workers must be at least 1.")
+        # Each of these picks another way to write the files
+        chosen = [
+            option
+            for option in ("commit_every", "dry_run", "parse_workers", "staged")
+            if options[option]
+        ]
+        if len(chosen) > 1:
+            raise CommandError(
+                " and ".join(f"--{option.replace('_', '-')}" for option in chosen)
+                + " cannot be combined."
+            )
+
+        try:
+            # Fail early on an unknown agency or client
+            CSVImportService(options["agency"], options["client"])
+        except CSVImportError as e:
+            raise CommandError(str(e))
+
+        meter = ProgressMeter(self.stdout)
+        import_file = partial(self.import_file, options=options, meter=meter)
+        # Files are imported one after another, in the order given, under one hold
+        # of the client's lock, so a later file overrides an earlier one
+        lock = (
+            nullcontext()
+            if options["dry_run"]
+            else client_import_lock(options["client"])
+        )
+        try:
+            with lock:
+                results = list(map(import_file, paths))
+        except ImportLockTimeout as e:
+            raise CommandError(str(e))
+
+        failed = 0
+        for path, (stats, error) in zip(paths, results):
+            if error:
+                failed += 1
+                self.stderr.write(f"{path}: {error}")
+            else:
+                # Dry runs also return a sample of the changes, which is left out
+                summary = ", ".join(
+                    f"{key}={value}"
+                    for key, value in stats.items()
+                    if isinstance(value, int) and not isinstance(value, bool)
+                )
+                self.stdout.write(f"{path}: {summary}")
+
+        elapsed = time.perf_counter() - meter.started
+        verb = "Checked" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            f"{verb} {meter.rows:,} rows from {len(paths) - failed} of "
+            f"{len(paths)} files in {elapsed:.1f}s "
+            f"({meter.rows_per_sec():,.0f} rows/sec)"
+        )
+        if failed:
+            raise CommandError(f"{failed} of {len(paths)} files failed to import.")
+
+    def expand_paths(self, patterns: List[str]) -> List[str]:
+        """
+        Expand glob patterns into a list of files, without duplicates.
+        """
+        paths: List[str] = []
+        for pattern in patterns:
+            if glob.has_magic(pattern):
+                matches = sorted(
+                    path
+                    for path in glob.glob(pattern, recursive=True)
+                    if os.path.isfile(path)
+                )
+                if not matches:
+                    raise CommandError(f"No files match '{pattern}'.")
+            elif os.path.isfile(pattern):
+                matches = [pattern]
+            else:
+                raise CommandError(f"File '{pattern}' does not exist.")
+            paths.extend(path for path in matches if path not in paths)
+        return paths
+
+    def import_file(
+        self, path: str, options: Dict[str, Any], meter: ProgressMeter
+    ) -> tuple:
+        """
+        Import one file.
+
+        Returns:
+            Tuple of (statistics, error message or None)
+        """
+        service = CSVImportService(
+            options["agency"], options["client"], lock_client=False
+        )
+
+        def progress(rows_parsed: int, rows_written: int) -> None:
+            meter.update(path, rows_written)
+
+        try:
+            if options["parse_workers"] and self.can_partition(path):
+                stats = service.import_csv_parallel(
+                    path, options["parse_workers"], progress=progress
+                )
+            elif options["staged"]:
+                with open(path, "rb") as file_obj:
+                    stats = service.import_csv_staged(file_obj, progress=progress)
+            else:
+                with open(path, "rb") as file_obj:
+                    stats = service.import_csv(
+                        file_obj,
+                        commit_every=options["commit_every"],
+                        progress=progress,
+                        dry_run=options["dry_run"],
+                    )
+            meter.finish_file(path, service.rows_written)
+            return stats, None
+        except CSVImportError as e:
+            # Only committed chunks of a failed file count as imported
+            checkpoint = service.checkpoint
+            meter.finish_file(path, checkpoint.rows_committed if checkpoint else 0)
+            return None, str(e)
+
+    @staticmethod
+    def can_partition(path: str) -> bool:
+        """
+        Return whether a file is a plain CSV file, which can be split at byte
+        offsets and parsed in parallel.
+        """
+        with open(path, "rb") as file_obj:
+            head = file_obj.read(COMPRESSION_HEADER_SIZE)
+        return not detect_compression(head) and detect_columnar_format(head) is None
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from typing import Dict, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+
+from accounts.locks import ImportLockTimeout, client_import_lock, write_transaction
+from accounts.models import Account, BalanceRollup, Client
+
+# Rollup values that are equal to an absent rollup
+EMPTY = (0, Decimal("0.00"))
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the balance rollups of every client from its accounts, or check "
+        "them with --verify."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--client",
+            type=int,
+            action="append",
+            help="ID of a client to rebuild (may be repeated; defaults to all)",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report rollups that do not match the accounts; exits with "
+            "an error if any",
+        )
+
+    def handle(self, *args, **options):
+        clients = Client.objects.order_by("id")
+        if options["client"]:
+            clients = clients.filter(id__in=options["client"])
+            missing = set(options["client"]) - set(clients.values_list("id", flat=True))
+            if missing:
+                raise CommandError(
+                    f"Client {', '.join(map(str, sorted(missing)))} does not exist."
+                )
+
+        mismatched = 0
+        client_ids = list(clients.values_list("id", flat=True))
+        for client_id in client_ids:
+            try:
+                # Imports of the client wait for the rebuild. Imports of other
+                # clients can still move its accounts; see rebuild_client()
+                with client_import_lock(client_id):
+                    mismatched += self.rebuild_client(client_id, options["verify"])
+            except ImportLockTimeout as e:
+                raise CommandError(str(e))
+
+        if options["verify"]:
+            if mismatched:
+                raise CommandError(
+                    f"{mismatched} rollups do not match the accounts; run "
+                    "rebuild_rollups to fix them."
+                )
+            self.stdout.write(f"Rollups of {len(client_ids)} clients are correct.")
+        else:
+            self.stdout.write(
+                f"Rebuilt the rollups of {len(client_ids)} clients "
+                f"({mismatched} were wrong)."
+            )
+
+    @write_transaction()
+    def rebuild_client(self, client_id: int, verify: bool) -> int:
+        """
+        Compare the rollups of a client with its accounts, and fix them unless only
+        verifying.
+
+        Returns:
+            Number of rollups that did not match
+        """
+        # Every write that moves an account into or out of the client (a save, or
+        # an import of another client taking over a reference) updates one of its
+        # rollups in the same transaction. Locking a rollup of every status for the
+        # whole rebuild makes such writes either wait for the rebuild or be counted
+        # by it. On SQLite the rebuild holds the database's write lock instead.
+        BalanceRollup.objects.bulk_create(
+            [
+                BalanceRollup(client_id=client_id, status=status)
+                for status, _ in Account.STATUS_CHOICES
+            ],
+            ignore_conflicts=True,
+        )
+        stored: Dict[str, Tuple[int, Decimal]] = {
+            rollup.status: (rollup.account_count, rollup.total_balance)
+            for rollup in BalanceRollup.objects.select_for_update()
+            .filter(client_id=client_id)
+            .order_by("status")
+        }
+        actual: Dict[str, Tuple[int, Decimal]] = {
+            row["status"]: (
+                row["account_count"],
+                Decimal(row["total_balance"]).quantize(Decimal("0.01")),
+            )
+            for row in Account.objects.filter(client_id=client_id)
+            .order_by()
+            .values("status")
+            .annotate(account_count=Count("id"), total_balance=Sum("balance"))
+        }
+
+        mismatched = 0
+        for status in sorted(stored.keys() | actual.keys()):
+            have = stored.get(status, EMPTY)
+            want = actual.get(status, EMPTY)
+            if have == want:
+                continue
+            mismatched += 1
+            self.stdout.write(
+                f"Client {client_id} {status}: rollup has {have[0]} accounts "
+                f"totalling {have[1]:.2f}, accounts have {want[0]} totalling "
+                f"{want[1]:.2f}"
+            )
+            if not verify:
+                BalanceRollup.objects.update_or_create(
+                    client_id=client_id,
+                    status=status,
+                    defaults={"account_count": want[0], "total_balance": want[1]},
+                )
+        return mismatched
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.jobs import find_stale_jobs, remove_spooled_file, run_import_job
+from accounts.models import ImportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the background import jobs lost when a web process stopped: pending "
+        "jobs that were never picked up and running jobs that stopped reporting "
+        "progress. Run it after restarting the web processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-after",
+            type=float,
+            default=settings.IMPORT_JOB_STALE_AFTER,
+            help="Seconds a job may go without progress before it is considered "
+            "lost (defaults to IMPORT_JOB_STALE_AFTER)",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            help="Mark the lost jobs as failed instead of running them",
+        )
+
+    def handle(self, *args, **options):
+        jobs = find_stale_jobs(timedelta(seconds=options["stale_after"]))
+        if not jobs:
+            self.stdout.write("No lost import jobs.")
+            return
+
+        failed = 0
+        for job in jobs:
+            if options["fail"]:
+                # Unless a live worker has claimed it meanwhile
+                now = timezone.now()
+                ImportJob.objects.filter(
+                    id=job.id, status=ImportJob.STATUS_PENDING
+                ).update(
+                    status=ImportJob.STATUS_FAILED,
+                    error="Interrupted: the process running the import stopped.",
+                    finished_at=now,
+                    updated_at=now,
+                )
+                job.refresh_from_db()
+                if job.status == ImportJob.STATUS_FAILED:
+                    remove_spooled_file(job)
+            else:
+                job = run_import_job(job.id)
+            failed += job.status == ImportJob.STATUS_FAILED
+            # Validation reports list every error; the first line sums them up
+            error = job.error.splitlines()[0] if job.error else ""
+            self.stdout.write(f"{job}{': ' + error if error else ''}")
+
+        self.stdout.write(f"Recovered {len(jobs)} import jobs ({failed} failed).")
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-17 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0003_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.1.7 on 2026-10-17 02:05
+
+from django.db import migrations
+
+import accounts.fields
+from accounts.crypto import blind_index, decrypt, encrypt
+
+BATCH_SIZE = 1000
+
+
+def encrypt_ssns(apps, schema_editor):
+    """
+    Encrypt the SSNs, fill in their blind index and merge consumers sharing an SSN.
+    """
+    connection = schema_editor.connection
+    table = connection.ops.quote_name("accounts_consumer")
+    with connection.cursor() as cursor:
+        # Read raw values: the model field would try to decrypt the plain text
+        cursor.execute(f"SELECT id, ssn FROM {table} ORDER BY id")
+        consumers = cursor.fetchall()
+
+    ids_by_index = {}
+    for start in range(0, len(consumers), BATCH_SIZE):
+        batch = []
+        for consumer_id, ssn in consumers[start : start + BATCH_SIZE]:
+            index = blind_index(ssn)
+            ids_by_index.setdefault(index, []).append(consumer_id)
+            batch.append((encrypt(ssn), index, consumer_id))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {table} SET ssn = %s, ssn_index = %s WHERE id = %s", batch
+            )
+
+    # Imports linked accounts to the oldest consumer with an SSN; keep that one
+    Consumer = apps.get_model("accounts", "Consumer")
+    AccountConsumer = apps.get_model("accounts", "AccountConsumer")
+    for ids in ids_by_index.values():
+        if len(ids) == 1:
+            continue
+        keep, duplicates = ids[0], ids[1:]
+        linked = set(
+            AccountConsumer.objects.filter(consumer_id=keep).values_list(
+                "account_id", flat=True
+            )
+        )
+        for link in AccountConsumer.objects.filter(consumer_id__in=duplicates):
+            if link.account_id in linked:
+                link.delete()
+            else:
+                link.consumer_id = keep
+                link.save(update_fields=["consumer"])
+                linked.add(link.account_id)
+        Consumer.objects.filter(id__in=duplicates).delete()
+
+    if connection.vendor == "postgresql":
+        # Check deferred foreign keys now; PostgreSQL cannot alter a table with
+        # pending trigger events in the same transaction
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def decrypt_ssns(apps, schema_editor):
+    """
+    Store the SSNs in plain text again.
+    """
+    connection = schema_editor.connection
+    table = connection.ops.quote_name("accounts_consumer")
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT id, ssn FROM {table}")
+        consumers = cursor.fetchall()
+    for start in range(0, len(consumers), BATCH_SIZE):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"UPDATE {table} SET ssn = %s WHERE id = %s",
+                [
+                    (decrypt(ssn), consumer_id)
+                    for consumer_id, ssn in consumers[start : start + BATCH_SIZE]
+                ],
+            )
+
+
+def clear_fingerprints(apps, schema_editor):
+    # Fingerprints now cover SSN blind indexes instead of SSNs
+    Account = apps.get_model("accounts", "Account")
+    Account.objects.update(fingerprint="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_importupload"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="consumer",
+            name="accounts_co_ssn_54d65f_idx",
+        ),
+        migrations.AddField(
+            model_name="consumer",
+            name="ssn_index",
+            field=accounts.fields.BlindIndexField(null=True, source="ssn"),
+        ),
+        migrations.AlterField(
+            model_name="consumer",
+            name="ssn",
+            field=accounts.fields.EncryptedCharField(max_length=255),
+        ),
+        migrations.RunPython(encrypt_ssns, decrypt_ssns),
+        migrations.AlterField(
+            model_name="consumer",
+            name="ssn_index",
+            field=accounts.fields.BlindIndexField(source="ssn", unique=True),
+        ),
+        migrations.RunPython(clear_fingerprints, clear_fingerprints),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-17 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_consumer_ssn_encryption"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportLock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("owner", models.CharField(max_length=255)),
+                ("acquired_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "client",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="import_lock",
+                        to="accounts.client",
+                    ),
+                ),
+            ],
+        ),
+    ]
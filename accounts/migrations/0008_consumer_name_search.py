@@ -0,0 +1,68 @@
+# Generated by Django 5.1.7 on 2026-10-17 03:10
+
+from django.db import migrations
+
+SEARCH_TABLE = "accounts_consumer_name_fts"
+
+# icontains compiles to UPPER("name"::text) LIKE UPPER(...) on PostgreSQL; the
+# index is on the same expression so the planner can use it
+POSTGRESQL_FORWARDS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX accounts_consumer_name_trgm ON accounts_consumer "
+    "USING gin ((UPPER(name::text)) gin_trgm_ops)",
+]
+POSTGRESQL_BACKWARDS = ["DROP INDEX IF EXISTS accounts_consumer_name_trgm"]
+
+# External content table over accounts_consumer, so names are not stored twice;
+# the triggers keep it in sync with every write, including the imports' bulk
+# inserts and the staging merge
+SQLITE_FORWARDS = [
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    "name, content='accounts_consumer', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {SEARCH_TABLE}_insert AFTER INSERT ON accounts_consumer BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_delete AFTER DELETE ON accounts_consumer BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_update AFTER UPDATE OF name ON accounts_consumer "
+    f"BEGIN INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name) VALUES (new.id, new.name); END",
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+
+def _run(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _run(
+        schema_editor,
+        {"postgresql": POSTGRESQL_FORWARDS, "sqlite": SQLITE_FORWARDS},
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    _run(
+        schema_editor,
+        {"postgresql": POSTGRESQL_BACKWARDS, "sqlite": SQLITE_BACKWARDS},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_importlock"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-17 03:40
+
+import accounts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_consumer_name_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="client",
+            name="data_generation",
+            field=models.PositiveBigIntegerField(
+                default=accounts.models.new_data_generation, editable=False
+            ),
+        ),
+    ]
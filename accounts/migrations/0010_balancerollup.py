@@ -0,0 +1,77 @@
+# Generated by Django 5.1.7 on 2026-10-17 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_rollups(apps, schema_editor):
+    """
+    Roll up the existing accounts.
+    """
+    Account = apps.get_model("accounts", "Account")
+    BalanceRollup = apps.get_model("accounts", "BalanceRollup")
+    BalanceRollup.objects.bulk_create(
+        BalanceRollup(
+            client_id=row["client_id"],
+            status=row["status"],
+            account_count=row["account_count"],
+            total_balance=row["total_balance"],
+        )
+        for row in Account.objects.order_by()
+        .values("client_id", "status")
+        .annotate(account_count=Count("id"), total_balance=Sum("balance"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_client_data_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("IN_COLLECTION", "In Collection"),
+                            ("PAID_IN_FULL", "Paid in Full"),
+                            ("INACTIVE", "Inactive"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("account_count", models.BigIntegerField(default=0)),
+                (
+                    "total_balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=20),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "client",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_rollups",
+                        to="accounts.client",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("client", "status")},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
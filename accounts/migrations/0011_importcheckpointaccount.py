@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-17 02:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_balancerollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportCheckpointAccount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("client_reference_no", models.CharField(max_length=255)),
+                ("unchanged", models.BooleanField(default=False)),
+                (
+                    "checkpoint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="accounts",
+                        to="accounts.importcheckpoint",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("checkpoint", "client_reference_no")},
+            },
+        ),
+    ]
@@ -1,14 +1,74 @@
-from django.db import models
+import hashlib
+import secrets
+from decimal import Decimal
+from django.db import connections, models, transaction
+from django.db.models import F
+from django.db.models.expressions import RawSQL
 from django.core.validators import MinValueValidator
-from typing import List, Optional, Dict, Any
+from django.utils import timezone
+from typing import Iterable, List, Optional, Dict, Any, Tuple
+
+from .crypto import blind_index
+from .fields import BlindIndexField, EncryptedCharField
+
+# FTS5 trigram index of consumer names on SQLite (see migration 0008)
+CONSUMER_NAME_SEARCH_TABLE = "accounts_consumer_name_fts"
+
+
+def compute_account_fingerprint(
+    balance: Any, status: str, ssn_indexes: Iterable[str]
+) -> str:
+    """
+    Return a hash of the balance, status and consumers of an account.
+
+    Args:
+        balance: Account balance (rounded to cents, as stored)
+        status: Account status
+        ssn_indexes: SSN blind indexes of the consumers linked to the account, in
+            any order
+
+    Returns:
+        32-character hex digest
+    """
+    content = "|".join(
+        [
+            str(Decimal(balance).quantize(Decimal("0.01"))),
+            status,
+            *sorted(set(ssn_indexes)),
+        ]
+    )
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+def new_data_generation() -> int:
+    """
+    Return the initial data generation of a client.
+
+    Generations start at a random value, so a client that gets the ID of a deleted
+    one does not inherit its cached responses.
+    """
+    return secrets.randbits(62)
+
+
+def bump_data_generation(client_ids: Iterable[int]) -> None:
+    """
+    Record that data shown in the account lists of clients has changed, which
+    invalidates the cached lists (see accounts.caching).
+
+    Args:
+        client_ids: Client IDs, or a queryset of client IDs (used as a subquery)
+    """
+    Client.objects.filter(id__in=client_ids).update(
+        data_generation=F("data_generation") + 1
+    )
 
 
 class CollectionAgency(models.Model):
     """
     Represents a collection agency that collects debts on behalf of clients.
-    
+
     A collection agency manages debt collection on behalf of clients.
-    
+
     TODO: Add fields for agency contact information and address
     TODO: Consider adding reporting capabilities for agency performance
     """
@@ -27,6 +87,11 @@ class CollectionAgency(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        # The agency is shown with every account of its clients
+        bump_data_generation(self.clients.values("id"))
+
     def get_clients(self) -> List["Client"]:
         """
         Return all clients associated with this collection agency.
@@ -37,17 +102,23 @@ class CollectionAgency(models.Model):
 class Client(models.Model):
     """
     Represents an organization that hires a collection agency to collect debt on their behalf.
-    
+
     Clients are organizations that hire collection agencies to collect debt on their behalf.
-    
+
     TODO: Add fields for client contact information and specific requirements
     NOTE: Each client is associated with exactly one collection agency in this model
+    NOTE: ``data_generation`` changes whenever the client's accounts, or anything
+    shown with them, change. Writes through save() and delete() bump it; bulk
+    writes must call bump_data_generation().
     """
 
     name = models.CharField(max_length=255)
     collection_agency = models.ForeignKey(
         CollectionAgency, on_delete=models.CASCADE, related_name="clients"
     )
+    data_generation = models.PositiveBigIntegerField(
+        default=new_data_generation, editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -60,6 +131,18 @@ class Client(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        # The generation is only changed by bump_data_generation(), so that a stale
+        # copy of it cannot overwrite a concurrent bump
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "data_generation"
+            ]
+        super().save(*args, **kwargs)
+        bump_data_generation([self.id])
+
     def get_accounts(self) -> List["Account"]:
         """
         Return all accounts associated with this client.
@@ -67,32 +150,82 @@ class Client(models.Model):
         return self.accounts.all()
 
 
+class ConsumerQuerySet(models.QuerySet):
+    def with_ssn(self, *ssns: str) -> "ConsumerQuerySet":
+        """
+        Filter consumers by SSN, through the SSN blind index.
+        """
+        return self.filter(ssn_index__in=[blind_index(ssn) for ssn in ssns])
+
+    def name_contains(self, value: str) -> "ConsumerQuerySet":
+        """
+        Filter consumers whose name contains a value, ignoring case, through the
+        consumer name search index.
+
+        On PostgreSQL this is ``name__icontains``, which uses the pg_trgm GIN
+        index. On SQLite it is a phrase query on the FTS5 trigram table, which only
+        indexes values of at least 3 characters; shorter values scan the names.
+
+        NOTE: SQLite's LIKE only ignores the case of ASCII letters while the FTS5
+        table folds the case of any letter, as PostgreSQL does.
+        """
+        if connections[self.db].vendor != "sqlite" or len(value) < 3:
+            return self.filter(name__icontains=value)
+        # A quoted phrase matches the value as a substring, with no operators
+        phrase = '"' + value.replace('"', '""') + '"'
+        return self.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {CONSUMER_NAME_SEARCH_TABLE} "
+                f"WHERE {CONSUMER_NAME_SEARCH_TABLE} MATCH %s",
+                [phrase],
+            )
+        )
+
+
 class Consumer(models.Model):
     """
     Represents a person/entity that owes a debt.
-    
+
     Consumers can have multiple accounts (debts) across different clients.
-    
-    TODO: Implement proper encryption for PII (Personally Identifiable Information)
+
     TODO: Add more fields for contact details (email, phone)
-    NOTE: SSN is stored as plain text currently but should be encrypted in production
+    NOTE: Names are indexed for substring search (see
+    ConsumerQuerySet.name_contains()). On SQLite the index is an FTS5 table kept in
+    sync by triggers, which are lost if a migration rebuilds this table; recreate
+    them as in migration 0008.
+    NOTE: The SSN is encrypted at rest with a random nonce, so it cannot be queried.
+    Consumers are looked up by ``ssn_index``, a keyed hash of the SSN that is
+    unique: there is at most one consumer per SSN.
     """
 
     name = models.CharField(max_length=255)
     address = models.TextField()
-    ssn = models.CharField(max_length=11)  # Format: XXX-XX-XXXX
+    ssn = EncryptedCharField(max_length=255)  # Format: XXX-XX-XXXX
+    ssn_index = BlindIndexField(source="ssn", unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ConsumerQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["name"]),
-            models.Index(fields=["ssn"]),
         ]
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        # The SSN is part of the fingerprint of every linked account
+        if self.pk:
+            Account.objects.filter(consumers=self).update(fingerprint="")
+        super().save(*args, **kwargs)
+        bump_data_generation(Account.objects.filter(consumers=self).values("client_id"))
+
+    def delete(self, *args, **kwargs):
+        bump_data_generation(Account.objects.filter(consumers=self).values("client_id"))
+        return super().delete(*args, **kwargs)
+
     def get_accounts(self) -> List["Account"]:
         """
         Return all accounts associated with this consumer.
@@ -103,12 +236,16 @@ class Consumer(models.Model):
 class Account(models.Model):
     """
     Represents a debt account that needs to be collected.
-    
+
     An account is associated with a client and can have multiple consumers.
-    
+
     TODO: Add fields for payment history and collection attempts
     TODO: Implement status transitions with proper validations
     NOTE: The many-to-many relationship with consumers is implemented via AccountConsumer
+    NOTE: ``fingerprint`` is set by CSV imports so that unchanged accounts can be
+    skipped. Saving an account or one of its links outside an import clears it.
+    NOTE: save() and delete() keep the balance rollups up to date; bulk writes must
+    apply RollupDeltas themselves.
     """
 
     # Status choices
@@ -135,6 +272,8 @@ class Account(models.Model):
     consumers = models.ManyToManyField(
         Consumer, through="AccountConsumer", related_name="accounts"
     )
+    # compute_account_fingerprint() of the account as of the last import
+    fingerprint = models.CharField(max_length=32, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -149,6 +288,55 @@ class Account(models.Model):
     def __str__(self) -> str:
         return f"Account {self.client_reference_no} - ${self.balance}"
 
+    def save(self, *args, **kwargs) -> None:
+        # Imports write with bulk queries; any other change invalidates the fingerprint
+        self.fingerprint = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "fingerprint"}
+        with transaction.atomic():
+            deltas = RollupDeltas()
+            old = None if self._state.adding else self._get_rollup_key()
+            if old:
+                deltas.remove(*old)
+            super().save(*args, **kwargs)
+            new = (self.client_id, self.status, self.balance)
+            if old and update_fields is not None:
+                # Fields that were not saved keep their stored values
+                saved = {self._meta.get_field(name).name for name in update_fields}
+                new = tuple(
+                    value if field in saved else old_value
+                    for field, value, old_value in zip(
+                        ("client", "status", "balance"), new, old
+                    )
+                )
+            deltas.add(*new)
+            deltas.apply()
+            bump_data_generation([self.client_id])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            old = self._get_rollup_key()
+            bump_data_generation([self.client_id])
+            result = super().delete(*args, **kwargs)
+            if old:
+                deltas = RollupDeltas()
+                deltas.remove(*old)
+                deltas.apply()
+            return result
+
+    def _get_rollup_key(self) -> Optional[Tuple[int, str, Decimal]]:
+        """
+        Return the stored client ID, status and balance of the account, locking its
+        row until the end of the transaction.
+        """
+        return (
+            Account.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("client_id", "status", "balance")
+            .first()
+        )
+
     def get_consumers(self) -> List[Consumer]:
         """
         Return all consumers associated with this account.
@@ -156,6 +344,86 @@ class Account(models.Model):
         return self.consumers.all()
 
 
+class BalanceRollup(models.Model):
+    """
+    Number and total balance of the accounts of a client with a status.
+
+    Rollups are maintained incrementally: every write to accounts applies the
+    difference it makes (see RollupDeltas) in its own transaction, so reading the
+    totals of every client takes one row per client and status instead of a scan
+    of the accounts. The ``rebuild_rollups`` command recomputes them from the
+    accounts and reports any drift.
+    """
+
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="balance_rollups"
+    )
+    status = models.CharField(max_length=20, choices=Account.STATUS_CHOICES)
+    account_count = models.BigIntegerField(default=0)
+    total_balance = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["client", "status"]
+
+    def __str__(self) -> str:
+        return f"{self.client} {self.status}: {self.account_count} accounts, ${self.total_balance}"
+
+
+class RollupDeltas:
+    """
+    Changes to the balance rollups, accumulated per (client, status) and written
+    with one UPDATE per rollup by apply().
+
+    Writes to accounts record the accounts they remove from a rollup (deleted, or
+    moved to another client or status, with their old balance) and the accounts
+    they add to one, then call apply() in the same transaction. Rollup rows are
+    updated in (client, status) order, so concurrent writers cannot deadlock on
+    them.
+    """
+
+    def __init__(self):
+        self.deltas: Dict[Tuple[int, str], List[Any]] = {}
+
+    def add(self, client_id: int, status: str, balance: Any, count: int = 1) -> None:
+        """
+        Count ``count`` accounts with a total of ``balance`` in a rollup.
+        """
+        delta = self.deltas.setdefault((client_id, status), [0, Decimal(0)])
+        delta[0] += count
+        delta[1] += Decimal(balance).quantize(Decimal("0.01"))
+
+    def remove(self, client_id: int, status: str, balance: Any, count: int = 1) -> None:
+        """
+        Take ``count`` accounts with a total of ``balance`` out of a rollup.
+        """
+        self.add(client_id, status, -Decimal(balance), -count)
+
+    def apply(self) -> None:
+        """
+        Write the accumulated changes and reset them.
+        """
+        deltas = sorted(
+            (key, delta) for key, delta in self.deltas.items() if any(delta)
+        )
+        self.deltas = {}
+        if not deltas:
+            return
+        BalanceRollup.objects.bulk_create(
+            [
+                BalanceRollup(client_id=client_id, status=status)
+                for (client_id, status), _ in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        for (client_id, status), (count, balance) in deltas:
+            BalanceRollup.objects.filter(client_id=client_id, status=status).update(
+                account_count=F("account_count") + count,
+                total_balance=F("total_balance") + balance,
+                updated_at=timezone.now(),
+            )
+
+
 class AccountConsumer(models.Model):
     """
     Represents the many-to-many relationship between accounts and consumers.
@@ -174,3 +442,215 @@ class AccountConsumer(models.Model):
 
     def __str__(self) -> str:
         return f"{self.consumer} on {self.account}"
+
+    def save(self, *args, **kwargs) -> None:
+        Account.objects.filter(id=self.account_id).update(fingerprint="")
+        super().save(*args, **kwargs)
+        bump_data_generation(
+            Account.objects.filter(id=self.account_id).values("client_id")
+        )
+
+    def delete(self, *args, **kwargs):
+        Account.objects.filter(id=self.account_id).update(fingerprint="")
+        bump_data_generation(
+            Account.objects.filter(id=self.account_id).values("client_id")
+        )
+        return super().delete(*args, **kwargs)
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Tracks the progress of a CSV import that commits in chunks.
+
+    After every committed chunk the number of rows and the byte offset just past the
+    last committed row are recorded, so a failed import can be resumed from that
+    point without reparsing the earlier part of the file.
+
+    NOTE: Resuming only makes sense with the same file that was originally imported.
+    """
+
+    STATUS_IN_PROGRESS = "IN_PROGRESS"
+    STATUS_COMPLETED = "COMPLETED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_IN_PROGRESS, "In Progress"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="import_checkpoints"
+    )
+    file_name = models.CharField(max_length=255, blank=True)
+    commit_every = models.PositiveIntegerField()
+    headers = models.JSONField(default=list)
+    rows_committed = models.PositiveBigIntegerField(default=0)
+    byte_offset = models.PositiveBigIntegerField(default=0)
+    stats = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_IN_PROGRESS
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Import of {self.file_name or 'CSV'} ({self.rows_committed} rows)"
+
+
+class ImportCheckpointAccount(models.Model):
+    """
+    An account reference written (or found unchanged) by a committed chunk of a
+    chunked import.
+
+    Rows are committed together with their chunk, so a resumed import knows exactly
+    which accounts the earlier run has seen and keeps their first occurrence.
+    """
+
+    checkpoint = models.ForeignKey(
+        ImportCheckpoint, on_delete=models.CASCADE, related_name="accounts"
+    )
+    client_reference_no = models.CharField(max_length=255)
+    # Whether the account was counted as unchanged
+    unchanged = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = [("checkpoint", "client_reference_no")]
+
+    def __str__(self) -> str:
+        return f"{self.client_reference_no} in import {self.checkpoint_id}"
+
+
+class ImportJob(models.Model):
+    """
+    A CSV import that runs in the background, off the request path.
+
+    The uploaded file is spooled to disk and imported by a local worker pool (see
+    accounts.jobs); progress counters are updated as batches are written so clients
+    can poll the job's status.
+
+    NOTE: Jobs queued or running in a web process that stops are lost with it;
+    the ``recover_import_jobs`` command runs them again, resuming after the last
+    chunk the job's checkpoint recorded.
+    """
+
+    STATUS_PENDING = "PENDING"
+    STATUS_RUNNING = "RUNNING"
+    STATUS_SUCCEEDED = "SUCCEEDED"
+    STATUS_FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_SUCCEEDED, "Succeeded"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    collection_agency = models.ForeignKey(
+        CollectionAgency, on_delete=models.CASCADE, related_name="import_jobs"
+    )
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="import_jobs"
+    )
+    checkpoint = models.ForeignKey(
+        ImportCheckpoint,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+    file_name = models.CharField(max_length=255, blank=True)
+    file_path = models.CharField(max_length=1024)
+    # SHA-256 of the file, registered as an ImportUpload once the job succeeds
+    file_sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    rows_parsed = models.PositiveBigIntegerField(default=0)
+    rows_written = models.PositiveBigIntegerField(default=0)
+    stats = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["client", "status"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Import job {self.id} ({self.status})"
+
+    def get_throughput(self) -> Optional[float]:
+        """
+        Return the number of rows written per second, if the job has started.
+        """
+        if not self.started_at:
+            return None
+        elapsed = (
+            (self.finished_at or timezone.now()) - self.started_at
+        ).total_seconds()
+        if elapsed <= 0:
+            return None
+        return round(self.rows_written / elapsed, 1)
+
+
+class ImportUpload(models.Model):
+    """
+    Registry of the files that have been imported for each client.
+
+    Files are identified by the SHA-256 of their content, so an upload of a file
+    that has already been imported can be answered with the original statistics
+    instead of being imported again.
+    """
+
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="import_uploads"
+    )
+    sha256 = models.CharField(max_length=64)
+    file_name = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    stats = models.JSONField(default=dict)
+    import_job = models.ForeignKey(
+        ImportJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="uploads",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["client", "sha256"]
+
+    def __str__(self) -> str:
+        return f"{self.file_name or self.sha256[:12]} for {self.client}"
+
+
+class ImportLock(models.Model):
+    """
+    Lock held by the import running for a client, on databases without advisory
+    locks (see accounts.locks).
+
+    A row exists while an import of the client is in progress; the unique client
+    makes a second import fail to insert its own row until the first one is done.
+    """
+
+    client = models.OneToOneField(
+        Client, on_delete=models.CASCADE, related_name="import_lock"
+    )
+    # Host, process and thread of the import holding the lock
+    owner = models.CharField(max_length=255)
+    acquired_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Import lock on {self.client} held by {self.owner}"
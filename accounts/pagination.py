@@ -1,4 +1,11 @@
+from typing import Any, Dict
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .counting import COUNT_MODES, COUNT_NONE, count_queryset
 
 
 class AccountCursorPagination(CursorPagination):
@@ -12,8 +19,59 @@ class AccountCursorPagination(CursorPagination):
     4. Cannot skip to arbitrary pages, which prevents deep pagination issues
 
     The trade-off is that users can't jump to specific page numbers.
+
+    NOTE: Pages have no count unless ``?count=exact`` or ``?count=estimate`` is
+    passed; the response then starts with ``count`` and ``count_exact`` (exact
+    counts that time out fall back to an estimate, see accounts.counting)
     """
 
     page_size = 100
     ordering = ["created_at"]
     cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    def get_count_mode(self, request) -> str:
+        """
+        Return the count mode a request asks for.
+
+        Raises:
+            ValidationError: If it is not one of COUNT_MODES
+        """
+        mode = request.query_params.get(self.count_query_param, COUNT_NONE)
+        if mode not in COUNT_MODES:
+            raise ValidationError(
+                {self.count_query_param: [f"Must be one of: {', '.join(COUNT_MODES)}"]}
+            )
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = self.get_count_mode(request)
+        self.count = self.count_exact = None
+        if mode != COUNT_NONE:
+            self.count, self.count_exact = count_queryset(queryset, mode)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Like paginate_queryset(), for async views.
+
+        NOTE: DRF's pagination is synchronous, so the count and page queries run in
+        a worker thread
+        """
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def get_paginated_data(self, data) -> Dict[str, Any]:
+        """
+        Return the body of a page response: the count if requested, the links and
+        the results.
+        """
+        page = {}
+        if self.count is not None:
+            page.update(count=self.count, count_exact=self.count_exact)
+        page.update(
+            next=self.get_next_link(), previous=self.get_previous_link(), results=data
+        )
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
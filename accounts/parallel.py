@@ -0,0 +1,335 @@
+import csv
+import gc
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# NOTE: Nothing Django-related is imported at module level. Worker processes may be
+# spawned rather than forked, and they import this module before Django is set up.
+
+
+class PartitionResult(NamedTuple):
+    """
+    Rows parsed and validated from one byte range of a CSV file.
+
+    NOTE: Results are pickled back to the parent process, which costs more than
+    parsing when they are sent as dicts of rows. Rows are sent once each as one
+    list of strings per field instead, with accounts and consumers pointing at them
+    by position in first-occurrence order.
+    """
+
+    columns: List[List[str]]
+    account_rows: List[int]
+    consumer_rows: List[int]
+    link_refs: List[str]
+    link_ssns: List[str]
+    row_count: int
+    # Errors numbered by row index within the partition (capped) and their total
+    errors: List[Any]
+    error_count: int
+
+
+class _FileRange:
+    """
+    Read-only view of a file that stops at a given byte offset.
+    """
+
+    def __init__(self, file_obj: Any, end: int):
+        self.file_obj = file_obj
+        self.end = end
+
+    def read(self, size: int) -> bytes:
+        remaining = self.end - self.file_obj.tell()
+        if remaining <= 0:
+            return b""
+        return self.file_obj.read(min(size, remaining))
+
+
+def read_headers(path: str, encoding: str = "utf-8") -> Tuple[List[str], int]:
+    """
+    Return the CSV headers of a file and the byte offset where the data starts.
+    """
+    with open(path, "rb") as csv_file:
+        header_line = csv_file.readline()
+    headers = next(csv.reader([header_line.decode(encoding)]), [])
+    return headers, len(header_line)
+
+
+def find_partitions(path: str, data_start: int, count: int) -> List[Tuple[int, int]]:
+    """
+    Split the data part of a file into byte ranges that start on line boundaries.
+
+    NOTE: Boundaries are placed after newline bytes, so quoted fields must not
+    contain line breaks (client files never do).
+
+    Args:
+        path: Path of the CSV file
+        data_start: Byte offset of the first data row
+        count: Desired number of partitions
+
+    Returns:
+        List of (start, end) byte offsets, in file order
+    """
+    size = os.path.getsize(path)
+    bounds = [data_start]
+    with open(path, "rb") as csv_file:
+        for i in range(1, count):
+            target = data_start + (size - data_start) * i // count
+            # Move forward to the start of the next line
+            csv_file.seek(max(target - 1, data_start))
+            csv_file.readline()
+            position = csv_file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector.
+
+    NOTE: Parsing creates millions of rows that live until the import ends. They
+    would set off the collector over and over without it ever finding garbage.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def _init_worker() -> None:
+    """
+    Make sure Django is set up in spawned worker processes.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _parse_range(
+    path: str, start: int, end: int, headers: List[str], encoding: str = "utf-8"
+) -> Tuple[Dict[str, Any], Dict[str, Any], Set[Tuple[str, str]], int, List[Any], int]:
+    """
+    Parse and validate one byte range of a CSV file.
+
+    Every row is validated. Errors are numbered by row index within the range so
+    the caller can renumber them by their position in the whole file. Once a row
+    is invalid the import cannot succeed, so rows are no longer collected.
+
+    Returns:
+        Tuple of (account data keyed by reference, consumer data keyed by SSN,
+        set of (account reference, SSN) links, number of rows, errors (capped),
+        number of errors)
+    """
+    from .services import CSVImportService, CSVLineStream, ImportRow, _chunked
+    from .validation import ColumnBlockValidator
+
+    validator = ColumnBlockValidator(headers)
+    account_data: Dict[str, Any] = {}
+    consumer_data: Dict[str, Any] = {}
+    links: Set[Tuple[str, str]] = set()
+    errors: List[Any] = []
+    error_count = 0
+    row_count = 0
+
+    with _gc_paused(), open(path, "rb") as csv_file:
+        csv_file.seek(start)
+        csv_reader = csv.reader(
+            CSVLineStream(
+                _FileRange(csv_file, end), encoding=encoding, decompress=False
+            )
+        )
+        rows = (row for row in csv_reader if row)
+        for block in _chunked(rows, CSVImportService.BLOCK_SIZE):
+            records, block_errors = validator.validate(block, row_count)
+            row_count += len(block)
+            error_count += len(block_errors)
+            errors.extend(block_errors[: CSVImportService.MAX_ERRORS - len(errors)])
+            if error_count:
+                continue
+
+            for import_row in map(ImportRow._make, records):
+                # Use the first occurrence within the range
+                if import_row.client_reference_no not in account_data:
+                    account_data[import_row.client_reference_no] = import_row
+                if import_row.ssn not in consumer_data:
+                    consumer_data[import_row.ssn] = import_row
+                links.add((import_row.client_reference_no, import_row.ssn))
+
+    return account_data, consumer_data, links, row_count, errors, error_count
+
+
+def parse_partition(
+    path: str, start: int, end: int, headers: List[str], encoding: str = "utf-8"
+) -> PartitionResult:
+    """
+    Parse and validate one byte range of a CSV file in a worker process.
+    """
+    from .services import ImportRow
+
+    account_data, consumer_data, links, row_count, errors, error_count = _parse_range(
+        path, start, end, headers, encoding
+    )
+
+    # Number the rows used by an account or a consumer
+    positions: Dict[int, int] = {}
+    unique_rows = []
+    for row in (*account_data.values(), *consumer_data.values()):
+        if id(row) not in positions:
+            positions[id(row)] = len(unique_rows)
+            unique_rows.append(row)
+    columns = [list(column) for column in zip(*unique_rows)] or [
+        [] for _ in ImportRow._fields
+    ]
+    columns[BALANCE] = list(map(str, columns[BALANCE]))
+    link_refs, link_ssns = map(list, zip(*links)) if links else ([], [])
+
+    return PartitionResult(
+        columns,
+        [positions[id(row)] for row in account_data.values()],
+        [positions[id(row)] for row in consumer_data.values()],
+        link_refs,
+        link_ssns,
+        row_count,
+        errors,
+        error_count,
+    )
+
+
+# Position of the only field of an import row that is not a string
+BALANCE = 1
+
+
+def _rebuild_rows(result: PartitionResult) -> List[Any]:
+    """
+    Turn the columns of a partition result back into import rows.
+    """
+    from .services import ImportRow
+
+    columns = list(result.columns)
+    columns[BALANCE] = map(Decimal, columns[BALANCE])
+    return list(map(ImportRow._make, zip(*columns)))
+
+
+def parse_csv_in_parallel(
+    path: str, workers: Optional[int] = None, encoding: str = "utf-8"
+) -> Tuple[Dict[str, Any], Dict[str, Any], Set[Tuple[str, str]], int]:
+    """
+    Parse and validate a CSV file on several cores and merge the results.
+
+    The file is split into byte-range partitions that are parsed in a process pool.
+    Partitions are merged in file order, so the first occurrence of an account or
+    consumer in the file still provides its data.
+
+    Args:
+        path: Path of the CSV file
+        workers: Number of worker processes (defaults to the number of CPUs). With
+            one, the file is parsed in this process
+        encoding: Text encoding of the file
+
+    Returns:
+        Tuple of (account data keyed by reference, consumer data keyed by SSN,
+        set of (account reference, SSN) links, number of rows)
+
+    Raises:
+        CSVImportError: If the file is compressed, or the headers or any row are
+            invalid
+    """
+    from .services import (
+        COMPRESSION_HEADER_SIZE,
+        CSVImportError,
+        CSVImportService,
+        CSVValidationError,
+        detect_compression,
+    )
+
+    with open(path, "rb") as csv_file:
+        if detect_compression(csv_file.read(COMPRESSION_HEADER_SIZE)):
+            # Compressed data cannot be split at byte offsets
+            raise CSVImportError(
+                "Compressed files cannot be parsed in parallel; use import_csv()."
+            )
+
+    workers = workers or os.cpu_count() or 1
+    headers, data_start = read_headers(path, encoding)
+    CSVImportService.validate_csv_headers(headers)
+    partitions = find_partitions(path, data_start, workers)
+
+    if len(partitions) <= 1:
+        # A pool would only add the cost of sending the rows back
+        start, end = partitions[0] if partitions else (data_start, data_start)
+        account_data, consumer_data, links, row_count, errors, error_count = (
+            _parse_range(path, start, end, headers, encoding)
+        )
+        if errors:
+            raise CSVValidationError(
+                [error._replace(row_num=error.row_num + 2) for error in errors],
+                error_count,
+            )
+        return account_data, consumer_data, links, row_count
+
+    with ProcessPoolExecutor(
+        max_workers=len(partitions), initializer=_init_worker
+    ) as executor:
+        futures = [
+            executor.submit(parse_partition, path, start, end, headers, encoding)
+            for start, end in partitions
+        ]
+        results = [future.result() for future in futures]
+
+    return _merge_results(results)
+
+
+def _merge_results(
+    results: List[PartitionResult],
+) -> Tuple[Dict[str, Any], Dict[str, Any], Set[Tuple[str, str]], int]:
+    """
+    Merge partition results in file order, keeping the first occurrence of every
+    account and consumer.
+
+    Raises:
+        CSVValidationError: If any row is invalid
+    """
+    from .services import CSVImportService, CSVValidationError
+
+    account_data: Dict[str, Any] = {}
+    consumer_data: Dict[str, Any] = {}
+    links: Set[Tuple[str, str]] = set()
+    errors: List[Any] = []
+    error_count = 0
+    row_count = 0
+    with _gc_paused():
+        for result in results:
+            # Every earlier partition was parsed completely, so the row numbers in
+            # the whole file are known (2 accounts for the header)
+            errors.extend(
+                error._replace(row_num=row_count + error.row_num + 2)
+                for error in result.errors
+            )
+            error_count += result.error_count
+            row_count += result.row_count
+            if error_count:
+                continue
+
+            rows = _rebuild_rows(result)
+            for position in result.account_rows:
+                account_data.setdefault(
+                    rows[position].client_reference_no, rows[position]
+                )
+            for position in result.consumer_rows:
+                consumer_data.setdefault(rows[position].ssn, rows[position])
+            links.update(zip(result.link_refs, result.link_ssns))
+
+    if errors:
+        raise CSVValidationError(errors[: CSVImportService.MAX_ERRORS], error_count)
+
+    return account_data, consumer_data, links, row_count
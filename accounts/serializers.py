@@ -1,6 +1,17 @@
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Prefetch, QuerySet
 from rest_framework import serializers
-from .models import CollectionAgency, Client, Consumer, Account, AccountConsumer
-from typing import Dict, Any, List
+from .models import (
+    CollectionAgency,
+    Client,
+    Consumer,
+    Account,
+    AccountConsumer,
+    ImportJob,
+)
+from typing import Dict, Any, Iterable, List, Optional, Sequence
 
 
 class ConsumerSerializer(serializers.ModelSerializer):
@@ -35,7 +46,23 @@ class ClientSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "collection_agency"]
 
 
-class AccountSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Lets a serializer be limited to some of its fields with a ``fields`` argument.
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs):
+        """
+        Args:
+            fields: Names of the fields to keep (all of them if None)
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class AccountSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for the Account model.
     """
@@ -56,6 +83,319 @@ class AccountSerializer(serializers.ModelSerializer):
         ]
 
 
+class ValuesSerializer:
+    """
+    Serializes querysets like a ModelSerializer with ``many=True``, from rows
+    fetched with ``.values()`` instead of model instances.
+
+    The serializer's fields are compiled once into a plan of the columns to fetch
+    and a converter per field. Nested serializers become nested dicts built from
+    joined columns; nested ``many=True`` serializers over a many-to-many relation
+    are fetched with one extra query through the relation's table, in the related
+    model's ID order. Character, integer and choice fields are copied as they are
+    and other fields go through their own ``to_representation()``, so the output
+    is identical to the serializer's.
+
+    NOTE: Only fields backed by model columns are supported (no ``source`` paths,
+    method fields or custom ``to_representation()``); anything else raises
+    ImproperlyConfigured when the plan is compiled.
+    """
+
+    # Fields whose to_representation() returns database values unchanged
+    PASSTHROUGH_FIELDS = (
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.ChoiceField,
+    )
+
+    # Kinds of plan entries
+    COLUMN = "column"
+    NESTED = "nested"
+    MANY = "many"
+
+    def __init__(self, serializer_class: type):
+        """
+        Args:
+            serializer_class: ModelSerializer whose output to reproduce
+        """
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self._plan: Optional[list] = None
+
+    @property
+    def plan(self) -> list:
+        """
+        Compiled plan: (kind, key, source, payload) entries, where the source is a
+        column for COLUMN entries and a relation for the others, and the payload a
+        converter (or None) for COLUMN entries and a plan for the others.
+        """
+        if self._plan is None:
+            self._plan = self._compile(self.serializer_class(), "", top_level=True)
+        return self._plan
+
+    @property
+    def expandable(self) -> List[str]:
+        """
+        Names of the fields that are nested objects or lists.
+        """
+        return [key for kind, key, _, _ in self.plan if kind != self.COLUMN]
+
+    def get_plan(self, fields: Optional[Iterable[str]] = None) -> list:
+        """
+        Return the plan limited to the given top-level fields (all if None).
+        """
+        if fields is None:
+            return self.plan
+        fields = set(fields)
+        return [entry for entry in self.plan if entry[1] in fields]
+
+    def _compile(
+        self, serializer: serializers.Serializer, prefix: str, top_level: bool = False
+    ) -> list:
+        name = type(serializer).__name__
+        if (
+            type(serializer).to_representation
+            is not serializers.Serializer.to_representation
+        ):
+            raise ImproperlyConfigured(f"{name} overrides to_representation().")
+
+        plan = []
+        for key, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or "." in field.source:
+                raise ImproperlyConfigured(f"{name}.{key} has an unsupported source.")
+            if isinstance(field, serializers.ListSerializer):
+                if not top_level:
+                    raise ImproperlyConfigured(f"{name}.{key} is a nested list.")
+                relation = self.model._meta.get_field(field.source)
+                target = relation.m2m_reverse_field_name()
+                plan.append(
+                    (
+                        self.MANY,
+                        key,
+                        field.source,
+                        self._compile(field.child, f"{target}__"),
+                    )
+                )
+            elif isinstance(field, serializers.Serializer):
+                plan.append(
+                    (
+                        self.NESTED,
+                        key,
+                        prefix + field.source,
+                        self._compile(field, f"{prefix}{field.source}__"),
+                    )
+                )
+            elif isinstance(
+                field, (serializers.SerializerMethodField, serializers.RelatedField)
+            ):
+                raise ImproperlyConfigured(f"{name}.{key} is not a model column.")
+            else:
+                if type(field) in self.PASSTHROUGH_FIELDS:
+                    converter = None
+                elif isinstance(field, serializers.DateTimeField):
+                    # Bound to the current time zone for each page (see _bind())
+                    converter = field
+                else:
+                    converter = field.to_representation
+                plan.append((self.COLUMN, key, prefix + field.source, converter))
+        return plan
+
+    def _bind(self, plan: list) -> list:
+        """
+        Return the plan with datetime fields fixed to the current time zone.
+
+        DateTimeField looks the current time zone up for every value, which costs
+        more than the rest of the conversion; a copy with an explicit time zone
+        converts the same way.
+        """
+        bound = []
+        for kind, key, source, payload in plan:
+            if kind != self.COLUMN:
+                payload = self._bind(payload)
+            elif isinstance(payload, serializers.DateTimeField):
+                field = payload
+                payload = copy.copy(field)
+                if not hasattr(field, "timezone"):
+                    payload.timezone = field.default_timezone()
+                payload = payload.to_representation
+            bound.append((kind, key, source, payload))
+        return bound
+
+    @classmethod
+    def _columns(cls, plan: list) -> List[str]:
+        columns = []
+        for kind, _, source, payload in plan:
+            if kind == cls.COLUMN:
+                columns.append(source)
+            elif kind == cls.NESTED:
+                columns.extend(cls._columns(payload))
+        return columns
+
+    @classmethod
+    def _relations(cls, plan: list) -> List[str]:
+        # Deepest nested relations, for select_related()
+        relations = []
+        for kind, _, source, payload in plan:
+            if kind == cls.NESTED:
+                relations.extend(cls._relations(payload) or [source])
+        return relations
+
+    @classmethod
+    def _deferrable(cls, plan: list) -> List[str]:
+        # Columns and relations to pass to only()
+        names = []
+        for kind, _, source, payload in plan:
+            if kind == cls.COLUMN:
+                names.append(source)
+            elif kind == cls.NESTED:
+                names.append(source)
+                names.extend(cls._deferrable(payload))
+        return names
+
+    def project(
+        self,
+        queryset: QuerySet,
+        fields: Optional[Iterable[str]] = None,
+        extra: Sequence[str] = (),
+    ) -> QuerySet:
+        """
+        Return a model queryset that loads only what the given fields show.
+
+        Columns are limited with only(), nested objects are joined with
+        select_related() and many-to-many lists prefetched (in ID order, like
+        serialize() lists them, and also limited to their columns); relations the
+        fields do not show are neither joined nor prefetched.
+
+        Args:
+            queryset: Queryset of the serializer's model
+            fields: Top-level fields to load (all if None)
+            extra: Other columns to load, e.g. the pagination ordering
+        """
+        plan = self.get_plan(fields)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        relations = self._relations(plan)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        for kind, _, source, payload in plan:
+            if kind == self.MANY:
+                model = self.model._meta.get_field(source).related_model
+                # The child's columns are named from the relation's table
+                columns = [name.split("__", 1)[1] for name in self._deferrable(payload)]
+                queryset = queryset.prefetch_related(
+                    Prefetch(source, model.objects.order_by("pk").only(*columns))
+                )
+        return queryset.only(*self._deferrable(plan), *extra)
+
+    def get_values(
+        self,
+        queryset: QuerySet,
+        fields: Optional[Iterable[str]] = None,
+        extra: Sequence[str] = (),
+    ) -> QuerySet:
+        """
+        Return the ``.values()`` queryset to paginate and pass to serialize().
+
+        Args:
+            queryset: Queryset of the serializer's model
+            fields: Top-level fields to fetch (all if None)
+            extra: Other columns to fetch, e.g. the pagination ordering
+        """
+        plan = self.get_plan(fields)
+        columns = self._columns(plan)
+        if any(kind == self.MANY for kind, _, _, _ in plan):
+            # Lists are fetched by row ID
+            columns.append("id")
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .values(*dict.fromkeys([*columns, *extra]))
+        )
+
+    def serialize(
+        self, rows: List[Dict[str, Any]], fields: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the representation of rows from get_values(), limited to the given
+        top-level fields (all if None).
+        """
+        plan = self._bind(self.get_plan(fields))
+        related = {}
+        for kind, key, relation, subplan in plan:
+            if kind == self.MANY:
+                related[key] = self._group_many(
+                    relation, subplan, self._many_values(relation, subplan, rows)
+                )
+        return [self._build(plan, row, related) for row in rows]
+
+    async def aserialize(
+        self, rows: List[Dict[str, Any]], fields: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Like serialize(), fetching many-to-many lists through the async ORM.
+        """
+        plan = self._bind(self.get_plan(fields))
+        related = {}
+        for kind, key, relation, subplan in plan:
+            if kind == self.MANY:
+                values = self._many_values(relation, subplan, rows)
+                related[key] = self._group_many(
+                    relation, subplan, [row async for row in values]
+                )
+        return [self._build(plan, row, related) for row in rows]
+
+    def _build(
+        self,
+        plan: list,
+        row: Dict[str, Any],
+        related: Optional[Dict[str, Dict[Any, list]]] = None,
+    ) -> Dict[str, Any]:
+        data = {}
+        for kind, key, source, payload in plan:
+            if kind == self.COLUMN:
+                value = row[source]
+                if payload is not None and value is not None:
+                    value = payload(value)
+                data[key] = value
+            elif kind == self.NESTED:
+                data[key] = self._build(payload, row)
+            else:
+                data[key] = related[key].get(row["id"], [])
+        return data
+
+    def _many_values(
+        self, relation: str, plan: list, rows: List[Dict[str, Any]]
+    ) -> QuerySet:
+        """
+        Return the rows of a many-to-many relation's table for the given rows, in
+        the related model's ID order.
+        """
+        field = self.model._meta.get_field(relation)
+        through = field.remote_field.through.objects
+        if not rows:
+            return through.none()
+        owner = f"{field.m2m_field_name()}_id"
+        return (
+            through.filter(**{f"{owner}__in": [row["id"] for row in rows]})
+            .order_by(f"{field.m2m_reverse_field_name()}_id")
+            .values(owner, *self._columns(plan))
+        )
+
+    def _group_many(
+        self, relation: str, plan: list, values: Iterable[Dict[str, Any]]
+    ) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Return the representations of rows from _many_values(), keyed by the ID of
+        the row they belong to.
+        """
+        owner = f"{self.model._meta.get_field(relation).m2m_field_name()}_id"
+        by_owner: Dict[Any, List[Dict[str, Any]]] = {}
+        for row in values:
+            by_owner.setdefault(row[owner], []).append(self._build(plan, row))
+        return by_owner
+
+
 class AccountConsumerSerializer(serializers.ModelSerializer):
     """
     Serializer for the AccountConsumer model.
@@ -67,3 +407,34 @@ class AccountConsumerSerializer(serializers.ModelSerializer):
     class Meta:
         model = AccountConsumer
         fields = ["id", "account", "consumer"]
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the ImportJob model, exposing import progress.
+    """
+
+    throughput = serializers.FloatField(source="get_throughput", read_only=True)
+
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "collection_agency",
+            "client",
+            "file_name",
+            "status",
+            "rows_parsed",
+            "rows_written",
+            "throughput",
+            "stats",
+            "error",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+# Fast path for account lists; produces exactly what AccountSerializer would
+account_values_serializer = ValuesSerializer(AccountSerializer)
@@ -1,11 +1,53 @@
+import bz2
+import codecs
 import csv
+import gzip
 import io
-from typing import Dict, List, Any, Optional, Set, Tuple
+import lzma
+import re
+import zipfile
+from contextlib import contextmanager
+from functools import wraps
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Any,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 from django.db import transaction
 from django.db.models import Model
-from decimal import Decimal, InvalidOperation
+from django.utils import timezone
+from decimal import Decimal
 
-from .models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from .crypto import blind_index
+from .locks import ClientImportLock, ImportLockTimeout, write_transaction
+from .models import (
+    CollectionAgency,
+    Client,
+    Consumer,
+    Account,
+    AccountConsumer,
+    ImportCheckpoint,
+    ImportCheckpointAccount,
+    RollupDeltas,
+    bump_data_generation,
+    compute_account_fingerprint,
+)
+from .parallel import parse_csv_in_parallel
+from .validation import (
+    REQUIRED_FIELDS,
+    SSN_PATTERN,
+    VALID_STATUSES,
+    ColumnBlockValidator,
+    RowError,
+    check_balance,
+)
 
 
 class CSVImportError(Exception):
@@ -16,28 +58,1023 @@ class CSVImportError(Exception):
     pass
 
 
+class CSVValidationError(CSVImportError):
+    """
+    Exception raised when rows of a CSV file are invalid.
+
+    Carries every error found in the file (up to a limit) so clients can fix them
+    all at once; the message is the first error.
+    """
+
+    def __init__(self, errors: List[RowError], error_count: Optional[int] = None):
+        self.errors = errors
+        self.error_count = error_count or len(errors)
+        message = str(errors[0])
+        if self.error_count > 1:
+            message += f" (and {self.error_count - 1} more errors)"
+        super().__init__(message)
+
+
+class ImportRow(NamedTuple):
+    """
+    A validated row of import data, ready to be written to the database.
+    """
+
+    client_reference_no: str
+    balance: Decimal
+    status: str
+    consumer_name: str
+    consumer_address: str
+    ssn: str
+
+    @classmethod
+    def from_csv_row(cls, row: Dict[str, str]) -> "ImportRow":
+        """
+        Build an import row from a validated CSV row keyed by header.
+        """
+        return cls(
+            client_reference_no=row["client reference no"],
+            balance=Decimal(row["balance"]),
+            status=row["status"],
+            consumer_name=row["consumer name"],
+            consumer_address=row["consumer address"],
+            ssn=row["ssn"],
+        )
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Yield successive lists of at most ``size`` items.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Magic bytes of the supported compression formats
+COMPRESSION_SIGNATURES = [
+    ("gzip", re.compile(rb"\x1f\x8b\x08")),
+    # Stream header followed by the first block's magic number
+    ("bz2", re.compile(rb"BZh[1-9]1AY&SY")),
+    ("xz", re.compile(rb"\xfd7zXZ\x00")),
+    ("zip", re.compile(rb"PK\x03\x04")),
+]
+COMPRESSION_HEADER_SIZE = 10
+
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """
+    Return the compression format of a file from its first bytes, if any.
+
+    Args:
+        head: The first COMPRESSION_HEADER_SIZE bytes of the file
+
+    Returns:
+        "gzip", "bz2", "xz", "zip" or None for uncompressed data
+    """
+    for compression, signature in COMPRESSION_SIGNATURES:
+        if signature.match(head):
+            return compression
+    return None
+
+
+def peek_file(file_obj: Any, size: int) -> bytes:
+    """
+    Return the first bytes of a file without consuming them.
+
+    Args:
+        file_obj: File-like object, uploaded file, bytes or string
+        size: Number of bytes to return
+
+    Returns:
+        The bytes, or an empty string for text and unseekable files
+    """
+    if isinstance(file_obj, bytes):
+        return file_obj[:size]
+    if isinstance(file_obj, str) or not hasattr(file_obj, "seek"):
+        return b""
+    position = file_obj.tell()
+    head = file_obj.read(size)
+    file_obj.seek(position)
+    return head if isinstance(head, bytes) else b""
+
+
+class CSVLineStream:
+    """
+    Iterates over the lines of a CSV upload without loading it into memory.
+
+    The file is read chunk by chunk (through ``UploadedFile.chunks()`` when it is
+    available) and decoded with an incremental decoder, so multi-byte characters
+    split across chunk boundaries are handled and peak memory is bounded by the
+    chunk size rather than by the file size.
+
+    gzip, bz2, xz and single-file zip archives are recognized by their magic bytes
+    and decompressed on the fly, a chunk at a time.
+
+    ``offset`` always points just past the last line handed out, which lets a
+    chunked import record where to resume. Lines are split on the raw newline byte,
+    so the encoding must be ASCII compatible (UTF-8 is).
+
+    NOTE: For compressed files ``offset`` counts decompressed bytes, so resuming
+    decompresses and skips everything before it instead of seeking.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        file_obj: Any,
+        encoding: str = "utf-8",
+        chunk_size: Optional[int] = None,
+        offset: int = 0,
+        decompress: bool = True,
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            file_obj: File-like object, uploaded file, bytes or string to read from
+            encoding: Text encoding of the file
+            chunk_size: Number of bytes to read at a time
+            offset: Position to start reading from; requires a seekable file
+            decompress: Whether to detect and decompress compressed files
+        """
+        self.file_obj = file_obj
+        self.encoding = encoding
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.offset = offset
+        self.decompress = decompress
+        self.compression: Optional[str] = None
+
+    def _read_chunks(self) -> Iterator[Any]:
+        """
+        Yield chunks of the (decompressed) file from the offset, bytes or text.
+        """
+        if isinstance(self.file_obj, str):
+            yield self.file_obj[self.offset :]
+            return
+
+        if self.decompress:
+            self.compression = detect_compression(self._peek())
+        if self.compression is None:
+            yield from self._read_raw_chunks()
+            return
+
+        # Skip the part of the decompressed data before the offset
+        to_skip = self.offset
+        for chunk in self._read_decompressed_chunks():
+            if to_skip >= len(chunk):
+                to_skip -= len(chunk)
+                continue
+            yield chunk[to_skip:]
+            to_skip = 0
+
+    def _peek(self) -> bytes:
+        """
+        Return the first bytes of the file without consuming them.
+        """
+        return peek_file(self.file_obj, COMPRESSION_HEADER_SIZE)
+
+    def _read_raw_chunks(self) -> Iterator[Any]:
+        """
+        Yield raw chunks of the file from the offset.
+        """
+        if isinstance(self.file_obj, bytes):
+            yield self.file_obj[self.offset :]
+            return
+
+        if self.offset:
+            # UploadedFile.chunks() always rewinds, so read from the offset directly
+            self.file_obj.seek(self.offset)
+        elif hasattr(self.file_obj, "chunks"):
+            yield from self.file_obj.chunks(self.chunk_size)
+            return
+
+        yield from self._read_file(self.file_obj)
+
+    def _read_decompressed_chunks(self) -> Iterator[bytes]:
+        """
+        Yield decompressed chunks of a compressed file from its start.
+        """
+        file_obj = self.file_obj
+        if isinstance(file_obj, bytes):
+            file_obj = io.BytesIO(file_obj)
+        elif hasattr(file_obj, "chunks"):
+            # Match UploadedFile.chunks(), which always starts from the beginning
+            file_obj.seek(0)
+
+        if self.compression == "zip":
+            with zipfile.ZipFile(file_obj) as archive:
+                members = [info for info in archive.infolist() if not info.is_dir()]
+                if len(members) != 1:
+                    raise CSVImportError(
+                        "ZIP archives must contain exactly one CSV file."
+                    )
+                with archive.open(members[0]) as member:
+                    yield from self._read_file(member)
+            return
+
+        if self.compression == "gzip":
+            decompressed = gzip.GzipFile(fileobj=file_obj, mode="rb")
+        elif self.compression == "bz2":
+            decompressed = bz2.BZ2File(file_obj, mode="rb")
+        else:
+            decompressed = lzma.LZMAFile(file_obj, mode="rb")
+        # Closing the decompressor leaves the underlying file open
+        with decompressed:
+            yield from self._read_file(decompressed)
+
+    def _read_file(self, file_obj: Any) -> Iterator[Any]:
+        """
+        Yield chunks read from a file object until it is exhausted.
+        """
+        while True:
+            chunk = file_obj.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def __iter__(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        pending = ""
+        pending_size = 0
+        for chunk in self._read_chunks():
+            is_bytes = isinstance(chunk, bytes)
+            pieces = chunk.split(b"\n" if is_bytes else "\n")
+            # The last piece is an incomplete line until the next chunk arrives
+            tail = pieces.pop()
+            for piece in pieces:
+                line = pending + (decoder.decode(piece) if is_bytes else piece)
+                self.offset += pending_size + len(piece) + 1
+                pending = ""
+                pending_size = 0
+                yield line + "\n"
+            pending += decoder.decode(tail) if is_bytes else tail
+            pending_size += len(tail)
+
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            self.offset += pending_size
+            yield pending
+
+
+def group_rows(
+    rows: Iterable[ImportRow],
+) -> Tuple[Dict[str, ImportRow], Dict[str, ImportRow], Set[Tuple[str, str]]]:
+    """
+    Group rows into the first row of each account and consumer plus their links.
+
+    Args:
+        rows: Validated rows, in file order
+
+    Returns:
+        Tuple of (account data keyed by reference, consumer data keyed by SSN,
+        set of (account reference, SSN) links)
+    """
+    account_data: Dict[str, ImportRow] = {}
+    consumer_data: Dict[str, ImportRow] = {}
+    links: Set[Tuple[str, str]] = set()
+
+    for row in rows:
+        # Use the first occurrence for account and consumer data
+        if row.client_reference_no not in account_data:
+            account_data[row.client_reference_no] = row
+        if row.ssn not in consumer_data:
+            consumer_data[row.ssn] = row
+        links.add((row.client_reference_no, row.ssn))
+
+    return account_data, consumer_data, links
+
+
+def key_by_ssn_index(
+    consumer_data: Dict[str, ImportRow], links: Set[Tuple[str, str]]
+) -> Tuple[Dict[str, ImportRow], Set[Tuple[str, str]]]:
+    """
+    Re-key grouped consumers and links by the blind index of the SSN.
+
+    SSNs are encrypted in the database, so consumers are looked up by blind index.
+
+    Args:
+        consumer_data: First row of each consumer, keyed by SSN
+        links: (account reference, SSN) pairs
+
+    Returns:
+        Tuple of (consumer data keyed by SSN blind index, set of (account
+        reference, SSN blind index) links)
+    """
+    ssn_indexes = {ssn: blind_index(ssn) for ssn in consumer_data}
+    return (
+        {ssn_indexes[ssn]: row for ssn, row in consumer_data.items()},
+        {(ref, ssn_indexes[ssn]) for ref, ssn in links},
+    )
+
+
+def get_linked_ssns(account_ids: Iterable[int], batch_size: int) -> Dict[int, Set[str]]:
+    """
+    Return the SSN blind indexes of the consumers linked to accounts, keyed by
+    account ID.
+    """
+    linked_ssns: Dict[int, Set[str]] = {}
+    for chunk in _chunked(account_ids, batch_size):
+        for account_id, ssn in AccountConsumer.objects.filter(
+            account_id__in=chunk
+        ).values_list("account_id", "consumer__ssn_index"):
+            linked_ssns.setdefault(account_id, set()).add(ssn)
+    return linked_ssns
+
+
+def _merge_stats(*stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add up import statistics key by key.
+    """
+    merged: Dict[str, Any] = {}
+    for item in stats:
+        for key, value in item.items():
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+class BulkAccountWriter:
+    """
+    Writes validated import rows with set-based queries.
+
+    Existing accounts, consumers and account-consumer links are resolved with
+    batched ``IN`` lookups and written with ``bulk_create``/``bulk_update``, so the
+    number of queries grows with the number of batches rather than with the number
+    of rows.
+
+    The writer can be fed the whole file at once or one chunk at a time; it keeps
+    track of the account references it has already written so that the first
+    occurrence of an account in the file wins, as it always has.
+
+    Accounts of the client whose fingerprint (balance, status and consumer SSNs)
+    matches the file are not written at all, so a re-sent file only touches the
+    accounts that actually changed.
+
+    NOTE: An account is compared on the SSNs of its rows in the chunk where it
+    first appears, so an account whose rows are spread over several chunks is
+    rewritten even if it did not change. An account found unchanged that gains a
+    consumer in a later chunk is counted as updated instead.
+    NOTE: Consumers are matched on SSN, through the unique SSN blind index. The first
+    occurrence of an SSN provides the name and address, and existing consumers are
+    never modified.
+    NOTE: Inserts are conflict-safe, so an import of another client writing the
+    same accounts or consumers at the same time cannot make this one fail: an
+    account inserted in the meantime is updated, and consumers and links inserted
+    in the meantime are reused. The statistics then count them as created.
+    NOTE: The balance rollups are updated with each chunk's changes. An account
+    inserted by another import in the meantime is counted as created, so it stays
+    in that import's rollup too until the rollups are rebuilt.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(
+        self,
+        client_id: int,
+        batch_size: Optional[int] = None,
+        checkpoint: Optional[ImportCheckpoint] = None,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            client_id: ID of the client the accounts belong to
+            batch_size: Maximum number of rows per SQL statement
+            checkpoint: Checkpoint of a chunked import. The accounts each chunk
+                writes or finds unchanged are recorded in it, and when resuming
+                (rows were already committed) the accounts recorded by the earlier
+                run are treated as already seen.
+        """
+        self.client_id = client_id
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.checkpoint = checkpoint
+        self.resuming = checkpoint is not None and checkpoint.rows_committed > 0
+
+        # Account reference -> account ID for every account written so far
+        self.account_ids: Dict[str, int] = {}
+        self.accounts_resumed = 0
+        # Account ID -> reference of the accounts counted as unchanged
+        self.unchanged_ids: Dict[int, str] = {}
+
+        self.accounts_created = 0
+        self.accounts_updated = 0
+        self.accounts_unchanged = 0
+        self.consumers_created = 0
+        self.consumer_accounts_linked = 0
+
+    def write(self, rows: Iterable[ImportRow]) -> None:
+        """
+        Write a chunk of rows to the database.
+
+        Args:
+            rows: Validated rows, in file order
+        """
+        self.write_grouped(*group_rows(rows))
+
+    def write_grouped(
+        self,
+        account_data: Dict[str, ImportRow],
+        consumer_data: Dict[str, ImportRow],
+        links: Set[Tuple[str, str]],
+    ) -> None:
+        """
+        Write rows that have already been grouped with group_rows().
+
+        Args:
+            account_data: First row of each account, keyed by reference
+            consumer_data: First row of each consumer, keyed by SSN
+            links: (account reference, SSN) pairs to link
+        """
+        # Accounts written by an earlier chunk keep their first occurrence
+        account_data = {
+            ref: row for ref, row in account_data.items() if ref not in self.account_ids
+        }
+        # From here on SSNs are blind indexes
+        consumer_data, links = key_by_ssn_index(consumer_data, links)
+        ssns_by_ref: Dict[str, Set[str]] = {}
+        for ref, ssn in links:
+            ssns_by_ref.setdefault(ref, set()).add(ssn)
+
+        account_ids, unchanged = self._upsert_accounts(account_data, ssns_by_ref)
+        self.account_ids.update(account_ids)
+        if self.checkpoint is not None:
+            ImportCheckpointAccount.objects.bulk_create(
+                [
+                    ImportCheckpointAccount(
+                        checkpoint=self.checkpoint,
+                        client_reference_no=ref,
+                        unchanged=ref in unchanged,
+                    )
+                    for ref in sorted(account_ids)
+                ],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+
+        # An unchanged fingerprint means the consumers and links already exist
+        links = {(ref, ssn) for ref, ssn in links if ref not in unchanged}
+        linked_ssns = {ssn for _, ssn in links}
+        consumer_ids = self._create_consumers(
+            {ssn: row for ssn, row in consumer_data.items() if ssn in linked_ssns}
+        )
+        linked = self._link_accounts_consumers(
+            {(self.account_ids[ref], consumer_ids[ssn]) for ref, ssn in links}
+        )
+        # Accounts written above already have their new fingerprint; accounts from
+        # earlier chunks that gained a consumer need a new one
+        earlier = linked - set(account_ids.values())
+        self._update_fingerprints(earlier)
+        self._count_changed(earlier)
+
+    def _count_changed(self, account_ids: Set[int]) -> None:
+        """
+        Count accounts of earlier chunks that were unchanged there, and have changed
+        since, as updated.
+        """
+        changed = {
+            account_id: self.unchanged_ids.pop(account_id)
+            for account_id in account_ids
+            if account_id in self.unchanged_ids
+        }
+        self.accounts_unchanged -= len(changed)
+        self.accounts_updated += len(changed)
+        if self.checkpoint is not None:
+            for refs in _chunked(changed.values(), self.batch_size):
+                ImportCheckpointAccount.objects.filter(
+                    checkpoint=self.checkpoint, client_reference_no__in=refs
+                ).update(unchanged=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the import statistics accumulated so far.
+        """
+        return {
+            "accounts_processed": len(self.account_ids) - self.accounts_resumed,
+            "accounts_created": self.accounts_created,
+            "accounts_updated": self.accounts_updated,
+            "accounts_unchanged": self.accounts_unchanged,
+            "consumers_created": self.consumers_created,
+            "consumer_accounts_linked": self.consumer_accounts_linked,
+        }
+
+    def _upsert_accounts(
+        self, account_data: Dict[str, ImportRow], ssns_by_ref: Dict[str, Set[str]]
+    ) -> Tuple[Dict[str, int], Set[str]]:
+        """
+        Create or update accounts.
+
+        Existing accounts of the client whose fingerprint matches the row are left
+        alone.
+
+        Returns:
+            Tuple of (account IDs keyed by reference, references of unchanged
+            accounts). Accounts already seen by the run being resumed are left
+            alone and only added to ``account_ids``.
+        """
+        existing = self._lock_accounts(account_data)
+
+        if self.resuming:
+            # Accounts the resumed run has seen keep their first occurrence
+            seen: Dict[str, bool] = {}
+            for refs in _chunked(existing, self.batch_size):
+                seen.update(
+                    ImportCheckpointAccount.objects.filter(
+                        checkpoint=self.checkpoint, client_reference_no__in=refs
+                    ).values_list("client_reference_no", "unchanged")
+                )
+            for ref, was_unchanged in seen.items():
+                account_id = existing.pop(ref).id
+                self.account_ids[ref] = account_id
+                if was_unchanged:
+                    self.unchanged_ids[account_id] = ref
+            account_data = {
+                ref: row for ref, row in account_data.items() if ref not in seen
+            }
+            self.accounts_resumed += len(seen)
+
+        # Links are only ever added, so an account ends up linked to the consumers
+        # it already has plus the ones in the file, and the fingerprint covers both
+        linked_ssns = get_linked_ssns(
+            (account.id for account in existing.values()), self.batch_size
+        )
+        unchanged = {
+            ref
+            for ref, account in existing.items()
+            if account.client_id == self.client_id
+            and account.fingerprint
+            == compute_account_fingerprint(
+                account_data[ref].balance,
+                account_data[ref].status,
+                ssns_by_ref[ref] | linked_ssns.get(account.id, set()),
+            )
+        }
+
+        to_update = {
+            ref: account for ref, account in existing.items() if ref not in unchanged
+        }
+
+        # bulk_update() bypasses save(), so auto_now has to be applied by hand
+        now = timezone.now()
+        rollups = RollupDeltas()
+        # Rollup deltas come from the locked rows, so an import of another client
+        # moving the same account cannot take it out of the old rollup twice
+        for client_ref, account in to_update.items():
+            row = account_data[client_ref]
+            rollups.remove(account.client_id, account.status, account.balance)
+            rollups.add(self.client_id, row.status, row.balance)
+            account.balance = row.balance
+            account.status = row.status
+            account.client_id = self.client_id
+            account.fingerprint = compute_account_fingerprint(
+                row.balance,
+                row.status,
+                ssns_by_ref[client_ref] | linked_ssns.get(account.id, set()),
+            )
+            account.updated_at = now
+        Account.objects.bulk_update(
+            to_update.values(),
+            ["balance", "status", "client", "fingerprint", "updated_at"],
+            batch_size=self.batch_size,
+        )
+
+        to_create = [
+            Account(
+                client_reference_no=client_ref,
+                balance=row.balance,
+                status=row.status,
+                client_id=self.client_id,
+                fingerprint=compute_account_fingerprint(
+                    row.balance, row.status, ssns_by_ref[client_ref]
+                ),
+            )
+            for client_ref, row in sorted(account_data.items())
+            if client_ref not in existing
+        ]
+        # References are global, so an account may have been created by an import
+        # of another client since it was looked up
+        Account.objects.bulk_create(
+            to_create,
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=["client_reference_no"],
+            update_fields=["balance", "status", "client", "fingerprint", "updated_at"],
+        )
+        for account in to_create:
+            rollups.add(self.client_id, account.status, account.balance)
+        rollups.apply()
+
+        self.accounts_updated += len(to_update)
+        self.accounts_unchanged += len(unchanged)
+        self.accounts_created += len(to_create)
+        self.unchanged_ids.update({existing[ref].id: ref for ref in unchanged})
+
+        # Not every backend returns primary keys from bulk_create()
+        account_ids = {ref: account.id for ref, account in existing.items()}
+        account_ids.update(
+            self._get_account_ids(a.client_reference_no for a in to_create)
+        )
+        return account_ids, unchanged
+
+    def _get_account_ids(self, refs: Iterable[str]) -> Dict[str, int]:
+        """
+        Return account IDs keyed by reference.
+        """
+        account_ids = {}
+        for chunk in _chunked(refs, self.batch_size):
+            account_ids.update(
+                Account.objects.filter(client_reference_no__in=chunk).values_list(
+                    "client_reference_no", "id"
+                )
+            )
+        return account_ids
+
+    def _get_consumer_ids(self, ssn_indexes: Iterable[str]) -> Dict[str, int]:
+        """
+        Return consumer IDs keyed by SSN blind index.
+        """
+        consumer_ids: Dict[str, int] = {}
+        for chunk in _chunked(ssn_indexes, self.batch_size):
+            consumer_ids.update(
+                Consumer.objects.filter(ssn_index__in=chunk).values_list(
+                    "ssn_index", "id"
+                )
+            )
+        return consumer_ids
+
+    def _create_consumers(self, consumer_data: Dict[str, ImportRow]) -> Dict[str, int]:
+        """
+        Create missing consumers and return the IDs of all of them keyed by SSN
+        blind index.
+        """
+        consumer_ids = self._get_consumer_ids(consumer_data)
+
+        to_create = [
+            Consumer(
+                name=row.consumer_name,
+                address=row.consumer_address,
+                ssn=row.ssn,
+                ssn_index=ssn_index,
+            )
+            for ssn_index, row in sorted(consumer_data.items())
+            if ssn_index not in consumer_ids
+        ]
+        Consumer.objects.bulk_create(
+            to_create, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.consumers_created += len(to_create)
+
+        consumer_ids.update(self._get_consumer_ids(c.ssn_index for c in to_create))
+        return consumer_ids
+
+    def _link_accounts_consumers(self, pairs: Set[Tuple[int, int]]) -> Set[int]:
+        """
+        Create the account-consumer links that do not exist yet.
+
+        Returns:
+            IDs of the accounts that were linked to a new consumer
+        """
+        existing = set()
+        for chunk in _chunked({account_id for account_id, _ in pairs}, self.batch_size):
+            existing.update(
+                AccountConsumer.objects.filter(account_id__in=chunk).values_list(
+                    "account_id", "consumer_id"
+                )
+            )
+
+        to_create = [
+            AccountConsumer(account_id=account_id, consumer_id=consumer_id)
+            for account_id, consumer_id in sorted(pairs - existing)
+        ]
+        AccountConsumer.objects.bulk_create(
+            to_create, batch_size=self.batch_size, ignore_conflicts=True
+        )
+        self.consumer_accounts_linked += len(to_create)
+        return {link.account_id for link in to_create}
+
+    def _lock_accounts(self, refs: Iterable[str]) -> Dict[str, Account]:
+        """
+        Return the existing accounts with the given references, locking their rows
+        until the end of the transaction.
+
+        Rows are locked in ID order, so concurrent imports cannot deadlock.
+        """
+        ids: List[int] = []
+        for chunk in _chunked(refs, self.batch_size):
+            ids.extend(
+                Account.objects.filter(client_reference_no__in=chunk).values_list(
+                    "id", flat=True
+                )
+            )
+        existing: Dict[str, Account] = {}
+        for chunk in _chunked(sorted(ids), self.batch_size):
+            # Read again once locked, as the rows may have changed meanwhile
+            for account in (
+                Account.objects.select_for_update().filter(id__in=chunk).order_by("id")
+            ):
+                existing[account.client_reference_no] = account
+        return existing
+
+    def _update_fingerprints(self, account_ids: Set[int]) -> None:
+        """
+        Recompute the fingerprints of accounts from the database, marking them as
+        updated.
+        """
+        now = timezone.now()
+        for chunk in _chunked(account_ids, self.batch_size):
+            ssns = get_linked_ssns(chunk, self.batch_size)
+            accounts = [
+                Account(
+                    id=account_id,
+                    fingerprint=compute_account_fingerprint(
+                        balance, status, ssns.get(account_id, set())
+                    ),
+                    updated_at=now,
+                )
+                for account_id, balance, status in Account.objects.filter(
+                    id__in=chunk
+                ).values_list("id", "balance", "status")
+            ]
+            Account.objects.bulk_update(accounts, ["fingerprint", "updated_at"])
+
+
+class ImportDiff:
+    """
+    Computes what importing rows would change, without writing anything.
+
+    Rows are compared with the current accounts, consumers and account-consumer
+    links using the same batched ``IN`` lookups as BulkAccountWriter, and the same
+    rules: the first occurrence of an account wins and consumers are matched on
+    SSN. The counts match the statistics the import would return.
+
+    NOTE: Like the writer, the diff remembers every account reference, SSN and
+    link it has seen, so memory grows with the number of distinct values.
+    """
+
+    BATCH_SIZE = 5000
+    SAMPLE_SIZE = 100
+
+    def __init__(
+        self,
+        client_id: int,
+        batch_size: Optional[int] = None,
+        sample_size: Optional[int] = None,
+    ):
+        """
+        Initialize the diff.
+
+        Args:
+            client_id: ID of the client the accounts would belong to
+            batch_size: Maximum number of values per lookup query
+            sample_size: Maximum number of account changes to keep as a sample
+        """
+        self.client_id = client_id
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.sample_size = self.SAMPLE_SIZE if sample_size is None else sample_size
+
+        self.seen_refs: Set[str] = set()
+        self.seen_ssns: Set[str] = set()
+        self.seen_links: Set[Tuple[str, str]] = set()
+
+        self.accounts_created = 0
+        self.accounts_updated = 0
+        self.accounts_unchanged = 0
+        self.balances_changed = 0
+        self.statuses_changed = 0
+        self.consumers_created = 0
+        self.consumer_accounts_linked = 0
+        self.changes: List[Dict[str, Any]] = []
+
+    def add(self, rows: Iterable[ImportRow]) -> None:
+        """
+        Compare a chunk of rows with the database.
+
+        Args:
+            rows: Validated rows, in file order
+        """
+        account_data, consumer_data, links = group_rows(rows)
+        # From here on SSNs are blind indexes
+        consumer_data, links = key_by_ssn_index(consumer_data, links)
+
+        account_data = {
+            ref: row for ref, row in account_data.items() if ref not in self.seen_refs
+        }
+        ssns_by_ref: Dict[str, Set[str]] = {}
+        for ref, ssn in links:
+            ssns_by_ref.setdefault(ref, set()).add(ssn)
+        new_refs = self._diff_accounts(account_data, ssns_by_ref)
+        self.seen_refs.update(account_data)
+
+        new_ssns = self._diff_consumers(
+            [ssn for ssn in consumer_data if ssn not in self.seen_ssns]
+        )
+        self.seen_ssns.update(consumer_data)
+
+        self._diff_links(links - self.seen_links, new_refs, new_ssns)
+        self.seen_links |= links
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the diff accumulated so far.
+        """
+        return {
+            "dry_run": True,
+            "accounts_processed": len(self.seen_refs),
+            "accounts_created": self.accounts_created,
+            "accounts_updated": self.accounts_updated,
+            "accounts_unchanged": self.accounts_unchanged,
+            "consumers_created": self.consumers_created,
+            "consumer_accounts_linked": self.consumer_accounts_linked,
+            "balances_changed": self.balances_changed,
+            "statuses_changed": self.statuses_changed,
+            "changes": self.changes,
+        }
+
+    def _diff_accounts(
+        self, account_data: Dict[str, ImportRow], ssns_by_ref: Dict[str, Set[str]]
+    ) -> Set[str]:
+        """
+        Count account creations and changes and return the references to create.
+        """
+        existing: Dict[str, Tuple[Decimal, str, int, str]] = {}
+        account_ids: Dict[str, int] = {}
+        for refs in _chunked(account_data, self.batch_size):
+            for ref, account_id, *values in Account.objects.filter(
+                client_reference_no__in=refs
+            ).values_list(
+                "client_reference_no",
+                "id",
+                "balance",
+                "status",
+                "client_id",
+                "fingerprint",
+            ):
+                existing[ref] = tuple(values)
+                account_ids[ref] = account_id
+        # The import compares the fingerprint with the consumers already linked
+        # plus the ones in the file
+        linked_ssns = get_linked_ssns(account_ids.values(), self.batch_size)
+
+        new_refs = set()
+        for ref, row in account_data.items():
+            # The database keeps two decimal places
+            balance = row.balance.quantize(Decimal("0.01"))
+            if ref not in existing:
+                new_refs.add(ref)
+                self.accounts_created += 1
+                self._sample(ref, "create", balance=(None, balance))
+                continue
+
+            old_balance, old_status, old_client_id, fingerprint = existing[ref]
+            if (
+                old_client_id == self.client_id
+                and fingerprint
+                == compute_account_fingerprint(
+                    row.balance,
+                    row.status,
+                    ssns_by_ref[ref] | linked_ssns.get(account_ids[ref], set()),
+                )
+            ):
+                # The import skips accounts whose fingerprint matches
+                self.accounts_unchanged += 1
+                continue
+
+            self.accounts_updated += 1
+            changes = {}
+            if old_balance != balance:
+                self.balances_changed += 1
+                changes["balance"] = (old_balance, balance)
+            if old_status != row.status:
+                self.statuses_changed += 1
+                changes["status"] = (old_status, row.status)
+            if old_client_id != self.client_id:
+                changes["client_id"] = (old_client_id, self.client_id)
+            if changes:
+                self._sample(ref, "update", **changes)
+        return new_refs
+
+    def _diff_consumers(self, ssns: List[str]) -> Set[str]:
+        """
+        Count consumers to create and return their SSN blind indexes.
+        """
+        existing: Set[str] = set()
+        for chunk in _chunked(ssns, self.batch_size):
+            existing.update(
+                Consumer.objects.filter(ssn_index__in=chunk).values_list(
+                    "ssn_index", flat=True
+                )
+            )
+        new_ssns = set(ssns) - existing
+        self.consumers_created += len(new_ssns)
+        return new_ssns
+
+    def _diff_links(
+        self, links: Set[Tuple[str, str]], new_refs: Set[str], new_ssns: Set[str]
+    ) -> None:
+        """
+        Count account-consumer links that do not exist yet.
+        """
+        # Links to a new account or consumer cannot exist yet
+        to_check = {
+            (ref, ssn)
+            for ref, ssn in links
+            if ref not in new_refs and ssn not in new_ssns
+        }
+        existing = set()
+        for chunk in _chunked({ref for ref, _ in to_check}, self.batch_size):
+            existing.update(
+                AccountConsumer.objects.filter(
+                    account__client_reference_no__in=chunk
+                ).values_list("account__client_reference_no", "consumer__ssn_index")
+            )
+        self.consumer_accounts_linked += len(links) - len(to_check & existing)
+
+    def _sample(self, ref: str, action: str, **changes: Tuple[Any, Any]) -> None:
+        """
+        Keep an account change as part of the sample, if there is room.
+        """
+        if len(self.changes) >= self.sample_size:
+            return
+        self.changes.append(
+            {
+                "client_reference_no": ref,
+                "action": action,
+                "changes": {
+                    field: {
+                        "old": None if old is None else str(old),
+                        "new": str(new),
+                    }
+                    for field, (old, new) in changes.items()
+                },
+            }
+        )
+
+
+def _holding_client_lock(method: Callable) -> Callable:
+    """
+    Run a CSVImportService method while holding the client's import lock.
+
+    Applied outside ``transaction.atomic`` so the lock is held until the
+    transaction has been committed.
+    """
+
+    @wraps(method)
+    def wrapper(self: "CSVImportService", *args: Any, **kwargs: Any) -> Any:
+        with self.client_lock():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class CSVImportService:
     """
     Service for importing data from CSV files.
-    
+
     This service handles the ingestion of CSV data into the system, creating accounts
     and consumers as needed.
-    
-    TODO: Add validation for SSN format and other sensitive fields
+
+    Parquet and Arrow IPC files go through the same pipeline: a columnar reader
+    replaces the CSV reader and validates whole record batches, and the rows feed
+    the same writers.
+
+    Imports of the same client run one at a time: each import holds the client's
+    import lock (see accounts.locks) while it writes. Imports of different clients
+    run concurrently.
+
     TODO: Consider implementing logging of import activities for audit purposes
     NOTE: All operations are wrapped in a transaction to ensure data consistency
     """
 
-    def __init__(self, collection_agency_id: int, client_id: int):
+    # Rows validated together by ColumnBlockValidator
+    BLOCK_SIZE = 2000
+    # Errors collected before the rest of the file is only counted
+    MAX_ERRORS = 1000
+
+    def __init__(
+        self, collection_agency_id: int, client_id: int, lock_client: bool = True
+    ):
         """
         Initialize the CSV import service.
 
         Args:
             collection_agency_id: ID of the collection agency
             client_id: ID of the client
+            lock_client: Hold the client's import lock while importing. Callers
+                that already hold it pass False.
         """
         self.collection_agency_id = collection_agency_id
         self.client_id = client_id
+        self.lock_client = lock_client
+        self.checkpoint: Optional[ImportCheckpoint] = None
+        self.progress: Optional[Callable[[int, int], None]] = None
+        self.rows_parsed = 0
+        self.rows_written = 0
+        self.row_offset: Optional[int] = None
 
         # Validate collection agency and client
         try:
@@ -56,7 +1093,8 @@ class CSVImportService:
                 f"Client with ID {client_id} does not exist or does not belong to the specified collection agency."
             )
 
-    def validate_csv_headers(self, headers: List[str]) -> None:
+    @staticmethod
+    def validate_csv_headers(headers: Optional[List[str]]) -> None:
         """
         Validate that the CSV file has the expected headers.
 
@@ -66,26 +1104,21 @@ class CSVImportService:
         Raises:
             CSVImportError: If headers do not match expected headers
         """
-        expected_headers = [
-            "client reference no",
-            "balance",
-            "status",
-            "consumer name",
-            "consumer address",
-            "ssn",
-        ]
-
         # Check if all expected headers are present
-        missing_headers = set(expected_headers) - set(headers)
+        missing_headers = set(REQUIRED_FIELDS) - set(headers or [])
         if missing_headers:
             raise CSVImportError(
                 f"Missing required CSV headers: {', '.join(missing_headers)}"
             )
 
-    def validate_row_data(self, row_data: Dict[str, str], row_num: int) -> None:
+    @staticmethod
+    def validate_row_data(row_data: Dict[str, str], row_num: int) -> None:
         """
         Validate a single row of data from the CSV file.
 
+        NOTE: Imports validate whole blocks of rows with ColumnBlockValidator; this
+        is the row-by-row equivalent and reports only the first problem.
+
         Args:
             row_data: Dictionary containing row data
             row_num: Row number for error reporting
@@ -94,46 +1127,367 @@ class CSVImportService:
             CSVImportError: If row data is invalid
         """
         # Check if required fields are present and non-empty
-        required_fields = [
-            "client reference no",
-            "balance",
-            "status",
-            "consumer name",
-            "consumer address",
-            "ssn",
-        ]
-        for field in required_fields:
+        for field in REQUIRED_FIELDS:
             if field not in row_data or not row_data[field]:
                 raise CSVImportError(f"Row {row_num}: Missing required field '{field}'")
 
         # Validate status
-        valid_statuses = [
-            Account.STATUS_IN_COLLECTION,
-            Account.STATUS_PAID_IN_FULL,
-            Account.STATUS_INACTIVE,
-        ]
-        if row_data["status"] not in valid_statuses:
+        if row_data["status"] not in VALID_STATUSES:
             raise CSVImportError(
-                f"Row {row_num}: Invalid status '{row_data['status']}'. Must be one of: {', '.join(valid_statuses)}"
+                f"Row {row_num}: Invalid status '{row_data['status']}'. Must be one of: {', '.join(VALID_STATUSES)}"
             )
 
         # Validate balance
-        try:
-            balance = Decimal(row_data["balance"])
-            if balance < 0:
-                raise CSVImportError(f"Row {row_num}: Balance must be non-negative")
-        except (ValueError, InvalidOperation):
+        _, message = check_balance(row_data["balance"])
+        if message:
+            raise CSVImportError(f"Row {row_num}: {message}")
+
+        # Validate SSN
+        if not SSN_PATTERN.fullmatch(row_data["ssn"]):
             raise CSVImportError(
-                f"Row {row_num}: Invalid balance '{row_data['balance']}'. Must be a number."
+                f"Row {row_num}: Invalid SSN format. Must be XXX-XX-XXXX."
             )
 
-    @transaction.atomic
-    def import_csv(self, csv_file_obj: Any) -> Dict[str, Any]:
+    def read_rows(self, file_obj: Any) -> Iterator[ImportRow]:
+        """
+        Open a CSV, Parquet or Arrow IPC file and return its validated rows.
+
+        The format is detected from the content of the file; CSV files may also be
+        compressed (see CSVLineStream).
+
+        Args:
+            file_obj: File object, uploaded file, bytes or string content
+
+        Returns:
+            Iterator over the validated rows, in file order
+
+        Raises:
+            CSVImportError: If the CSV headers are invalid; errors in columnar files
+                and in rows are raised while iterating
+        """
+        if self.is_columnar(file_obj):
+            from .columnar import ColumnarReader
+
+            return self.iter_columnar_rows(ColumnarReader(file_obj))
+
+        csv_reader = csv.reader(CSVLineStream(file_obj))
+        headers = self.read_headers(csv_reader)
+        return self.iter_rows(csv_reader, headers)
+
+    @staticmethod
+    def is_columnar(file_obj: Any) -> bool:
+        """
+        Return whether a file is a Parquet or Arrow IPC file.
+        """
+        from .columnar import detect_columnar_format
+
+        return detect_columnar_format(peek_file(file_obj, 6)) is not None
+
+    def read_headers(self, csv_reader: Iterator[List[str]]) -> List[str]:
+        """
+        Read and validate the header row of a CSV file.
+
+        Args:
+            csv_reader: csv.reader positioned at the start of the file
+
+        Returns:
+            The CSV headers
+
+        Raises:
+            CSVImportError: If headers do not match expected headers
+        """
+        headers = next(csv_reader, None) or []
+        self.validate_csv_headers(headers)
+        return headers
+
+    def iter_rows(
+        self,
+        csv_reader: Iterable[List[str]],
+        headers: List[str],
+        start: int = 2,
+        stream: Optional[CSVLineStream] = None,
+    ) -> Iterator[ImportRow]:
+        """
+        Validate CSV rows lazily, a block at a time, and yield them as import rows.
+
+        Validation does not stop at the first invalid row: rows before it are
+        yielded, the rest of the file is still validated so every error can be
+        reported, and a CSVValidationError is raised at the end.
+
+        Args:
+            csv_reader: csv.reader positioned after the header row
+            headers: The CSV headers
+            start: Row number of the first row (2 accounts for the header)
+            stream: Line stream behind the reader; when given, ``self.row_offset``
+                tracks the offset just past the last row yielded
+
+        Yields:
+            Validated import rows, in file order
+
+        Raises:
+            CSVValidationError: If any row is invalid
+        """
+        return self._iter_validated_rows(
+            self._read_blocks(csv_reader, stream),
+            ColumnBlockValidator(headers).validate,
+            start,
+        )
+
+    def iter_columnar_rows(self, reader: Any) -> Iterator[ImportRow]:
+        """
+        Validate the record batches of a columnar file and yield them as import rows.
+
+        Errors are collected like in iter_rows(); rows are numbered from 1.
+
+        Args:
+            reader: ColumnarReader of the file
+
+        Yields:
+            Validated import rows, in file order
+
+        Raises:
+            CSVValidationError: If any row is invalid
+        """
+        blocks = ((batch, [None] * batch.num_rows) for batch in reader.iter_batches())
+        return self._iter_validated_rows(blocks, reader.validate, 1)
+
+    def _iter_validated_rows(
+        self,
+        blocks: Iterable[Tuple[Any, List[Optional[int]]]],
+        validate: Callable[[Any, int], Tuple[List[Optional[tuple]], List[RowError]]],
+        start: int,
+    ) -> Iterator[ImportRow]:
+        """
+        Validate blocks of rows and yield the valid ones until the first error.
+
+        Args:
+            blocks: (block of rows, offset after each row) pairs, in file order
+            validate: Returns the records and errors of a block, given the block
+                and the number of its first row
+            start: Row number of the first row
+        """
+        errors: List[RowError] = []
+        error_count = 0
+        row_num = start
+
+        for block, offsets in blocks:
+            records, block_errors = validate(block, row_num)
+            row_num += len(records)
+            self.rows_parsed += len(records)
+
+            if not error_count:
+                for record, offset in zip(records, offsets):
+                    if record is None:
+                        break
+                    self.row_offset = offset
+                    yield ImportRow._make(record)
+
+            error_count += len(block_errors)
+            errors.extend(block_errors[: self.MAX_ERRORS - len(errors)])
+
+        if errors:
+            raise CSVValidationError(errors, error_count)
+
+    def _read_blocks(
+        self, csv_reader: Iterable[List[str]], stream: Optional[CSVLineStream]
+    ) -> Iterator[Tuple[List[List[str]], List[Optional[int]]]]:
+        """
+        Yield blocks of non-blank rows with the stream offset after each row.
+        """
+        block: List[List[str]] = []
+        offsets: List[Optional[int]] = []
+        for row in csv_reader:
+            # Skip blank lines, like csv.DictReader does
+            if not row:
+                continue
+            block.append(row)
+            offsets.append(stream.offset if stream else None)
+            if len(block) >= self.BLOCK_SIZE:
+                yield block, offsets
+                block, offsets = [], []
+        if block:
+            yield block, offsets
+
+    def import_csv(
+        self,
+        csv_file_obj: Any,
+        commit_every: Optional[int] = None,
+        checkpoint: Optional[ImportCheckpoint] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
         """
         Import data from a CSV file into the database.
 
+        The file is streamed through validation and written in batches, so memory
+        use does not grow with the size of the file.
+
+        By default the whole file is imported in a single transaction. Passing
+        ``commit_every`` commits every N rows instead and records progress in an
+        ImportCheckpoint (available as ``self.checkpoint``); passing a failed
+        ``checkpoint`` resumes that import from the last committed row.
+
+        Parquet and Arrow IPC files are accepted too (see read_rows()); they are
+        always imported in a single transaction, so ``commit_every`` and
+        ``checkpoint`` only apply to CSV files.
+
+        With ``dry_run`` nothing is written: the file is validated and compared with
+        the database, and the statistics the import would return are returned along
+        with the number of balance and status changes and a sample of the changes.
+
+        NOTE: The writer remembers every account reference it has written, so
+        memory still grows with the number of distinct accounts in the file.
+
+        Args:
+            csv_file_obj: CSV file object (or string content) to read from
+            commit_every: Number of rows per committed chunk
+            checkpoint: Checkpoint of a failed chunked import to resume
+            progress: Called with the number of rows parsed and written so far
+                after every written batch. In chunked mode it runs inside the
+                chunk's transaction, so anything it writes is committed with it.
+            dry_run: Report what the import would change instead of importing
+
+        Returns:
+            Dictionary with import statistics (or the diff, for a dry run)
+
+        Raises:
+            CSVImportError: If there is an error importing the CSV data
+        """
+        self.progress = progress
+        if dry_run:
+            return self._diff_csv(csv_file_obj)
+        with self.client_lock():
+            return self._import(csv_file_obj, commit_every, checkpoint)
+
+    def _import(
+        self,
+        csv_file_obj: Any,
+        commit_every: Optional[int],
+        checkpoint: Optional[ImportCheckpoint],
+    ) -> Dict[str, Any]:
+        """
+        Import a file, in a single transaction or in committed chunks.
+        """
+        if checkpoint is None and (
+            commit_every is None or self.is_columnar(csv_file_obj)
+        ):
+            return self._import_atomic(csv_file_obj)
+
+        if checkpoint is None:
+            checkpoint = ImportCheckpoint.objects.create(
+                client=self.client,
+                file_name=getattr(csv_file_obj, "name", None) or "",
+                commit_every=commit_every,
+            )
+        elif checkpoint.client_id != self.client.id:
+            raise CSVImportError(
+                f"Checkpoint {checkpoint.id} does not belong to client {self.client.id}."
+            )
+        elif checkpoint.status == ImportCheckpoint.STATUS_COMPLETED:
+            raise CSVImportError(f"Import {checkpoint.id} has already completed.")
+
+        self.checkpoint = checkpoint
+        try:
+            return self._import_in_chunks(csv_file_obj, checkpoint)
+        except Exception as e:
+            # Only the chunk that failed is rolled back; the checkpoint keeps the rest
+            ImportCheckpoint.objects.filter(id=checkpoint.id).update(
+                status=ImportCheckpoint.STATUS_FAILED, error=str(e)
+            )
+            if isinstance(e, CSVImportError):
+                raise
+            raise CSVImportError(f"Error importing CSV: {str(e)}")
+
+    @contextmanager
+    def client_lock(self) -> Iterator[None]:
+        """
+        Hold the client's import lock, unless ``lock_client`` is False.
+
+        Raises:
+            CSVImportError: If another import of the client holds the lock for
+                longer than IMPORT_LOCK_TIMEOUT
+        """
+        if not self.lock_client:
+            yield
+            return
+        lock = ClientImportLock(self.client.id)
+        try:
+            lock.acquire()
+        except ImportLockTimeout as e:
+            raise CSVImportError(str(e))
+        try:
+            yield
+        finally:
+            lock.release()
+
+    @write_transaction()
+    def _import_atomic(self, csv_file_obj: Any) -> Dict[str, Any]:
+        """
+        Import a whole CSV file in a single transaction.
+        """
+        try:
+            # Stream the file instead of reading it into memory
+            rows = self.read_rows(csv_file_obj)
+
+            # Rows flow through validation and are written one batch at a time
+            writer = BulkAccountWriter(self.client.id)
+            for rows in _chunked(rows, writer.batch_size):
+                writer.write(rows)
+                self._report_progress(len(rows))
+
+            stats = writer.get_stats()
+            self._bump_data_generation(stats)
+            return stats
+
+        except Exception as e:
+            # Rollback the transaction on any error
+            transaction.set_rollback(True)
+            if isinstance(e, CSVImportError):
+                raise
+            raise CSVImportError(f"Error importing CSV: {str(e)}")
+
+    def _diff_csv(self, csv_file_obj: Any) -> Dict[str, Any]:
+        """
+        Compare a whole CSV file with the database without writing anything.
+        """
+        try:
+            rows = self.read_rows(csv_file_obj)
+
+            diff = ImportDiff(self.client.id)
+            for rows in _chunked(rows, diff.batch_size):
+                diff.add(rows)
+                self._report_progress(len(rows))
+
+            return diff.get_stats()
+
+        except Exception as e:
+            if isinstance(e, CSVImportError):
+                raise
+            raise CSVImportError(f"Error importing CSV: {str(e)}")
+
+    def import_csv_parallel(
+        self,
+        file_path: str,
+        workers: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import a CSV file on disk, parsing and validating it on several cores.
+
+        The file is split into byte ranges that are parsed and validated in a
+        process pool; the merged rows are then written by a single writer in one
+        transaction. First-occurrence-wins holds across partitions. The client's
+        lock and the transaction are only taken for the write, so other imports
+        are not held up while the file is parsed.
+
+        NOTE: The merged rows of the whole file are held in memory before writing,
+        and quoted fields must not contain line breaks.
+
         Args:
-            csv_file_obj: CSV file object to read from
+            file_path: Path of the uncompressed CSV file
+            workers: Number of worker processes (defaults to the number of CPUs)
+            progress: Called with the number of rows parsed and written once the
+                rows are written
 
         Returns:
             Dictionary with import statistics
@@ -141,114 +1495,86 @@ class CSVImportService:
         Raises:
             CSVImportError: If there is an error importing the CSV data
         """
+        self.progress = progress
         try:
-            # Try to determine if we have a file-like object or raw text
-            if hasattr(csv_file_obj, "read"):
-                # If file-like object, read content
-                csv_content = csv_file_obj.read()
-                if isinstance(csv_content, bytes):
-                    csv_content = csv_content.decode("utf-8")
-            else:
-                # Assuming it's already a string
-                csv_content = csv_file_obj
-
-            # Create CSV reader from string content
-            csv_reader = csv.DictReader(io.StringIO(csv_content))
-
-            # Validate CSV headers
-            self.validate_csv_headers(csv_reader.fieldnames)
-
-            # Statistics counters
-            account_refs_processed = set()
-            accounts_created = 0
-            accounts_updated = 0
-            consumers_created = 0
-            consumer_accounts_linked = 0
-
-            # Track account references to create or update
-            account_data = {}
-            consumer_data = {}
-            account_consumer_links = []
-
-            # Process each row in the CSV
-            for row_num, row in enumerate(
-                csv_reader, start=2
-            ):  # Start from 2 to account for headers
-                # Validate row data
-                self.validate_row_data(row, row_num)
-
-                # Process account data (we may see the same account reference multiple times)
-                client_ref = row["client reference no"]
-                account_refs_processed.add(client_ref)
-
-                # Track account data (use the first occurrence for account data)
-                if client_ref not in account_data:
-                    account_data[client_ref] = {
-                        "balance": Decimal(row["balance"]),
-                        "status": row["status"],
-                        "client_id": self.client.id,
-                    }
+            account_data, consumer_data, links, row_count = parse_csv_in_parallel(
+                file_path, workers
+            )
+        except CSVImportError:
+            raise
+        except Exception as e:
+            raise CSVImportError(f"Error importing CSV: {str(e)}")
+        self.rows_parsed = row_count
+        return self._write_grouped(account_data, consumer_data, links, row_count)
 
-                # Process consumer data
-                consumer_key = (
-                    row["consumer name"],
-                    row["consumer address"],
-                    row["ssn"],
-                )
-                if consumer_key not in consumer_data:
-                    consumer_data[consumer_key] = {
-                        "name": row["consumer name"],
-                        "address": row["consumer address"],
-                        "ssn": row["ssn"],
-                    }
+    @_holding_client_lock
+    @write_transaction()
+    def _write_grouped(
+        self,
+        account_data: Dict[str, ImportRow],
+        consumer_data: Dict[str, ImportRow],
+        links: Set[Tuple[str, str]],
+        row_count: int,
+    ) -> Dict[str, Any]:
+        """
+        Write rows grouped by parse_csv_in_parallel() in a single transaction.
+        """
+        try:
+            writer = BulkAccountWriter(self.client.id)
+            writer.write_grouped(account_data, consumer_data, links)
+            self._report_progress(row_count)
+            stats = writer.get_stats()
+            self._bump_data_generation(stats)
+            return stats
 
-                # Track account-consumer link
-                account_consumer_links.append((client_ref, consumer_key))
-
-            # Process accounts (create or update)
-            for client_ref, data in account_data.items():
-                account, created = Account.objects.update_or_create(
-                    client_reference_no=client_ref,
-                    defaults={
-                        "balance": data["balance"],
-                        "status": data["status"],
-                        "client_id": data["client_id"],
-                    },
-                )
-                if created:
-                    accounts_created += 1
-                else:
-                    accounts_updated += 1
-
-            # Process consumers (create only if they don't exist)
-            for consumer_key, data in consumer_data.items():
-                consumer, created = Consumer.objects.get_or_create(
-                    ssn=data["ssn"],
-                    defaults={"name": data["name"], "address": data["address"]},
-                )
-                if created:
-                    consumers_created += 1
+        except Exception as e:
+            # Rollback the transaction on any error
+            transaction.set_rollback(True)
+            if isinstance(e, CSVImportError):
+                raise
+            raise CSVImportError(f"Error importing CSV: {str(e)}")
 
-            # Link accounts and consumers
-            for client_ref, consumer_key in account_consumer_links:
-                account = Account.objects.get(client_reference_no=client_ref)
-                consumer = Consumer.objects.get(ssn=consumer_data[consumer_key]["ssn"])
+    @_holding_client_lock
+    @write_transaction()
+    def import_csv_staged(
+        self,
+        csv_file_obj: Any,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import a CSV file through a temporary staging table.
 
-                # Create the link if it doesn't exist
-                link, created = AccountConsumer.objects.get_or_create(
-                    account=account, consumer=consumer
-                )
-                if created:
-                    consumer_accounts_linked += 1
-
-            # Return statistics
-            return {
-                "accounts_processed": len(account_refs_processed),
-                "accounts_created": accounts_created,
-                "accounts_updated": accounts_updated,
-                "consumers_created": consumers_created,
-                "consumer_accounts_linked": consumer_accounts_linked,
-            }
+        Validated rows are streamed into the staging table (COPY on PostgreSQL,
+        executemany elsewhere) and merged into accounts, consumers and links with a
+        handful of set-based statements. This is the fastest path for very large
+        files; the result and statistics match import_csv().
+
+        Args:
+            csv_file_obj: CSV file object (or string content) to read from
+            progress: Called with the number of rows parsed and written once the
+                rows are merged
+
+        Returns:
+            Dictionary with import statistics
+
+        Raises:
+            CSVImportError: If there is an error importing the CSV data
+        """
+        from .staging import StagingTableImporter
+
+        self.progress = progress
+        try:
+            rows = self.read_rows(csv_file_obj)
+
+            importer = StagingTableImporter(self.client.id)
+            importer.create_table()
+            importer.load(rows)
+            stats = importer.merge()
+            importer.drop_table()
+
+            self._report_progress(importer.rows_loaded)
+            self._bump_data_generation(stats)
+            return stats
 
         except Exception as e:
             # Rollback the transaction on any error
@@ -257,9 +1583,82 @@ class CSVImportService:
                 raise
             raise CSVImportError(f"Error importing CSV: {str(e)}")
 
+    def _import_in_chunks(
+        self, csv_file_obj: Any, checkpoint: ImportCheckpoint
+    ) -> Dict[str, Any]:
+        """
+        Import a CSV file committing every ``checkpoint.commit_every`` rows.
+        """
+        resuming = checkpoint.byte_offset > 0
+        stream = CSVLineStream(csv_file_obj, offset=checkpoint.byte_offset)
+
+        csv_reader = csv.reader(stream)
+        if resuming:
+            # Skip straight past the committed rows; the header was saved earlier
+            headers = checkpoint.headers
+        else:
+            headers = self.read_headers(csv_reader)
+            checkpoint.headers = headers
+
+        previous_stats = checkpoint.stats if resuming else {}
+        writer = BulkAccountWriter(self.client.id, checkpoint=checkpoint)
+        self.rows_parsed = self.rows_written = checkpoint.rows_committed
+        rows = self.iter_rows(
+            csv_reader, headers, start=checkpoint.rows_committed + 2, stream=stream
+        )
+
+        for chunk in _chunked(rows, checkpoint.commit_every):
+            with write_transaction():
+                writer.write(chunk)
+                self._report_progress(len(chunk))
+                self._bump_data_generation(writer.get_stats())
+                checkpoint.rows_committed += len(chunk)
+                checkpoint.byte_offset = self.row_offset
+                checkpoint.stats = _merge_stats(previous_stats, writer.get_stats())
+                checkpoint.status = ImportCheckpoint.STATUS_IN_PROGRESS
+                checkpoint.error = ""
+                checkpoint.save()
+
+        checkpoint.stats = _merge_stats(previous_stats, writer.get_stats())
+        checkpoint.status = ImportCheckpoint.STATUS_COMPLETED
+        checkpoint.error = ""
+        checkpoint.save()
+        return checkpoint.stats
+
+    def _bump_data_generation(self, stats: Dict[str, Any]) -> None:
+        """
+        Invalidate the cached account lists if the import wrote anything.
+
+        Called inside the import's transaction, so the new generation becomes
+        visible together with the data.
+        """
+        if any(
+            stats.get(key)
+            for key in (
+                "accounts_created",
+                "accounts_updated",
+                "consumers_created",
+                "consumer_accounts_linked",
+            )
+        ):
+            bump_data_generation([self.client.id])
+
+    def _report_progress(self, rows_written: int) -> None:
+        """
+        Count written rows and notify the progress callback, if any.
+        """
+        self.rows_written += rows_written
+        if self.progress:
+            self.progress(self.rows_parsed, self.rows_written)
+
     @classmethod
     def process_csv_file(
-        cls, file_obj: Any, collection_agency_id: int, client_id: int
+        cls,
+        file_obj: Any,
+        collection_agency_id: int,
+        client_id: int,
+        commit_every: Optional[int] = None,
+        dry_run: bool = False,
     ) -> Dict[str, Any]:
         """
         Process a CSV file and import its data.
@@ -268,9 +1667,33 @@ class CSVImportService:
             file_obj: CSV file object
             collection_agency_id: ID of the collection agency
             client_id: ID of the client
+            commit_every: Commit every N rows instead of all at once
+            dry_run: Report what the import would change instead of importing
 
         Returns:
             Dictionary with import statistics
         """
         service = cls(collection_agency_id, client_id)
-        return service.import_csv(file_obj)
+        return service.import_csv(file_obj, commit_every=commit_every, dry_run=dry_run)
+
+    @classmethod
+    def resume_csv_file(cls, file_obj: Any, checkpoint_id: int) -> Dict[str, Any]:
+        """
+        Resume a failed chunked import of a CSV file.
+
+        Args:
+            file_obj: The same CSV file that was originally imported
+            checkpoint_id: ID of the ImportCheckpoint of the failed import
+
+        Returns:
+            Dictionary with import statistics for the whole file
+        """
+        try:
+            checkpoint = ImportCheckpoint.objects.select_related("client").get(
+                id=checkpoint_id
+            )
+        except ImportCheckpoint.DoesNotExist:
+            raise CSVImportError(f"Import checkpoint {checkpoint_id} does not exist.")
+
+        service = cls(checkpoint.client.collection_agency_id, checkpoint.client_id)
+        return service.import_csv(file_obj, checkpoint=checkpoint)
@@ -0,0 +1,415 @@
+import csv
+import io
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from django.db import connections
+from django.utils import timezone
+
+from .crypto import blind_index, encrypt
+from .models import (
+    Account,
+    AccountConsumer,
+    Consumer,
+    RollupDeltas,
+    compute_account_fingerprint,
+)
+from .services import ImportRow, _chunked
+
+
+class StagingTableImporter:
+    """
+    Imports rows by bulk-loading them into a temporary staging table and merging
+    them into the account tables with set-based SQL.
+
+    Rows are loaded with ``COPY`` on PostgreSQL and with multi-row ``executemany``
+    elsewhere (SQLite). The merge applies the same rules as BulkAccountWriter: the
+    first occurrence of an account provides its data, consumers are matched on SSN
+    and never modified, and only missing account-consumer links are created.
+
+    SSNs are encrypted and given their blind index while they are loaded, so the
+    merge matches consumers on the blind index.
+
+    Like BulkAccountWriter, accounts of the client whose fingerprint matches the
+    file are left alone and counted as unchanged, and written accounts get their
+    new fingerprint. Both take a pass over the staged rows in Python, as the
+    fingerprint is a hash computed by compute_account_fingerprint().
+
+    NOTE: Must be used inside a transaction; the staging table only lives for the
+    duration of the import.
+    """
+
+    TABLE = "accounts_import_staging"
+    COLUMNS = [
+        "row_num",
+        "client_reference_no",
+        "balance",
+        "status",
+        "consumer_name",
+        "consumer_address",
+        "ssn",
+        "ssn_index",
+    ]
+    UNCHANGED_TABLE = "accounts_import_unchanged"
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self, client_id: int, using: str = "default"):
+        """
+        Initialize the importer.
+
+        Args:
+            client_id: ID of the client the accounts belong to
+            using: Alias of the database to import into
+        """
+        self.client_id = client_id
+        self.connection = connections[using]
+        self.rows_loaded = 0
+
+    def _quote(self, name: str) -> str:
+        return self.connection.ops.quote_name(name)
+
+    def create_table(self) -> None:
+        """
+        Create an empty staging table.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.UNCHANGED_TABLE}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.UNCHANGED_TABLE} ("
+                "client_reference_no varchar(255) NOT NULL PRIMARY KEY)"
+            )
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.TABLE} ("
+                "row_num bigint NOT NULL, "
+                "client_reference_no varchar(255) NOT NULL, "
+                "balance numeric(12, 2) NOT NULL, "
+                "status varchar(20) NOT NULL, "
+                "consumer_name varchar(255) NOT NULL, "
+                "consumer_address text NOT NULL, "
+                "ssn varchar(255) NOT NULL, "
+                "ssn_index varchar(32) NOT NULL)"
+            )
+
+    def drop_table(self) -> None:
+        """
+        Drop the staging table.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.TABLE}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.UNCHANGED_TABLE}")
+
+    def load(self, rows: Iterable[ImportRow]) -> int:
+        """
+        Bulk-load validated rows into the staging table.
+
+        May be called several times before merge(). Every row's SSN is encrypted,
+        though only the first row of each SSN is inserted as a consumer.
+
+        Args:
+            rows: Validated rows, in file order
+
+        Returns:
+            Number of rows loaded
+        """
+        numbered = (
+            (row_num,) + tuple(row[:-1]) + (encrypt(row.ssn), blind_index(row.ssn))
+            for row_num, row in enumerate(rows, start=self.rows_loaded)
+        )
+        for batch in _chunked(numbered, self.LOAD_BATCH_SIZE):
+            if self.connection.vendor == "postgresql":
+                self._copy_batch(batch)
+            else:
+                self._insert_batch(batch)
+            self.rows_loaded += len(batch)
+        return self.rows_loaded
+
+    def _copy_batch(self, batch: List[tuple]) -> None:
+        """
+        Load a batch of rows with COPY.
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(batch)
+        sql = (
+            f"COPY {self.TABLE} ({', '.join(self.COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)"
+        )
+        with self.connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, "copy_expert"):
+                # psycopg2
+                buffer.seek(0)
+                raw_cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def _insert_batch(self, batch: List[tuple]) -> None:
+        """
+        Load a batch of rows with a multi-row executemany.
+        """
+        ops = self.connection.ops
+        params = [
+            (
+                row_num,
+                ref,
+                ops.adapt_decimalfield_value(balance, 12, 2),
+                status,
+                name,
+                address,
+                ssn,
+                ssn_index,
+            )
+            for row_num, ref, balance, status, name, address, ssn, ssn_index in batch
+        ]
+        placeholders = ", ".join(["%s"] * len(self.COLUMNS))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.TABLE} ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({placeholders})",
+                params,
+            )
+
+    def merge(self) -> Dict[str, Any]:
+        """
+        Merge the staging table into accounts, consumers and their links.
+
+        Returns:
+            Dictionary with import statistics, as returned by CSVImportService
+        """
+        account_table = self._quote(Account._meta.db_table)
+        consumer_table = self._quote(Consumer._meta.db_table)
+        link_table = self._quote(AccountConsumer._meta.db_table)
+        now = self.connection.ops.adapt_datetimefield_value(timezone.now())
+
+        with self.connection.cursor() as cursor:
+            # Indexes are cheaper to build once all the data is in
+            cursor.execute(
+                f"CREATE INDEX {self.TABLE}_ref ON {self.TABLE} (client_reference_no)"
+            )
+            cursor.execute(
+                f"CREATE INDEX {self.TABLE}_ssn_index ON {self.TABLE} (ssn_index)"
+            )
+
+            cursor.execute(
+                f"SELECT COUNT(DISTINCT client_reference_no) FROM {self.TABLE}"
+            )
+            accounts_processed = cursor.fetchone()[0]
+            cursor.execute(
+                f"SELECT COUNT(DISTINCT s.client_reference_no) FROM {self.TABLE} s "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {account_table} a "
+                "WHERE a.client_reference_no = s.client_reference_no)"
+            )
+            accounts_created = cursor.fetchone()[0]
+            accounts_unchanged = self._find_unchanged(cursor)
+
+            # The merge changes the rollups by the totals of the merged accounts
+            # after it minus their totals before it. The existing accounts are
+            # locked first, so an import of another client cannot move them in
+            # between and take them out of the old rollups too
+            self._lock_accounts(cursor)
+            rollups = RollupDeltas()
+            for client_id, status, count, balance in self._account_totals(cursor):
+                rollups.remove(client_id, status, balance, count)
+
+            # The first occurrence of each account provides its data. Fingerprints
+            # are computed once the links are in
+            cursor.execute(
+                f"INSERT INTO {account_table} "
+                "(client_reference_no, balance, status, client_id, fingerprint, "
+                "created_at, updated_at) "
+                "SELECT s.client_reference_no, s.balance, s.status, %s, '', %s, %s "
+                f"FROM {self.TABLE} s "
+                "WHERE s.row_num IN ("
+                f"SELECT MIN(row_num) FROM {self.TABLE} GROUP BY client_reference_no) "
+                "AND s.client_reference_no NOT IN ("
+                f"SELECT client_reference_no FROM {self.UNCHANGED_TABLE}) "
+                "ON CONFLICT (client_reference_no) DO UPDATE SET "
+                "balance = excluded.balance, status = excluded.status, "
+                "client_id = excluded.client_id, fingerprint = '', "
+                "updated_at = excluded.updated_at",
+                [self.client_id, now, now],
+            )
+            for client_id, status, count, balance in self._account_totals(cursor):
+                rollups.add(client_id, status, balance, count)
+            rollups.apply()
+
+            cursor.execute(
+                f"INSERT INTO {consumer_table} "
+                "(name, address, ssn, ssn_index, created_at, updated_at) "
+                "SELECT s.consumer_name, s.consumer_address, s.ssn, s.ssn_index, %s, %s "
+                f"FROM {self.TABLE} s "
+                "WHERE s.row_num IN ("
+                f"SELECT MIN(row_num) FROM {self.TABLE} GROUP BY ssn_index) "
+                f"AND NOT EXISTS (SELECT 1 FROM {consumer_table} c "
+                "WHERE c.ssn_index = s.ssn_index) "
+                # Another import may insert the same consumers concurrently
+                "ON CONFLICT (ssn_index) DO NOTHING",
+                [now, now],
+            )
+            consumers_created = cursor.rowcount
+
+            cursor.execute(
+                f"INSERT INTO {link_table} (account_id, consumer_id, created_at) "
+                "SELECT pairs.account_id, pairs.consumer_id, %s FROM ("
+                "SELECT DISTINCT a.id AS account_id, c.id AS consumer_id "
+                f"FROM {self.TABLE} s JOIN {account_table} a "
+                "ON a.client_reference_no = s.client_reference_no "
+                f"JOIN {consumer_table} c ON c.ssn_index = s.ssn_index"
+                ") pairs "
+                f"WHERE NOT EXISTS (SELECT 1 FROM {link_table} l "
+                "WHERE l.account_id = pairs.account_id "
+                "AND l.consumer_id = pairs.consumer_id) "
+                "ON CONFLICT (account_id, consumer_id) DO NOTHING",
+                [now],
+            )
+            consumer_accounts_linked = cursor.rowcount
+
+            self._update_fingerprints(cursor)
+
+        return {
+            "accounts_processed": accounts_processed,
+            "accounts_created": accounts_created,
+            "accounts_updated": accounts_processed
+            - accounts_created
+            - accounts_unchanged,
+            "accounts_unchanged": accounts_unchanged,
+            "consumers_created": consumers_created,
+            "consumer_accounts_linked": consumer_accounts_linked,
+        }
+
+    def _lock_accounts(self, cursor: Any) -> None:
+        """
+        Lock the existing accounts with a reference in the staging table, in ID
+        order, until the end of the transaction.
+
+        NOTE: SQLite has no row locks; the import holds the database's write lock
+        instead
+        """
+        if not self.connection.features.has_select_for_update:
+            return
+        account_table = self._quote(Account._meta.db_table)
+        cursor.execute(
+            f"SELECT a.id FROM {account_table} a WHERE a.client_reference_no IN ("
+            f"SELECT client_reference_no FROM {self.TABLE}) ORDER BY a.id FOR UPDATE"
+        )
+        cursor.fetchall()
+
+    def _account_totals(self, cursor: Any) -> List[tuple]:
+        """
+        Return (client ID, status, count, total balance) of the existing accounts
+        with a reference in the staging table.
+        """
+        account_table = self._quote(Account._meta.db_table)
+        cursor.execute(
+            "SELECT a.client_id, a.status, COUNT(*), SUM(a.balance) "
+            f"FROM {account_table} a WHERE a.client_reference_no IN ("
+            f"SELECT client_reference_no FROM {self.TABLE}) "
+            "GROUP BY a.client_id, a.status"
+        )
+        return cursor.fetchall()
+
+    def _find_unchanged(self, cursor: Any) -> int:
+        """
+        Record the existing accounts of the client whose fingerprint matches their
+        staged rows in the unchanged table.
+
+        Returns:
+            Number of unchanged accounts
+        """
+        account_table = self._quote(Account._meta.db_table)
+        consumer_table = self._quote(Consumer._meta.db_table)
+        link_table = self._quote(AccountConsumer._meta.db_table)
+        # The fingerprint covers the consumers already linked to the account as
+        # well as the staged ones; their rows come after the staged rows of the
+        # account, so the balance and status still come from its first staged row
+        cursor.execute(
+            "SELECT client_reference_no, balance, status, ssn_index, fingerprint "
+            "FROM ("
+            "SELECT s.client_reference_no, s.balance, s.status, s.ssn_index, "
+            "a.fingerprint, 0 AS source, s.row_num "
+            f"FROM {self.TABLE} s JOIN {account_table} a "
+            "ON a.client_reference_no = s.client_reference_no "
+            "WHERE a.client_id = %s AND a.fingerprint <> '' "
+            "UNION ALL "
+            "SELECT a.client_reference_no, NULL, NULL, c.ssn_index, a.fingerprint, "
+            "1, 0 "
+            f"FROM {account_table} a "
+            f"JOIN {link_table} l ON l.account_id = a.id "
+            f"JOIN {consumer_table} c ON c.id = l.consumer_id "
+            "WHERE a.client_id = %s AND a.fingerprint <> '' "
+            "AND a.client_reference_no IN ("
+            f"SELECT client_reference_no FROM {self.TABLE})"
+            ") merged ORDER BY client_reference_no, source, row_num",
+            [self.client_id, self.client_id],
+        )
+        unchanged = (
+            (ref,)
+            for ref, balance, status, ssn_indexes, fingerprint in _group_rows(cursor)
+            if fingerprint == compute_account_fingerprint(balance, status, ssn_indexes)
+        )
+        count = 0
+        with self.connection.cursor() as insert_cursor:
+            for batch in _chunked(unchanged, self.LOAD_BATCH_SIZE):
+                insert_cursor.executemany(
+                    f"INSERT INTO {self.UNCHANGED_TABLE} (client_reference_no) "
+                    "VALUES (%s)",
+                    batch,
+                )
+                count += len(batch)
+        return count
+
+    def _update_fingerprints(self, cursor: Any) -> None:
+        """
+        Compute the fingerprints of the merged accounts from the database.
+        """
+        account_table = self._quote(Account._meta.db_table)
+        consumer_table = self._quote(Consumer._meta.db_table)
+        link_table = self._quote(AccountConsumer._meta.db_table)
+        cursor.execute(
+            "SELECT a.id, a.balance, a.status, c.ssn_index, a.fingerprint "
+            f"FROM {account_table} a "
+            f"JOIN {link_table} l ON l.account_id = a.id "
+            f"JOIN {consumer_table} c ON c.id = l.consumer_id "
+            "WHERE a.client_reference_no IN ("
+            f"SELECT client_reference_no FROM {self.TABLE}) "
+            "AND a.client_reference_no NOT IN ("
+            f"SELECT client_reference_no FROM {self.UNCHANGED_TABLE}) "
+            "ORDER BY a.id",
+        )
+        # Read every fingerprint before writing: updating the table while its
+        # SELECT is still being fetched could skip or repeat rows
+        accounts = [
+            Account(
+                id=account_id,
+                fingerprint=compute_account_fingerprint(balance, status, ssn_indexes),
+            )
+            for account_id, balance, status, ssn_indexes, _ in _group_rows(cursor)
+        ]
+        for batch in _chunked(accounts, self.LOAD_BATCH_SIZE):
+            Account.objects.using(self.connection.alias).bulk_update(
+                batch, ["fingerprint"]
+            )
+
+
+def _group_rows(cursor: Any) -> Iterator[Tuple[Any, Decimal, str, Set[str], Any]]:
+    """
+    Group (key, balance, status, SSN index, extra) rows sorted by key, yielding
+    the balance, status and extra value of each key's first row with the SSN
+    indexes of all of them.
+    """
+    group = None
+    while True:
+        rows = cursor.fetchmany(StagingTableImporter.LOAD_BATCH_SIZE)
+        for key, balance, status, ssn_index, extra in rows:
+            if group is None or group[0] != key:
+                if group is not None:
+                    yield group
+                # SQLite returns the staged numeric balances as floats
+                group = (key, Decimal(str(balance)), status, set(), extra)
+            group[3].add(ssn_index)
+        if not rows:
+            break
+    if group is not None:
+        yield group
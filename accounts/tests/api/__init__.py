@@ -1 +1,13 @@
 from accounts.tests.api.test_account_api import AccountsAPITest
+from accounts.tests.api.test_import_jobs_api import ImportJobAPITest
+from accounts.tests.api.test_upload_dedupe_api import UploadDedupeAPITest
+from accounts.tests.api.test_account_list_cache import AccountListCacheTest
+from accounts.tests.api.test_account_etag import AccountETagTest
+from accounts.tests.api.test_account_values_serializer import (
+    AccountValuesSerializerTest,
+)
+from accounts.tests.api.test_account_sparse_fields import AccountSparseFieldsTest
+from accounts.tests.api.test_account_export import AccountExportTest
+from accounts.tests.api.test_stats_api import StatsAPITest
+from accounts.tests.api.test_account_count import AccountCountTest
+from accounts.tests.api.test_account_async import AccountAsyncViewsTest
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -119,6 +121,58 @@ class AccountsAPITest(TestCase):
         self.assertIn("REF001", client_refs)
         self.assertIn("REF002", client_refs)
 
+    def _filter_refs(self, consumer_name):
+        response = self.client.get(
+            reverse("account-list"), {"consumer_name": consumer_name}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(
+            account["client_reference_no"] for account in response.data["results"]
+        )
+
+    def test_filter_by_consumer_name_partial_match(self):
+        """Test that consumer names match anywhere, ignoring case."""
+        self.assertEqual(self._filter_refs("OHN D"), ["REF001", "REF002"])
+        self.assertEqual(self._filter_refs("smith"), ["REF003"])
+        # Values too short for the trigram index still match
+        self.assertEqual(self._filter_refs("jA"), ["REF003"])
+        self.assertEqual(self._filter_refs("e"), ["REF001", "REF002", "REF003"])
+        self.assertEqual(self._filter_refs("Johnny"), [])
+
+    def test_filter_by_consumer_name_special_characters(self):
+        """Test that quotes and LIKE wildcards are matched literally."""
+        consumer = Consumer.objects.create(
+            name='Ann "100%_off" Lee', address="1 Elm St", ssn="555-55-5555"
+        )
+        AccountConsumer.objects.create(account=self.account3, consumer=consumer)
+
+        self.assertEqual(self._filter_refs('"100%_'), ["REF003"])
+        self.assertEqual(self._filter_refs("0%_o"), ["REF003"])
+        self.assertEqual(self._filter_refs("Ann%Lee"), [])
+
+    def test_filter_by_consumer_name_without_duplicates(self):
+        """Test that accounts with several matching consumers are listed once."""
+        consumer = Consumer.objects.create(
+            name="Johnny Doe", address="1 Elm St", ssn="555-55-5555"
+        )
+        AccountConsumer.objects.create(account=self.account1, consumer=consumer)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self._filter_refs("doe"), ["REF001", "REF002"])
+        self.assertFalse(
+            any("DISTINCT" in query["sql"] for query in context.captured_queries)
+        )
+
+    def test_filter_by_consumer_name_follows_changes(self):
+        """Test that the name search index follows renamed and deleted consumers."""
+        self.consumer1.name = "Jonathan Doe"
+        self.consumer1.save()
+        self.assertEqual(self._filter_refs("john"), [])
+        self.assertEqual(self._filter_refs("jonathan"), ["REF001", "REF002"])
+
+        self.consumer2.delete()
+        self.assertEqual(self._filter_refs("smith"), [])
+
     def test_filter_by_combined_criteria(self):
         """Test filtering accounts by multiple criteria."""
         url = reverse("account-list")
@@ -0,0 +1,151 @@
+import json
+from decimal import Decimal
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.models import CollectionAgency, Client, Account
+from accounts.pagination import AccountCursorPagination
+from accounts.services import CSVImportService
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.00,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.00,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF003,300.00,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF003,300.00,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555
+REF004,50.00,INACTIVE,Jane Smith,456 Oak Ave,987-65-4321
+REF005,75.00,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555"""
+
+
+class AccountAsyncViewsTest(TestCase):
+    """Test cases for the async account list and retrieve endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        CSVImportService(self.agency.id, self.test_client.id).import_csv(CSV_CONTENT)
+        self.account = Account.objects.get(client_reference_no="REF003")
+
+    def _get(self, url, params=None, **headers):
+        return self.client.get(
+            url, params or {}, HTTP_ACCEPT="application/json", **headers
+        )
+
+    def _pages(self, url, params):
+        # Every page's body, following the next links, without the links
+        pages = []
+        while url:
+            response = self._get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = json.loads(response.content)
+            url, params = data.pop("next"), None
+            data.pop("previous")
+            pages.append(data)
+        return pages
+
+    @patch.object(AccountCursorPagination, "page_size", 2)
+    def test_list_matches_sync_list(self):
+        """Test that the async list returns the same pages as the list."""
+        for params in (
+            {},
+            {"status": "IN_COLLECTION"},
+            {"min_balance": "60", "max_balance": "250"},
+            {"consumer_name": "john"},
+            {"fields": "id,balance", "expand": "consumers"},
+            {"expand": "client"},
+            {"count": "exact"},
+        ):
+            with self.subTest(params=params):
+                expected = self._pages(reverse("account-list"), params)
+                self.assertEqual(
+                    self._pages(reverse("account-list-async"), params), expected
+                )
+
+    def test_list_errors(self):
+        """Test that invalid parameters are rejected like by the list."""
+        for params in (
+            {"fields": "id,nope"},
+            {"expand": "balance"},
+            {"count": "all"},
+            {"min_balance": "abc"},
+        ):
+            with self.subTest(params=params):
+                expected = self._get(reverse("account-list"), params)
+                response = self._get(reverse("account-list-async"), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(
+                    json.loads(response.content), json.loads(expected.content)
+                )
+                # Not hidden behind a 304 when the client has a matching copy
+                for url in (reverse("account-list"), reverse("account-list-async")):
+                    response = self._get(url, params, HTTP_IF_NONE_MATCH="*")
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse("account-list-async"))
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_list_cache_and_etag(self):
+        """Test that repeated lists are served from the cache or answered 304."""
+        first = self._get(reverse("account-list-async"), {"status": "IN_COLLECTION"})
+        with self.assertNumQueries(1):
+            second = self._get(
+                reverse("account-list-async"), {"status": "IN_COLLECTION"}
+            )
+        self.assertEqual(second.content, first.content)
+
+        response = self._get(
+            reverse("account-list-async"),
+            {"status": "IN_COLLECTION"},
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Writes change the ETag and the cached page
+        self.account.balance = Decimal("1.00")
+        self.account.save()
+        response = self._get(
+            reverse("account-list-async"),
+            {"status": "IN_COLLECTION"},
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('"balance":"1.00"', response.content.decode())
+
+    def test_retrieve_matches_sync_retrieve(self):
+        """Test that the async retrieve returns the same account as the retrieve."""
+        for params in ({}, {"fields": "id,consumers"}, {"expand": "client"}):
+            with self.subTest(params=params):
+                expected = self._get(
+                    reverse("account-detail", args=[self.account.id]), params
+                )
+                response = self._get(
+                    reverse("account-detail-async", args=[self.account.id]), params
+                )
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(
+                    json.loads(response.content), json.loads(expected.content)
+                )
+
+    def test_retrieve_etag_and_missing(self):
+        """Test 304 for a current copy and 404 for missing accounts."""
+        url = reverse("account-detail-async", args=[self.account.id])
+        etag = self._get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        for pk in ("0", "abc"):
+            with self.subTest(pk=pk):
+                response = self._get(reverse("account-detail-async", args=[pk]))
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                self.assertEqual(
+                    json.loads(response.content),
+                    json.loads(self._get(reverse("account-detail", args=[pk])).content),
+                )
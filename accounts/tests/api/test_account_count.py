@@ -0,0 +1,122 @@
+from decimal import Decimal
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts import counting
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+
+
+class AccountCountTest(TestCase):
+    """Test cases for the optional counts of account lists."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.consumer = Consumer.objects.create(
+            name="John Doe", address="123 Main St", ssn="123-45-6789"
+        )
+        self.other_consumer = Consumer.objects.create(
+            name="Johnny Smith", address="456 Oak Ave", ssn="987-65-4321"
+        )
+        accounts = Account.objects.bulk_create(
+            Account(
+                client_reference_no=f"REF{n:03d}",
+                balance=Decimal(n),
+                status=(
+                    Account.STATUS_IN_COLLECTION
+                    if n % 3
+                    else Account.STATUS_PAID_IN_FULL
+                ),
+                client=self.test_client,
+            )
+            for n in range(60)
+        )
+        # The first ten accounts have both consumers, which both match "john"
+        AccountConsumer.objects.bulk_create(
+            AccountConsumer(account=account, consumer=consumer)
+            for account in accounts[:10]
+            for consumer in (self.consumer, self.other_consumer)
+        )
+
+    def _list(self, **params):
+        response = self.client.get(reverse("account-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_no_count_by_default(self):
+        """Test that lists are not counted unless asked to."""
+        for params in ({}, {"count": "none"}):
+            with self.subTest(params=params):
+                data = self._list(**params)
+                self.assertNotIn("count", data)
+                self.assertNotIn("count_exact", data)
+
+    def test_exact_count(self):
+        """Test exact counts, including the consumer name filter."""
+        for fast in (True, False):
+            with (
+                self.subTest(fast=fast),
+                override_settings(ACCOUNT_LIST_FAST_SERIALIZER=fast),
+            ):
+                caches["default"].clear()
+                data = self._list(count="exact", status="IN_COLLECTION")
+                self.assertEqual(list(data)[:2], ["count", "count_exact"])
+                self.assertEqual(data["count"], 40)
+                self.assertTrue(data["count_exact"])
+
+                # Accounts with two matching consumers are counted once
+                data = self._list(count="exact", consumer_name="john")
+                self.assertEqual(data["count"], 10)
+                self.assertEqual(len(data["results"]), 10)
+
+    def test_estimate_counts_small_tables(self):
+        """Test that estimates over few primary keys are counted exactly."""
+        data = self._list(count="estimate", status="PAID_IN_FULL")
+        self.assertEqual(data["count"], 20)
+        self.assertFalse(data["count_exact"])
+
+    @patch.object(counting, "MIN_SAMPLE_MATCHES", 5)
+    @patch.object(counting, "SAMPLE_SIZE", 30)
+    def test_sampled_estimate(self):
+        """Test that estimates are extrapolated from a sample and cached."""
+        queryset = Account.objects.filter(status=Account.STATUS_IN_COLLECTION)
+        with patch.object(
+            counting.random, "sample", side_effect=lambda keys, k: list(keys)[::2]
+        ):
+            # Every other key: 20 of the 30 sampled accounts are in collection
+            estimate = counting.estimate_count(queryset)
+        self.assertEqual(estimate, 40)
+        with self.assertNumQueries(0):
+            self.assertEqual(counting.estimate_count(queryset), 40)
+
+        # Too few matches in the sample are counted exactly instead
+        queryset = Account.objects.filter(balance__lt=3)
+        self.assertEqual(counting.estimate_count(queryset), 3)
+
+    @override_settings(LIST_COUNT_TIMEOUT=1e-9)
+    @patch.object(counting, "PROGRESS_INTERVAL", 1)
+    def test_exact_count_timeout_falls_back_to_estimate(self):
+        """Test that exact counts that take too long are estimated instead."""
+        with self.assertRaises(counting.CountTimeout):
+            counting.exact_count(Account.objects.all(), 1e-9)
+
+        with patch.object(counting, "estimate_count", return_value=55):
+            data = self._list(count="exact")
+        self.assertEqual(data["count"], 55)
+        self.assertFalse(data["count_exact"])
+        # The page itself is unaffected
+        self.assertEqual(len(data["results"]), 60)
+
+    def test_invalid_mode(self):
+        """Test that unknown count modes are rejected."""
+        response = self.client.get(reverse("account-list"), {"count": "all"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("count", response.data)
@@ -0,0 +1,125 @@
+from decimal import Decimal
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.serializers import AccountSerializer
+
+
+class AccountETagTest(TestCase):
+    """Test cases for ETags and conditional GETs on the account endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.consumer = Consumer.objects.create(
+            name="John Doe", address="123 Main St", ssn="123-45-6789"
+        )
+        self.account = Account.objects.create(
+            client_reference_no="REF001",
+            balance=Decimal("100.00"),
+            client=self.test_client,
+        )
+        AccountConsumer.objects.create(account=self.account, consumer=self.consumer)
+        self.list_url = reverse("account-list")
+        self.detail_url = reverse("account-detail", args=[self.account.id])
+
+    def test_list_not_modified(self):
+        """Test that a matching If-None-Match on the list returns 304."""
+        first = self.client.get(self.list_url, {"status": "IN_COLLECTION"})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        with patch.object(AccountSerializer, "to_representation") as serialize:
+            with self.assertNumQueries(1):
+                second = self.client.get(
+                    self.list_url,
+                    {"status": "IN_COLLECTION"},
+                    HTTP_IF_NONE_MATCH=etag,
+                )
+        serialize.assert_not_called()
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second["ETag"], etag)
+        self.assertEqual(second.content, b"")
+
+        # Other filters are other representations
+        other = self.client.get(
+            self.list_url, {"status": "INACTIVE"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(other["ETag"], etag)
+
+    def test_list_invalid_params_not_modified(self):
+        """Test that invalid list parameters get a 400 with a matching ETag."""
+        for params in ({"fields": "nope"}, {"count": "all"}, {"min_balance": "abc"}):
+            with self.subTest(params=params):
+                # "*" matches whatever the ETag of the page would be
+                response = self.client.get(
+                    self.list_url, params, HTTP_IF_NONE_MATCH="*"
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_not_modified(self):
+        """Test that a matching If-None-Match on an account returns 304."""
+        first = self.client.get(self.detail_url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with patch.object(AccountSerializer, "to_representation") as serialize:
+            with self.assertNumQueries(1):
+                second = self.client.get(
+                    self.detail_url, HTTP_IF_NONE_MATCH=first["ETag"]
+                )
+        serialize.assert_not_called()
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_changes_change_etag(self):
+        """Test that changes to an account or its consumers change the ETags."""
+        list_etag = self.client.get(self.list_url)["ETag"]
+        detail_etag = self.client.get(self.detail_url)["ETag"]
+
+        self.consumer.name = "Johnny Doe"
+        self.consumer.save()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0]["consumers"][0]["name"], "Johnny Doe"
+        )
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], detail_etag)
+
+    def test_if_none_match_forms(self):
+        """Test weak, listed and wildcard If-None-Match values."""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        for header in (f"W/{etag}", f'"other", {etag}', "*"):
+            with self.subTest(header=header):
+                response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_format(self):
+        """Test that the JSON and browsable API representations differ."""
+        json_etag = self.client.get(self.detail_url, HTTP_ACCEPT="application/json")
+        html_etag = self.client.get(self.detail_url, HTTP_ACCEPT="text/html")
+        self.assertNotEqual(json_etag["ETag"], html_etag["ETag"])
+
+    def test_missing_account(self):
+        """Test that unknown and malformed IDs still return 404."""
+        for pk in (self.account.id + 1, "abc"):
+            with self.subTest(pk=pk):
+                response = self.client.get(
+                    reverse("account-detail", args=[pk]), HTTP_IF_NONE_MATCH="*"
+                )
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+
+
+@override_settings(ACCOUNT_LIST_CACHE_TIMEOUT=0, ACCOUNT_EXPORT_CHUNK_SIZE=4)
+class AccountExportTest(TestCase):
+    """Test cases for the streaming account export."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        agency = CollectionAgency.objects.create(name="Test Agency")
+        test_client = Client.objects.create(
+            name="Test Client", collection_agency=agency
+        )
+        consumers = [
+            Consumer.objects.create(
+                name=f"Consumer {n}", address=f"{n} Main St", ssn=f"{n:03d}-45-6789"
+            )
+            for n in range(100, 104)
+        ]
+        for n in range(10):
+            account = Account.objects.create(
+                client_reference_no=f"REF{n:03d}",
+                balance=Decimal(n * 25),
+                status=(
+                    Account.STATUS_IN_COLLECTION if n % 2 else Account.STATUS_INACTIVE
+                ),
+                client=test_client,
+            )
+            # Accounts have 0 to 2 consumers
+            for consumer in consumers[n % 3 : n % 3 + n % 3]:
+                AccountConsumer.objects.create(account=account, consumer=consumer)
+
+    def _export(self, **params):
+        response = self.client.get(reverse("account-export"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def _list(self, **params):
+        return self.client.get(reverse("account-list"), params).data["results"]
+
+    def test_ndjson(self):
+        """Test that NDJSON lines are the list's results, in ID order."""
+        response, content = self._export(export_format="ndjson")
+        self.assertEqual(
+            response["Content-Type"], "application/x-ndjson; charset=utf-8"
+        )
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(rows, json.loads(json.dumps(self._list())))
+
+    def test_csv(self):
+        """Test that CSV has a line per account and consumer."""
+        response, content = self._export()
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn('filename="accounts.csv"', response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(
+            list(rows[0]),
+            [
+                "id",
+                "client_reference_no",
+                "balance",
+                "status",
+                "client.id",
+                "client.name",
+                "client.collection_agency.id",
+                "client.collection_agency.name",
+                "client.collection_agency.contact_info",
+                "consumers.id",
+                "consumers.name",
+                "consumers.address",
+                "consumers.ssn",
+                "created_at",
+            ],
+        )
+        # 4 accounts without consumers, 3 with one and 3 with two
+        self.assertEqual(len(rows), 4 + 3 + 3 * 2)
+        by_reference = {}
+        for row in rows:
+            by_reference.setdefault(row["client_reference_no"], []).append(row)
+        self.assertEqual(by_reference["REF000"][0]["consumers.name"], "")
+        self.assertEqual(
+            [row["consumers.name"] for row in by_reference["REF002"]],
+            ["Consumer 102", "Consumer 103"],
+        )
+        self.assertEqual(by_reference["REF002"][0]["balance"], "50.00")
+        self.assertEqual(by_reference["REF002"][0]["client.name"], "Test Client")
+
+    def test_filters_and_fields(self):
+        """Test that the export takes the list's filters and fields."""
+        _, content = self._export(
+            status="INACTIVE", min_balance=100, fields="client_reference_no,balance"
+        )
+        self.assertEqual(
+            content.splitlines(),
+            [
+                "client_reference_no,balance",
+                "REF004,100.00",
+                "REF006,150.00",
+                "REF008,200.00",
+            ],
+        )
+
+        _, content = self._export(export_format="ndjson", consumer_name="Consumer 103")
+        self.assertEqual(
+            [json.loads(line)["client_reference_no"] for line in content.splitlines()],
+            ["REF002", "REF005", "REF008"],
+        )
+
+    def test_empty(self):
+        """Test that an empty CSV export still has its header."""
+        _, content = self._export(min_balance=100000, fields="id,balance")
+        self.assertEqual(content, "id,balance\r\n")
+        _, content = self._export(min_balance=100000, export_format="ndjson")
+        self.assertEqual(content, "")
+
+    def test_batched_queries(self):
+        """Test that accounts are read once and consumers fetched per batch."""
+        response = self.client.get(
+            reverse("account-export"), {"export_format": "ndjson"}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            b"".join(response.streaming_content)
+        # One read of the accounts, and a consumer query per batch of 4
+        self.assertEqual(len(queries), 1 + 3)
+
+    def test_invalid_format(self):
+        """Test that unknown formats are rejected."""
+        response = self.client.get(reverse("account-export"), {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
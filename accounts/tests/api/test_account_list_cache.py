@@ -0,0 +1,136 @@
+from decimal import Decimal
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.pagination import AccountCursorPagination
+from accounts.services import CSVImportService
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.00,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.00,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321"""
+
+
+class AccountListCacheTest(TestCase):
+    """Test cases for the account list response cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        CSVImportService(self.agency.id, self.test_client.id).import_csv(CSV_CONTENT)
+
+    def _list(self, **params):
+        response = self.client.get(reverse("account-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def _balances(self, **params):
+        return {
+            account["client_reference_no"]: account["balance"]
+            for account in self._list(**params).data["results"]
+        }
+
+    def test_repeated_request_served_from_cache(self):
+        """Test that a repeated request only reads the client generations."""
+        first = self._list(status="IN_COLLECTION")
+
+        with self.assertNumQueries(1):
+            second = self._list(status="IN_COLLECTION")
+
+        self.assertEqual(second.content, first.content)
+
+    def test_key_covers_params_and_cursor(self):
+        """Test that different filters and pages are cached separately."""
+        self.assertEqual(set(self._balances(status="PAID_IN_FULL")), {"REF002"})
+        self.assertEqual(set(self._balances(status="IN_COLLECTION")), {"REF001"})
+        # Parameter order does not matter
+        self.client.get(
+            reverse("account-list") + "?max_balance=500&status=PAID_IN_FULL"
+        )
+        with self.assertNumQueries(1):
+            self.client.get(
+                reverse("account-list") + "?status=PAID_IN_FULL&max_balance=500"
+            )
+
+        with patch.object(AccountCursorPagination, "page_size", 1):
+            first_page = self._list().data
+            second_page = self.client.get(first_page["next"]).data
+        self.assertEqual(first_page["results"][0]["client_reference_no"], "REF001")
+        self.assertEqual(second_page["results"][0]["client_reference_no"], "REF002")
+
+    def test_import_invalidates(self):
+        """Test that an import that changes data invalidates cached lists."""
+        self.assertEqual(self._balances()["REF001"], "100.00")
+
+        CSVImportService(self.agency.id, self.test_client.id).import_csv(
+            CSV_CONTENT.replace("100.00", "150.00")
+        )
+
+        self.assertEqual(self._balances()["REF001"], "150.00")
+
+    def test_unchanged_import_keeps_cache(self):
+        """Test that re-importing the same file does not invalidate cached lists."""
+        self._list()
+        CSVImportService(self.agency.id, self.test_client.id).import_csv(CSV_CONTENT)
+
+        with self.assertNumQueries(1):
+            self._list()
+
+    def test_writes_invalidate(self):
+        """Test that saving and deleting related objects invalidates cached lists."""
+
+        def first_account():
+            return self._list().data["results"][0]
+
+        self._list()
+        account = Account.objects.get(client_reference_no="REF001")
+        account.balance = Decimal("175.00")
+        account.save()
+        self.assertEqual(first_account()["balance"], "175.00")
+
+        consumer = Consumer.objects.with_ssn("123-45-6789").get()
+        consumer.name = "Johnny Doe"
+        consumer.save()
+        self.assertEqual(first_account()["consumers"][0]["name"], "Johnny Doe")
+
+        self.agency.name = "Renamed Agency"
+        self.agency.save()
+        self.assertEqual(
+            first_account()["client"]["collection_agency"]["name"], "Renamed Agency"
+        )
+
+        AccountConsumer.objects.get(account=account).delete()
+        self.assertEqual(first_account()["consumers"], [])
+
+        account.delete()
+        self.assertEqual(set(self._balances()), {"REF002"})
+
+    def test_stale_client_copy_cannot_reset_generation(self):
+        """Test that saving an outdated copy of a client keeps newer generations."""
+        stale = Client.objects.get(id=self.test_client.id)
+        self._list()
+        Account.objects.filter(client_reference_no="REF001").first().save()
+        bumped = Client.objects.get(id=self.test_client.id).data_generation
+
+        stale.name = "Renamed Client"
+        stale.save()
+
+        self.assertEqual(
+            Client.objects.get(id=self.test_client.id).data_generation, bumped + 1
+        )
+
+    @override_settings(ACCOUNT_LIST_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        """Test that a timeout of 0 disables the cache."""
+        self._list()
+        # The client generations are still read, for the ETag
+        with self.assertNumQueries(3):
+            self._list()
@@ -0,0 +1,141 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.pagination import AccountCursorPagination
+
+
+@override_settings(ACCOUNT_LIST_CACHE_TIMEOUT=0)
+class AccountSparseFieldsTest(TestCase):
+    """Test cases for the fields and expand parameters of the accounts API."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        consumers = [
+            Consumer.objects.create(
+                name=f"Consumer {n}", address=f"{n} Main St", ssn=f"{n:03d}-45-6789"
+            )
+            for n in range(100, 104)
+        ]
+        for n in range(12):
+            account = Account.objects.create(
+                client_reference_no=f"REF{n:03d}",
+                balance=Decimal(n * 25),
+                status=Account.STATUS_IN_COLLECTION,
+                client=self.test_client,
+            )
+            for consumer in reversed(consumers[n % 3 : n % 3 + 2]):
+                AccountConsumer.objects.create(account=account, consumer=consumer)
+        self.account = account
+
+    def _get(self, fast=True, url=None, **params):
+        with override_settings(ACCOUNT_LIST_FAST_SERIALIZER=fast):
+            return self.client.get(url or reverse("account-list"), params)
+
+    def test_fields(self):
+        """Test that only the requested fields are returned, in the usual order."""
+        response = self._get(fields="status,client_reference_no,balance")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for account in response.data["results"]:
+            self.assertEqual(
+                list(account), ["client_reference_no", "balance", "status"]
+            )
+
+    def test_expand(self):
+        """Test that expand adds nested objects to the account's own fields."""
+        response = self._get(expand="client")
+        self.assertEqual(
+            list(response.data["results"][0]),
+            ["id", "client_reference_no", "balance", "status", "client", "created_at"],
+        )
+        self.assertEqual(
+            response.data["results"][0]["client"]["collection_agency"]["name"],
+            "Test Agency",
+        )
+
+        response = self._get(fields="client_reference_no", expand="consumers")
+        self.assertEqual(
+            list(response.data["results"][0]), ["client_reference_no", "consumers"]
+        )
+
+    def test_paths_identical(self):
+        """Test that both serializers render the same sparse responses."""
+        for params in (
+            {"fields": "client_reference_no,balance,status"},
+            {"fields": "id", "expand": "client,consumers"},
+            {"fields": "consumers,created_at"},
+            {"expand": "consumers"},
+            {"fields": "balance", "min_balance": 100},
+        ):
+            with self.subTest(params=params):
+                slow = self._get(False, **params)
+                fast = self._get(True, **params)
+                self.assertEqual(fast.status_code, status.HTTP_200_OK)
+                self.assertEqual(fast.content, slow.content)
+
+    def test_lean_queries(self):
+        """Test that fields that are not requested are neither joined nor loaded."""
+        for fast in (False, True):
+            with self.subTest(fast=fast):
+                with CaptureQueriesContext(connection) as queries:
+                    self._get(fast, fields="client_reference_no,balance,status")
+                # The cache key's client generations, then the accounts
+                self.assertEqual(len(queries), 2)
+                sql = queries[-1]["sql"]
+                self.assertNotIn("JOIN", sql)
+                self.assertNotIn('"accounts_account"."updated_at"', sql)
+                self.assertNotIn('"accounts_account"."fingerprint"', sql)
+
+                with CaptureQueriesContext(connection) as queries:
+                    self._get(fast, fields="id", expand="client")
+                self.assertEqual(len(queries), 2)
+                self.assertIn("JOIN", queries[-1]["sql"])
+
+                with CaptureQueriesContext(connection) as queries:
+                    self._get(fast, fields="id,consumers")
+                self.assertEqual(len(queries), 3)
+                # Consumers are fetched separately; the client is not joined
+                self.assertNotIn("accounts_client", queries[1]["sql"])
+
+    def test_pages(self):
+        """Test that sparse lists paginate without the ordering field."""
+        with patch.object(AccountCursorPagination, "page_size", 5):
+            data = self._get(fields="client_reference_no").data
+            references = []
+            while True:
+                references.extend(a["client_reference_no"] for a in data["results"])
+                if not data["next"]:
+                    break
+                data = self._get(url=data["next"]).data
+        self.assertEqual(references, [f"REF{n:03d}" for n in range(12)])
+
+    def test_retrieve(self):
+        """Test that fields and expand apply to single accounts."""
+        url = reverse("account-detail", args=[self.account.id])
+        response = self._get(url=url, fields="balance", expand="consumers")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["balance", "consumers"])
+        self.assertEqual(
+            [consumer["name"] for consumer in response.data["consumers"]],
+            ["Consumer 102", "Consumer 103"],
+        )
+
+    def test_invalid_fields(self):
+        """Test that unknown fields are rejected."""
+        response = self._get(fields="balance,nope")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+        response = self._get(expand="balance")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", response.data)
@@ -0,0 +1,112 @@
+from decimal import Decimal
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.pagination import AccountCursorPagination
+from accounts.serializers import (
+    AccountSerializer,
+    ConsumerSerializer,
+    ValuesSerializer,
+)
+
+
+@override_settings(ACCOUNT_LIST_CACHE_TIMEOUT=0)
+class AccountValuesSerializerTest(TestCase):
+    """Test cases for the fast path of the account list."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        agencies = [
+            CollectionAgency.objects.create(name="Agency A"),
+            CollectionAgency.objects.create(name="Agency B", contact_info="b@b.com"),
+        ]
+        clients = [
+            Client.objects.create(name=f"Client {n}", collection_agency=agency)
+            for n, agency in enumerate(agencies * 2)
+        ]
+        consumers = [
+            Consumer.objects.create(
+                name=f"Consumer {n}", address=f"{n} Main St", ssn=f"{n:03d}-45-6789"
+            )
+            for n in range(100, 110)
+        ]
+        statuses = [status for status, _ in Account.STATUS_CHOICES]
+        for n in range(25):
+            account = Account.objects.create(
+                client_reference_no=f"REF{n:03d}",
+                balance=Decimal(n * 37) / 4,
+                status=statuses[n % 3],
+                client=clients[n % 4],
+            )
+            # Accounts have 0 to 3 consumers, linked out of ID order
+            for consumer in reversed(consumers[n % 7 : n % 7 + n % 4]):
+                AccountConsumer.objects.create(account=account, consumer=consumer)
+
+    def _get(self, fast, url=None, **params):
+        with override_settings(ACCOUNT_LIST_FAST_SERIALIZER=fast):
+            return self.client.get(url or reverse("account-list"), params)
+
+    def test_output_identical(self):
+        """Test that the fast path renders the same bytes as AccountSerializer."""
+        for params in (
+            {},
+            {"status": "INACTIVE"},
+            {"min_balance": 10, "consumer_name": "consumer 10"},
+            {"min_balance": 100000},
+        ):
+            with self.subTest(params=params):
+                slow = self._get(False, **params)
+                fast = self._get(True, **params)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content)
+
+    def test_pages_identical(self):
+        """Test that every page and cursor of the fast path is identical."""
+        with patch.object(AccountCursorPagination, "page_size", 10):
+            slow, fast = self._get(False).data, self._get(True).data
+            pages = 1
+            while fast["next"]:
+                self.assertEqual(fast["next"], slow["next"])
+                slow = self._get(False, url=slow["next"])
+                fast = self._get(True, url=fast["next"])
+                self.assertEqual(fast.content, slow.content)
+                slow, fast = slow.data, fast.data
+                pages += 1
+        self.assertEqual(pages, 3)
+
+    def test_query_count(self):
+        """Test that a page is fetched with one query plus one for consumers."""
+        with self.assertNumQueries(3):
+            self._get(True)
+
+    def test_unsupported_serializers(self):
+        """Test that serializers the plan cannot reproduce are rejected."""
+
+        class MethodSerializer(ConsumerSerializer):
+            shout = serializers.SerializerMethodField()
+
+            class Meta(ConsumerSerializer.Meta):
+                fields = ["id", "shout"]
+
+            def get_shout(self, consumer):
+                return consumer.name.upper()
+
+        class SourceSerializer(AccountSerializer):
+            client_name = serializers.CharField(source="client.name")
+
+            class Meta(AccountSerializer.Meta):
+                fields = ["id", "client_name"]
+
+        class CustomSerializer(ConsumerSerializer):
+            def to_representation(self, instance):
+                return {}
+
+        for serializer_class in (MethodSerializer, SourceSerializer, CustomSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                with self.assertRaises(ImproperlyConfigured):
+                    ValuesSerializer(serializer_class).plan
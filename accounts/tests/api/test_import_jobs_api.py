@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.jobs import run_import_job
+from accounts.models import CollectionAgency, Client, Account, ImportJob
+
+CSV_CONTENT = b"""client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF001,100.50,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555"""
+
+
+class ImportJobAPITest(TestCase):
+    """Test cases for background CSV imports."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+        settings_override = override_settings(
+            IMPORT_SPOOL_DIR=self.spool_dir, IMPORT_JOB_COMMIT_EVERY=2
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _upload(self, content=CSV_CONTENT, **extra):
+        data = {
+            "file": SimpleUploadedFile("test.csv", content, content_type="text/csv"),
+            "collection_agency_id": self.agency.id,
+            "client_id": self.test_client.id,
+            "background": "true",
+        }
+        data.update(extra)
+        return self.client.post(reverse("account-upload-csv"), data, format="multipart")
+
+    def test_background_upload_returns_job(self):
+        """Test that a background upload is spooled and queued, not imported."""
+        with patch("accounts.jobs.get_executor") as get_executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._upload()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = ImportJob.objects.get(id=response.data["id"])
+        self.assertEqual(job.status, ImportJob.STATUS_PENDING)
+        self.assertEqual(job.file_name, "test.csv")
+        with open(job.file_path, "rb") as spooled:
+            self.assertEqual(spooled.read(), CSV_CONTENT)
+        get_executor.return_value.submit.assert_called_once()
+        self.assertEqual(Account.objects.count(), 0)
+
+    def test_run_job_and_poll_status(self):
+        """Test running a queued job and reading its progress."""
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self._upload()
+        job = run_import_job(response.data["id"])
+
+        self.assertEqual(job.status, ImportJob.STATUS_SUCCEEDED)
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertEqual(Account.objects.count(), 2)
+
+        response = self.client.get(reverse("importjob-detail", args=[job.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], ImportJob.STATUS_SUCCEEDED)
+        self.assertEqual(response.data["rows_parsed"], 3)
+        self.assertEqual(response.data["rows_written"], 3)
+        self.assertEqual(response.data["stats"]["accounts_created"], 2)
+        self.assertEqual(response.data["stats"]["consumer_accounts_linked"], 3)
+        self.assertIsNotNone(response.data["throughput"])
+
+    def test_failed_job_keeps_committed_progress(self):
+        """Test that a failed job reports its error and committed rows."""
+        content = CSV_CONTENT.replace(b"555-55-5555", b"555-55-5555\nREF003,oops")
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self._upload(content)
+        job = run_import_job(response.data["id"])
+
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn("Row 5", job.error)
+        self.assertEqual(job.rows_written, 2)
+        self.assertEqual(job.checkpoint.rows_committed, 2)
+        # Nothing runs a failed job again
+        self.assertFalse(os.path.exists(job.file_path))
+
+    def test_background_upload_invalid_client(self):
+        """Test that a background upload validates the client up front."""
+        response = self._upload(client_id=9999)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ImportJob.objects.count(), 0)
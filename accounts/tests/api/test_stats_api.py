@@ -0,0 +1,111 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import CollectionAgency, Client, Account
+
+
+class StatsAPITest(TestCase):
+    """Test cases for the balance stats endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.other_agency = CollectionAgency.objects.create(name="Other Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.other_agency
+        )
+        self.empty_client = Client.objects.create(
+            name="Empty Client", collection_agency=self.agency
+        )
+        for n, (client, balance, account_status) in enumerate(
+            [
+                (self.test_client, "100.00", Account.STATUS_IN_COLLECTION),
+                (self.test_client, "50.25", Account.STATUS_IN_COLLECTION),
+                (self.test_client, "10.00", Account.STATUS_PAID_IN_FULL),
+                (self.other_client, "1000.00", Account.STATUS_INACTIVE),
+            ]
+        ):
+            Account.objects.create(
+                client_reference_no=f"REF{n:03d}",
+                balance=Decimal(balance),
+                status=account_status,
+                client=client,
+            )
+
+    def _stats(self, **params):
+        response = self.client.get(reverse("stats"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_totals(self):
+        """Test totals overall, per client and per status."""
+        data = self._stats()
+        self.assertEqual(data["account_count"], 4)
+        self.assertEqual(data["total_balance"], "1160.25")
+        self.assertEqual(
+            data["by_status"]["IN_COLLECTION"],
+            {"account_count": 2, "total_balance": "150.25"},
+        )
+
+        clients = {client["id"]: client for client in data["clients"]}
+        self.assertEqual(
+            list(clients),
+            [self.test_client.id, self.other_client.id, self.empty_client.id],
+        )
+        self.assertEqual(clients[self.test_client.id]["account_count"], 3)
+        self.assertEqual(clients[self.test_client.id]["total_balance"], "160.25")
+        self.assertEqual(
+            clients[self.test_client.id]["by_status"]["PAID_IN_FULL"],
+            {"account_count": 1, "total_balance": "10.00"},
+        )
+        self.assertEqual(
+            clients[self.empty_client.id]["by_status"]["INACTIVE"],
+            {"account_count": 0, "total_balance": "0.00"},
+        )
+
+    def test_follows_account_changes(self):
+        """Test that the stats reflect account writes."""
+        account = Account.objects.get(client_reference_no="REF000")
+        account.status = Account.STATUS_PAID_IN_FULL
+        account.save()
+        Account.objects.get(client_reference_no="REF003").delete()
+
+        data = self._stats()
+        self.assertEqual(data["account_count"], 3)
+        self.assertEqual(
+            data["by_status"]["PAID_IN_FULL"],
+            {"account_count": 2, "total_balance": "110.00"},
+        )
+        self.assertEqual(data["by_status"]["INACTIVE"]["account_count"], 0)
+
+    def test_filters(self):
+        """Test filtering by collection agency and client."""
+        data = self._stats(collection_agency_id=self.agency.id)
+        self.assertEqual(
+            [client["id"] for client in data["clients"]],
+            [self.test_client.id, self.empty_client.id],
+        )
+        self.assertEqual(data["total_balance"], "160.25")
+
+        data = self._stats(client_id=self.other_client.id)
+        self.assertEqual(len(data["clients"]), 1)
+        self.assertEqual(data["total_balance"], "1000.00")
+
+        response = self.client.get(reverse("stats"), {"client_id": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reads_rollups_only(self):
+        """Test that the stats are two queries, neither of them on the accounts."""
+        with CaptureQueriesContext(connection) as queries:
+            self._stats()
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn('FROM "accounts_account"', query["sql"])
@@ -0,0 +1,114 @@
+import hashlib
+import shutil
+import tempfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from unittest.mock import patch
+from accounts.jobs import run_import_job
+from accounts.models import CollectionAgency, Client, Account, ImportUpload
+from accounts.services import CSVImportService
+
+CSV_CONTENT = b"""client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321"""
+
+
+class UploadDedupeAPITest(TestCase):
+    """Test cases for recognizing repeated CSV uploads."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.client = APIClient()
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.test_client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+
+    def _upload(self, content=CSV_CONTENT, client=None, **extra):
+        data = {
+            "file": SimpleUploadedFile("test.csv", content, content_type="text/csv"),
+            "collection_agency_id": self.agency.id,
+            "client_id": (client or self.test_client).id,
+        }
+        data.update(extra)
+        return self.client.post(reverse("account-upload-csv"), data, format="multipart")
+
+    def test_repeated_upload_returns_original_stats(self):
+        """Test that an identical re-upload is not imported again."""
+        first = self._upload()
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        upload = ImportUpload.objects.get()
+        self.assertEqual(upload.sha256, hashlib.sha256(CSV_CONTENT).hexdigest())
+        self.assertEqual(upload.size, len(CSV_CONTENT))
+
+        with patch.object(CSVImportService, "process_csv_file") as process:
+            second = self._upload()
+
+        process.assert_not_called()
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertTrue(second.data["duplicate"])
+        self.assertEqual(second.data["upload_id"], upload.id)
+        self.assertEqual(
+            second.data["accounts_created"], first.data["accounts_created"]
+        )
+
+    def test_force_imports_again(self):
+        """Test that force re-imports a file that was already imported."""
+        self._upload()
+        Account.objects.all().delete()
+
+        response = self._upload(force="true")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("duplicate", response.data)
+        self.assertEqual(response.data["accounts_created"], 2)
+        self.assertEqual(ImportUpload.objects.get().stats["accounts_created"], 2)
+
+    def test_registry_is_per_client(self):
+        """Test that the same file is imported for another client."""
+        other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.agency
+        )
+        self._upload()
+
+        response = self._upload(client=other_client)
+
+        self.assertNotIn("duplicate", response.data)
+        self.assertEqual(other_client.accounts.count(), 2)
+        self.assertEqual(ImportUpload.objects.count(), 2)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=16)
+    def test_large_upload_hashed_while_spooled(self):
+        """Test that files written to a temporary file are hashed too."""
+        self._upload()
+
+        self.assertEqual(
+            ImportUpload.objects.get().sha256, hashlib.sha256(CSV_CONTENT).hexdigest()
+        )
+
+    def test_failed_import_not_registered(self):
+        """Test that a file that failed to import can be uploaded again."""
+        content = CSV_CONTENT + b"\nREF003,abc,INACTIVE,Al,Nowhere,111-11-1111"
+
+        self.assertEqual(self._upload(content).status_code, 400)
+        self.assertEqual(self._upload(content).status_code, 400)
+        self.assertFalse(ImportUpload.objects.exists())
+
+    def test_background_import_registered_on_success(self):
+        """Test that a background import registers the file when it succeeds."""
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+
+        with override_settings(IMPORT_SPOOL_DIR=spool_dir):
+            with self.captureOnCommitCallbacks(execute=False):
+                response = self._upload(background="true")
+            job = run_import_job(response.data["id"])
+
+        response = self._upload(background="true")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["duplicate"])
+        self.assertEqual(response.data["accounts_created"], 2)
+        self.assertEqual(ImportUpload.objects.get().import_job, job)
@@ -1,4 +1,5 @@
 from accounts.tests.models.test_collection_agency import CollectionAgencyModelTest
 from accounts.tests.models.test_client import ClientModelTest
 from accounts.tests.models.test_consumer import ConsumerModelTest
+from accounts.tests.models.test_consumer import ConsumerSSNMigrationTest
 from accounts.tests.models.test_account import AccountModelTest
@@ -1,4 +1,8 @@
-from django.test import TestCase
+from django.core.exceptions import FieldError
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from accounts.crypto import blind_index, decrypt
 from accounts.models import Consumer
 
 
@@ -15,3 +19,129 @@ class ConsumerModelTest(TestCase):
         self.assertEqual(consumer.ssn, "123-45-6789")
         self.assertIsNotNone(consumer.created_at)
         self.assertIsNotNone(consumer.updated_at)
+
+    def _stored_ssns(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ssn, ssn_index FROM accounts_consumer ORDER BY id")
+            return cursor.fetchall()
+
+    def test_ssn_encrypted_at_rest(self):
+        """Test that SSNs are stored encrypted, with a random nonce."""
+        Consumer.objects.create(name="John Doe", address="1 St", ssn="123-45-6789")
+        Consumer.objects.bulk_create(
+            [Consumer(name="Jane Doe", address="2 St", ssn="987-65-4321")]
+        )
+
+        (first, first_index), (second, second_index) = self._stored_ssns()
+        self.assertNotIn("123-45-6789", first)
+        self.assertEqual(decrypt(first), "123-45-6789")
+        self.assertEqual(decrypt(second), "987-65-4321")
+        self.assertEqual(first_index, blind_index("123-45-6789"))
+        self.assertEqual(second_index, blind_index("987-65-4321"))
+        self.assertEqual(
+            list(Consumer.objects.order_by("id").values_list("ssn", flat=True)),
+            ["123-45-6789", "987-65-4321"],
+        )
+
+    def test_ssn_index_follows_ssn(self):
+        """Test that changing the SSN updates its blind index."""
+        consumer = Consumer.objects.create(
+            name="John Doe", address="1 St", ssn="123-45-6789"
+        )
+
+        consumer.ssn = "111-11-1111"
+        consumer.save()
+
+        self.assertEqual(Consumer.objects.with_ssn("111-11-1111").get(), consumer)
+        self.assertFalse(Consumer.objects.with_ssn("123-45-6789").exists())
+
+    def test_ssn_is_unique(self):
+        """Test that two consumers cannot share an SSN."""
+        Consumer.objects.create(name="John Doe", address="1 St", ssn="123-45-6789")
+
+        with self.assertRaises(IntegrityError):
+            Consumer.objects.create(name="J. Doe", address="2 St", ssn="123-45-6789")
+
+    def test_ssn_lookups_rejected(self):
+        """Test that encrypted SSNs cannot be compared in SQL."""
+        with self.assertRaises(FieldError):
+            Consumer.objects.filter(ssn="123-45-6789")
+        self.assertFalse(Consumer.objects.filter(ssn__isnull=True).exists())
+
+
+class ConsumerSSNMigrationTest(TransactionTestCase):
+    """Test cases for the migration that encrypts SSNs."""
+
+    def setUp(self):
+        """Migrate back to the latest migrations after each test."""
+        self.addCleanup(self._migrate_to_latest)
+
+    def _migrate_to_latest(self):
+        # Later tests expect the full schema
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def _migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("accounts", target)])
+        return executor.loader.project_state([("accounts", target)]).apps
+
+    def test_ssns_encrypted_and_duplicates_merged(self):
+        """Test that existing SSNs are encrypted and duplicate consumers merged."""
+        apps = self._migrate("0005_importupload")
+        Client = apps.get_model("accounts", "Client")
+        Account = apps.get_model("accounts", "Account")
+        OldConsumer = apps.get_model("accounts", "Consumer")
+        AccountConsumer = apps.get_model("accounts", "AccountConsumer")
+        agency = apps.get_model("accounts", "CollectionAgency").objects.create(name="A")
+        client = Client.objects.create(name="C", collection_agency=agency)
+        first, second = (
+            Account.objects.create(
+                client_reference_no=ref, balance=1, client=client, fingerprint="x"
+            )
+            for ref in ("REF001", "REF002")
+        )
+        oldest, duplicate, other = (
+            OldConsumer.objects.create(name=name, address="1 St", ssn=ssn)
+            for name, ssn in (
+                ("John Doe", "123-45-6789"),
+                ("J. Doe", "123-45-6789"),
+                ("Jane Doe", "987-65-4321"),
+            )
+        )
+        for account, consumer in (
+            (first, oldest),
+            (first, duplicate),
+            (second, duplicate),
+            (second, other),
+        ):
+            AccountConsumer.objects.create(account=account, consumer=consumer)
+
+        self._migrate("0006_consumer_ssn_encryption")
+
+        self.assertEqual(
+            list(Consumer.objects.order_by("id").values_list("id", "ssn")),
+            [(oldest.id, "123-45-6789"), (other.id, "987-65-4321")],
+        )
+        self.assertEqual(
+            set(
+                Consumer.objects.get(id=oldest.id).accounts.values_list(
+                    "client_reference_no", flat=True
+                )
+            ),
+            {"REF001", "REF002"},
+        )
+        self.assertEqual(Consumer.objects.with_ssn("987-65-4321").get().id, other.id)
+        self.assertEqual(self._migrate_back_ssns(), ["123-45-6789", "987-65-4321"])
+
+    def _migrate_back_ssns(self):
+        apps = self._migrate("0005_importupload")
+        ssns = list(
+            apps.get_model("accounts", "Consumer")
+            .objects.order_by("id")
+            .values_list("ssn", flat=True)
+        )
+        self._migrate("0006_consumer_ssn_encryption")
+        return ssns
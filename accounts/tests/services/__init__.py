@@ -1 +1,15 @@
 from accounts.tests.services.test_csv_import import CSVImportServiceTest
+from accounts.tests.services.test_chunked_import import ChunkedImportTest
+from accounts.tests.services.test_parallel_import import ParallelImportTest
+from accounts.tests.services.test_staging_import import StagingImportTest
+from accounts.tests.services.test_validation import ValidationReportTest
+from accounts.tests.services.test_dry_run import DryRunImportTest
+from accounts.tests.services.test_delta_import import DeltaImportTest
+from accounts.tests.services.test_compressed_import import CompressedImportTest
+from accounts.tests.services.test_columnar_import import ColumnarImportTest
+from accounts.tests.services.test_import_command import ImportAccountsCommandTest
+from accounts.tests.services.test_concurrent_import import ConcurrentImportTest
+from accounts.tests.services.test_balance_rollups import BalanceRollupTest
+from accounts.tests.services.test_recover_jobs_command import (
+    RecoverImportJobsCommandTest,
+)
@@ -0,0 +1,169 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Account, BalanceRollup
+from accounts.services import CSVImportService
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF001,999.99,INACTIVE,Bob Johnson,789 Pine St,555-55-5555
+REF003,10.00,IN_COLLECTION,Jane S.,Elsewhere,987-65-4321
+REF004,0.25,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555"""
+
+# REF001 changes balance, REF003 changes status and REF005 is new
+UPDATED_CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,90.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF003,10.00,PAID_IN_FULL,Jane S.,Elsewhere,987-65-4321
+REF005,5.00,INACTIVE,John Doe,123 Main St,123-45-6789"""
+
+
+class BalanceRollupTest(TestCase):
+    """Test cases for the incrementally maintained balance rollups."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.agency
+        )
+        # REF002 belongs to another client until it is imported
+        Account.objects.create(
+            client_reference_no="REF002",
+            balance=Decimal("1.00"),
+            status=Account.STATUS_IN_COLLECTION,
+            client=self.other_client,
+        )
+
+    def _rollups(self):
+        return {
+            (rollup.client_id, rollup.status): (
+                rollup.account_count,
+                rollup.total_balance,
+            )
+            for rollup in BalanceRollup.objects.all()
+            if rollup.account_count or rollup.total_balance
+        }
+
+    def assertRollupsMatchAccounts(self):
+        expected = {
+            (row["client_id"], row["status"]): (row["count"], row["total"])
+            for row in Account.objects.order_by()
+            .values("client_id", "status")
+            .annotate(count=Count("id"), total=Sum("balance"))
+        }
+        self.assertEqual(self._rollups(), expected)
+
+    def _import_each_way(self, content):
+        service = CSVImportService(self.agency.id, self.client.id)
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return {
+            "import_csv": lambda: service.import_csv(content),
+            "commit_every": lambda: service.import_csv(content, commit_every=2),
+            "staged": lambda: service.import_csv_staged(content),
+            "parallel": lambda: service.import_csv_parallel(path, workers=2),
+        }
+
+    def test_imports_update_rollups(self):
+        """Test that every import path keeps the rollups in step with the accounts."""
+        for name in ("import_csv", "commit_every", "staged", "parallel"):
+            with self.subTest(path=name):
+                self._import_each_way(CSV_CONTENT)[name]()
+                self.assertRollupsMatchAccounts()
+                self.assertEqual(
+                    self._rollups()[(self.client.id, Account.STATUS_IN_COLLECTION)],
+                    (3, Decimal("110.75")),
+                )
+                self._import_each_way(UPDATED_CSV_CONTENT)[name]()
+                self.assertRollupsMatchAccounts()
+
+                # Start over for the next path
+                Account.objects.exclude(client_reference_no="REF002").delete()
+                Account.objects.filter(client_reference_no="REF002").update(
+                    client=self.other_client,
+                    balance=Decimal("1.00"),
+                    status=Account.STATUS_IN_COLLECTION,
+                )
+                call_command("rebuild_rollups", stdout=StringIO())
+                self.assertEqual(
+                    self._rollups(),
+                    {
+                        (self.other_client.id, Account.STATUS_IN_COLLECTION): (
+                            1,
+                            Decimal("1.00"),
+                        )
+                    },
+                )
+
+    def test_unchanged_import_writes_no_rollups(self):
+        """Test that re-importing the same file leaves the rollups alone."""
+        service = CSVImportService(self.agency.id, self.client.id)
+        service.import_csv(CSV_CONTENT)
+        before = self._rollups()
+        service.import_csv(CSV_CONTENT)
+        self.assertEqual(self._rollups(), before)
+        self.assertRollupsMatchAccounts()
+
+    def test_account_writes_update_rollups(self):
+        """Test that saving and deleting accounts updates the rollups."""
+        account = Account.objects.create(
+            client_reference_no="REF100",
+            balance=Decimal("50.00"),
+            status=Account.STATUS_IN_COLLECTION,
+            client=self.client,
+        )
+        self.assertRollupsMatchAccounts()
+
+        account.balance = Decimal("20.00")
+        account.status = Account.STATUS_PAID_IN_FULL
+        account.save()
+        self.assertRollupsMatchAccounts()
+
+        # Fields left out of update_fields keep their stored values
+        account.balance = Decimal("999.00")
+        account.client = self.other_client
+        account.save(update_fields=["client"])
+        self.assertRollupsMatchAccounts()
+
+        account.delete()
+        self.assertRollupsMatchAccounts()
+
+        # Deleting a client deletes its accounts and rollups
+        self.other_client.delete()
+        self.assertEqual(self._rollups(), {})
+
+    def test_rebuild_and_verify(self):
+        """Test that the command reports and repairs drifted rollups."""
+        CSVImportService(self.agency.id, self.client.id).import_csv(CSV_CONTENT)
+        call_command("rebuild_rollups", "--verify", stdout=StringIO())
+
+        # Bulk updates bypass the rollups
+        Account.objects.filter(client_reference_no="REF001").update(
+            balance=Decimal("1.00")
+        )
+        BalanceRollup.objects.filter(status=Account.STATUS_PAID_IN_FULL).delete()
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--verify", stdout=out)
+        self.assertIn(f"Client {self.client.id} IN_COLLECTION", out.getvalue())
+        self.assertIn(f"Client {self.client.id} PAID_IN_FULL", out.getvalue())
+
+        out = StringIO()
+        call_command("rebuild_rollups", "--client", str(self.client.id), stdout=out)
+        self.assertIn("(2 were wrong)", out.getvalue())
+        self.assertRollupsMatchAccounts()
+        call_command("rebuild_rollups", "--verify", stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_rollups", "--client", "0", stdout=StringIO())
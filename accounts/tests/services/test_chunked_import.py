@@ -0,0 +1,172 @@
+from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from accounts.models import (
+    CollectionAgency,
+    Client,
+    Account,
+    AccountConsumer,
+    ImportCheckpoint,
+)
+from accounts.services import CSVImportService, CSVImportError
+from decimal import Decimal
+
+HEADER = "client reference no,balance,status,consumer name,consumer address,ssn\n"
+
+
+def build_rows(count, bad_row=None):
+    """Build CSV rows, optionally with an invalid balance on one row."""
+    rows = []
+    for i in range(count):
+        balance = "invalid" if i == bad_row else f"{i}.00"
+        rows.append(
+            f"REF{i:03d},{balance},IN_COLLECTION,Consumer {i},{i} Main St,"
+            f"{i:03d}-00-0000\n"
+        )
+    return rows
+
+
+class ChunkedImportTest(TestCase):
+    """Test cases for chunked imports with resumable checkpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+
+    def test_chunked_import_records_checkpoint(self):
+        """Test that a chunked import commits and records every chunk."""
+        content = (HEADER + "".join(build_rows(10))).encode("utf-8")
+        service = CSVImportService(self.agency.id, self.client.id)
+
+        result = service.import_csv(
+            SimpleUploadedFile("accounts.csv", content), commit_every=3
+        )
+
+        self.assertEqual(result["accounts_created"], 10)
+        self.assertEqual(result["consumer_accounts_linked"], 10)
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual(service.checkpoint, checkpoint)
+        self.assertEqual(checkpoint.status, ImportCheckpoint.STATUS_COMPLETED)
+        self.assertEqual(checkpoint.rows_committed, 10)
+        self.assertEqual(checkpoint.byte_offset, len(content))
+        self.assertEqual(checkpoint.file_name, "accounts.csv")
+        self.assertEqual(checkpoint.stats, result)
+
+    def test_failed_chunk_keeps_committed_chunks(self):
+        """Test that a failure only rolls back the chunk it happened in."""
+        content = HEADER + "".join(build_rows(10, bad_row=7))
+        service = CSVImportService(self.agency.id, self.client.id)
+
+        with self.assertRaises(CSVImportError) as context:
+            service.import_csv(content, commit_every=3)
+
+        self.assertIn("Row 9: Invalid balance", str(context.exception))
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual(checkpoint.status, ImportCheckpoint.STATUS_FAILED)
+        self.assertIn("Invalid balance", checkpoint.error)
+        self.assertEqual(checkpoint.rows_committed, 6)
+        self.assertEqual(checkpoint.stats["accounts_created"], 6)
+        self.assertEqual(Account.objects.count(), 6)
+
+    def test_resume_skips_committed_part_of_file(self):
+        """Test that resuming continues after the last committed row."""
+        rows = build_rows(10, bad_row=7)
+        with self.assertRaises(CSVImportError):
+            CSVImportService.process_csv_file(
+                HEADER + "".join(rows), self.agency.id, self.client.id, commit_every=3
+            )
+        checkpoint = ImportCheckpoint.objects.get()
+
+        # Break the committed rows (keeping their length) and fix the failed one:
+        # a resumed import must not parse the first part of the file again
+        resumed_rows = [r.replace("IN_COLLECTION", "IN_COLLECTIOX") for r in rows[:6]]
+        resumed_rows += build_rows(10)[6:]
+        content = (HEADER + "".join(resumed_rows)).encode("utf-8")
+
+        result = CSVImportService.resume_csv_file(
+            SimpleUploadedFile("accounts.csv", content), checkpoint.id
+        )
+
+        self.assertEqual(result["accounts_processed"], 10)
+        self.assertEqual(result["accounts_created"], 10)
+        self.assertEqual(result["consumer_accounts_linked"], 10)
+        self.assertEqual(Account.objects.count(), 10)
+        self.assertEqual(AccountConsumer.objects.count(), 10)
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF007").balance, Decimal("7.00")
+        )
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.status, ImportCheckpoint.STATUS_COMPLETED)
+        self.assertEqual(checkpoint.rows_committed, 10)
+
+    def test_resume_keeps_first_occurrence_of_unchanged_accounts(self):
+        """Test that accounts found unchanged before a failure are not written again."""
+        CSVImportService.process_csv_file(
+            HEADER + "".join(build_rows(3)), self.agency.id, self.client.id
+        )
+        duplicate = "REF001,999.00,IN_COLLECTION,Consumer 1,1 Main St,001-00-0000\n"
+        with self.assertRaises(CSVImportError):
+            CSVImportService.process_csv_file(
+                HEADER + "".join(build_rows(9, bad_row=7)) + duplicate,
+                self.agency.id,
+                self.client.id,
+                commit_every=3,
+            )
+        checkpoint = ImportCheckpoint.objects.get(status=ImportCheckpoint.STATUS_FAILED)
+        self.assertEqual(checkpoint.stats["accounts_unchanged"], 3)
+
+        result = CSVImportService.resume_csv_file(
+            HEADER + "".join(build_rows(9)) + duplicate, checkpoint.id
+        )
+
+        self.assertEqual(result["accounts_processed"], 9)
+        self.assertEqual(result["accounts_created"], 6)
+        self.assertEqual(result["accounts_unchanged"], 3)
+        self.assertEqual(result["accounts_updated"], 0)
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF001").balance, Decimal("1.00")
+        )
+
+    def test_unchanged_account_gaining_consumer_later_is_updated(self):
+        """Test that an unchanged account linked in a later chunk counts as updated."""
+        CSVImportService.process_csv_file(
+            HEADER + "".join(build_rows(3)), self.agency.id, self.client.id
+        )
+        account = Account.objects.get(client_reference_no="REF000")
+        extra = "REF000,0.00,IN_COLLECTION,Someone Else,9 Side St,999-00-0000\n"
+
+        result = CSVImportService.process_csv_file(
+            HEADER + "".join(build_rows(3)) + extra,
+            self.agency.id,
+            self.client.id,
+            commit_every=3,
+        )
+
+        self.assertEqual(result["accounts_unchanged"], 2)
+        self.assertEqual(result["accounts_updated"], 1)
+        self.assertEqual(result["consumer_accounts_linked"], 1)
+        updated = Account.objects.get(pk=account.pk)
+        self.assertGreater(updated.updated_at, account.updated_at)
+        self.assertNotEqual(updated.fingerprint, account.fingerprint)
+
+        # The file is now fully in the database
+        result = CSVImportService.process_csv_file(
+            HEADER + "".join(build_rows(3)) + extra,
+            self.agency.id,
+            self.client.id,
+        )
+        self.assertEqual(result["accounts_unchanged"], 3)
+
+    def test_resume_completed_import_fails(self):
+        """Test that a completed import cannot be resumed."""
+        content = HEADER + "".join(build_rows(2))
+        CSVImportService.process_csv_file(
+            content, self.agency.id, self.client.id, commit_every=5
+        )
+
+        with self.assertRaises(CSVImportError) as context:
+            CSVImportService.resume_csv_file(content, ImportCheckpoint.objects.get().id)
+
+        self.assertIn("already completed", str(context.exception))
@@ -0,0 +1,159 @@
+import io
+from decimal import Decimal
+from unittest import skipUnless
+from django.test import TestCase
+from accounts.models import (
+    CollectionAgency,
+    Client,
+    Account,
+    AccountConsumer,
+    Consumer,
+)
+from accounts.services import CSVImportService, CSVImportError, CSVValidationError
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF001,100.50,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555
+REF003,0,INACTIVE,Jane S.,Elsewhere,987-65-4321"""
+
+COLUMNS = {
+    "client reference no": ["REF001", "REF002", "REF001", "REF003"],
+    "balance": ["100.50", "200.75", "100.50", "0"],
+    "status": ["IN_COLLECTION", "PAID_IN_FULL", "IN_COLLECTION", "INACTIVE"],
+    "consumer name": ["John Doe", "Jane Smith", "Bob Johnson", "Jane S."],
+    "consumer address": ["123 Main St", "456 Oak Ave", "789 Pine St", "Elsewhere"],
+    "ssn": ["123-45-6789", "987-65-4321", "555-55-5555", "987-65-4321"],
+}
+
+
+@skipUnless(pa, "pyarrow is not installed")
+class ColumnarImportTest(TestCase):
+    """Test cases for importing Parquet and Arrow IPC files."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.service = CSVImportService(self.agency.id, self.client.id)
+
+    def _table(self, **overrides):
+        columns = dict(COLUMNS, **overrides)
+        return pa.table(
+            {
+                name: values if isinstance(values, pa.Array) else pa.array(values)
+                for name, values in columns.items()
+            }
+        )
+
+    def _parquet(self, table):
+        buffer = io.BytesIO()
+        pa.parquet.write_table(table, buffer, row_group_size=2)
+        return buffer.getvalue()
+
+    def _arrow(self, table, stream=False):
+        sink = pa.BufferOutputStream()
+        new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+        with new_writer(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=3)
+        return sink.getvalue().to_pybytes()
+
+    def _snapshot(self):
+        return (
+            sorted(Account.objects.values_list("client_reference_no", "balance")),
+            sorted(
+                AccountConsumer.objects.values_list(
+                    "account__client_reference_no", "consumer__ssn"
+                )
+            ),
+        )
+
+    def test_columnar_files_match_csv_import(self):
+        """Test that every columnar format gives the same result as the CSV."""
+        csv_stats = self.service.import_csv(CSV_CONTENT)
+        csv_rows = self._snapshot()
+        decimals = pa.array(
+            [Decimal(v) for v in COLUMNS["balance"]], type=pa.decimal128(12, 2)
+        )
+        files = {
+            "parquet": self._parquet(self._table(balance=decimals)),
+            "arrow_file": self._arrow(self._table()),
+            "arrow_stream": self._arrow(
+                self._table(status=pa.array(COLUMNS["status"]).dictionary_encode()),
+                stream=True,
+            ),
+        }
+
+        for name, content in files.items():
+            with self.subTest(format=name):
+                AccountConsumer.objects.all().delete()
+                Account.objects.all().delete()
+                Consumer.objects.all().delete()
+
+                stats = CSVImportService(self.agency.id, self.client.id).import_csv(
+                    io.BytesIO(content)
+                )
+
+                self.assertEqual(stats, csv_stats)
+                self.assertEqual(self._snapshot(), csv_rows)
+
+    def test_numeric_balances(self):
+        """Test that integer and float balances are converted to cents."""
+        table = self._table(balance=pa.array([100.499, 200.75, 1.0, 0.0]))
+
+        self.service.import_csv(self._parquet(table))
+
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF001").balance,
+            Decimal("100.50"),
+        )
+
+    def test_all_errors_reported(self):
+        """Test that column validation reports every invalid row."""
+        table = self._table(
+            balance=pa.array(["1", "-2", "abc", None]),
+            status=["IN_COLLECTION", "UNKNOWN", "INACTIVE", "INACTIVE"],
+            ssn=["123-45-6789", "987-65-4321", "555555555", "987-65-4321"],
+        )
+
+        with self.assertRaises(CSVValidationError) as context:
+            self.service.import_csv(self._parquet(table))
+
+        self.assertEqual(
+            [str(error) for error in context.exception.errors],
+            [
+                "Row 2: Invalid status 'UNKNOWN'. "
+                "Must be one of: IN_COLLECTION, PAID_IN_FULL, INACTIVE",
+                "Row 2: Balance must be non-negative",
+                "Row 3: Invalid balance 'abc'. Must be a number.",
+                "Row 3: Invalid SSN format. Must be XXX-XX-XXXX.",
+                "Row 4: Missing required field 'balance'",
+            ],
+        )
+        self.assertEqual(Account.objects.count(), 0)
+
+    def test_missing_columns(self):
+        """Test that a file without the required columns is rejected."""
+        table = self._table().drop_columns(["ssn"])
+
+        with self.assertRaises(CSVImportError) as context:
+            self.service.import_csv(self._parquet(table))
+
+        self.assertIn("Missing required columns: ssn", str(context.exception))
+
+    def test_columnar_dry_run(self):
+        """Test that dry runs work on columnar files."""
+        result = self.service.import_csv(self._parquet(self._table()), dry_run=True)
+
+        self.assertTrue(result["dry_run"])
+        self.assertEqual(result["accounts_created"], 3)
+        self.assertEqual(Account.objects.count(), 0)
@@ -0,0 +1,99 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+import zipfile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Account
+from accounts.services import CSVImportService, CSVImportError, CSVLineStream
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,José Núñez,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF001,100.50,IN_COLLECTION,Bob Johnson,789 Pine St,555-55-5555
+""".encode()
+
+
+def _zip(content, names=("accounts.csv",)):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+    "zip": _zip,
+}
+
+
+class CompressedImportTest(TestCase):
+    """Test cases for importing compressed CSV files."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+
+    def test_compressed_uploads_imported(self):
+        """Test that every supported format is detected and imported."""
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                Account.objects.all().delete()
+                csv_file = SimpleUploadedFile(
+                    "accounts.csv.bin", compress(CSV_CONTENT), content_type="text/csv"
+                )
+
+                result = CSVImportService(self.agency.id, self.client.id).import_csv(
+                    csv_file
+                )
+
+                self.assertEqual(result["accounts_created"], 2)
+                self.assertEqual(result["consumer_accounts_linked"], 3)
+
+    def test_decompressed_in_small_chunks(self):
+        """Test that lines and characters split across chunks are reassembled."""
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                stream = CSVLineStream(io.BytesIO(compress(CSV_CONTENT)), chunk_size=7)
+
+                self.assertEqual("".join(stream), CSV_CONTENT.decode())
+                self.assertEqual(stream.compression, compression)
+                self.assertEqual(stream.offset, len(CSV_CONTENT))
+
+    def test_offset_counts_decompressed_bytes(self):
+        """Test that a stream can resume from a decompressed offset."""
+        offset = len(CSV_CONTENT.split(b"\n", 2)[0]) + 1
+        for compression, compress in COMPRESSORS.items():
+            with self.subTest(compression=compression):
+                stream = CSVLineStream(compress(CSV_CONTENT), offset=offset)
+
+                self.assertEqual("".join(stream), CSV_CONTENT[offset:].decode())
+
+    def test_zip_with_several_files_rejected(self):
+        """Test that an archive with more than one file is rejected."""
+        content = _zip(CSV_CONTENT, names=("a.csv", "b.csv"))
+
+        with self.assertRaises(CSVImportError) as context:
+            CSVImportService(self.agency.id, self.client.id).import_csv(content)
+
+        self.assertIn("exactly one CSV file", str(context.exception))
+
+    def test_compressed_file_not_parsed_in_parallel(self):
+        """Test that the parallel path refuses compressed files."""
+        with tempfile.NamedTemporaryFile(suffix=".csv.gz", delete=False) as f:
+            f.write(gzip.compress(CSV_CONTENT))
+        self.addCleanup(os.remove, f.name)
+
+        with self.assertRaises(CSVImportError) as context:
+            CSVImportService(self.agency.id, self.client.id).import_csv_parallel(f.name)
+
+        self.assertIn("cannot be parsed in parallel", str(context.exception))
@@ -0,0 +1,192 @@
+import io
+import threading
+from datetime import timedelta
+from unittest import skipIf
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from accounts.locks import ClientImportLock, ImportLockTimeout
+from accounts.models import (
+    CollectionAgency,
+    Client,
+    Account,
+    Consumer,
+    AccountConsumer,
+    ImportLock,
+)
+from accounts.services import CSVImportService, CSVImportError
+
+HEADER = "client reference no,balance,status,consumer name,consumer address,ssn"
+
+
+def build_csv(refs, ssns):
+    """Build a CSV linking every account to every SSN."""
+    lines = [HEADER]
+    for ref in refs:
+        for ssn in ssns:
+            lines.append(f"{ref},100.00,IN_COLLECTION,Consumer {ssn},1 Main St,{ssn}")
+    return "\n".join(lines) + "\n"
+
+
+class ConcurrentImportTest(TransactionTestCase):
+    """Test cases for imports running at the same time."""
+
+    CLIENTS = 4
+    IMPORTS_PER_CLIENT = 2
+    ACCOUNTS_PER_CLIENT = 100
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.clients = [
+            Client.objects.create(name=f"Client {n}", collection_agency=self.agency)
+            for n in range(self.CLIENTS)
+        ]
+        self.ssns = [f"{n:03d}-45-6789" for n in range(100, 130)]
+
+    def _run_at_once(self, imports):
+        """Run (client, content) imports in threads, all starting together."""
+        barrier = threading.Barrier(len(imports))
+        results, errors = [], []
+
+        def run(client, content):
+            try:
+                barrier.wait()
+                results.append(
+                    CSVImportService(self.agency.id, client.id).import_csv(content)
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=args) for args in imports]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_stress(self):
+        """Test that concurrent imports sharing consumers and accounts all succeed."""
+        # Every file has accounts of its own client, accounts whose references are
+        # shared by all the clients, and consumers shared by all the files
+        imports = []
+        for n in range(self.IMPORTS_PER_CLIENT):
+            ssns = self.ssns[n * 10 : n * 10 + 20]
+            for client in self.clients:
+                refs = [
+                    f"C{client.id}-{i}" for i in range(self.ACCOUNTS_PER_CLIENT)
+                ] + [f"SHARED-{i}" for i in range(10)]
+                imports.append((client, build_csv(refs, ssns)))
+
+        results, errors = self._run_at_once(imports)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), len(imports))
+        self.assertEqual(Consumer.objects.count(), 30)
+        self.assertEqual(
+            Account.objects.count(), self.CLIENTS * self.ACCOUNTS_PER_CLIENT + 10
+        )
+        # Both files of a client link its accounts to the union of their SSNs
+        for client in self.clients:
+            own = AccountConsumer.objects.filter(
+                account__client_reference_no__startswith=f"C{client.id}-"
+            )
+            self.assertEqual(own.count(), self.ACCOUNTS_PER_CLIENT * 30)
+        self.assertEqual(
+            AccountConsumer.objects.filter(
+                account__client_reference_no__startswith="SHARED-"
+            ).count(),
+            10 * 30,
+        )
+        self.assertFalse(ImportLock.objects.exists())
+
+    def test_moving_shared_accounts_keeps_rollups(self):
+        """Test that imports moving shared accounts keep the rollups correct."""
+        refs = [f"SHARED-{i}" for i in range(50)]
+        statuses = ["IN_COLLECTION", "PAID_IN_FULL", "INACTIVE"]
+        imports = []
+        for round_ in range(2):
+            for n, client in enumerate(self.clients):
+                lines = [HEADER]
+                for i, ref in enumerate(refs):
+                    status = statuses[(i + n + round_) % len(statuses)]
+                    lines.append(
+                        f"{ref},{n + round_ + 1}.{i:02d},{status},"
+                        f"Consumer,1 Main St,{self.ssns[i % len(self.ssns)]}"
+                    )
+                imports.append((client, "\n".join(lines) + "\n"))
+
+        results, errors = self._run_at_once(imports)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(Account.objects.count(), len(refs))
+        out = io.StringIO()
+        call_command("rebuild_rollups", verify=True, stdout=out)
+        self.assertIn("are correct", out.getvalue())
+
+    def test_same_client_waits_for_lock(self):
+        """Test that an import waits while another import of the client runs."""
+        client = self.clients[0]
+        lock = ClientImportLock(client.id)
+        lock.acquire()
+        done = threading.Event()
+
+        def run():
+            try:
+                CSVImportService(self.agency.id, client.id).import_csv(
+                    build_csv(["REF001"], self.ssns[:1])
+                )
+                done.set()
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        self.assertFalse(done.wait(0.3))
+        self.assertFalse(Account.objects.exists())
+
+        lock.release()
+        thread.join()
+        self.assertTrue(done.is_set())
+        self.assertTrue(Account.objects.filter(client_reference_no="REF001").exists())
+
+    @override_settings(IMPORT_LOCK_TIMEOUT=0.1)
+    def test_lock_timeout(self):
+        """Test that an import gives up when the lock is not released in time."""
+        lock = ClientImportLock(self.clients[0].id)
+        lock.acquire()
+        try:
+            with self.assertRaises(CSVImportError) as context:
+                CSVImportService(self.agency.id, self.clients[0].id).import_csv(
+                    build_csv(["REF001"], self.ssns[:1])
+                )
+            self.assertIn("in progress", str(context.exception))
+
+            # Other clients are not affected
+            CSVImportService(self.agency.id, self.clients[1].id).import_csv(
+                build_csv(["REF002"], self.ssns[:1])
+            )
+        finally:
+            lock.release()
+        self.assertEqual(
+            list(Account.objects.values_list("client_reference_no", flat=True)),
+            ["REF002"],
+        )
+
+    @skipIf(connection.vendor == "postgresql", "PostgreSQL uses advisory locks")
+    def test_stale_lock_taken_over(self):
+        """Test that a lock left behind by a crashed import expires."""
+        ImportLock.objects.create(client=self.clients[0], owner="crashed")
+        lock = ClientImportLock(self.clients[0].id, timeout=0)
+        with self.assertRaises(ImportLockTimeout):
+            lock.acquire()
+
+        ImportLock.objects.update(acquired_at=timezone.now() - timedelta(days=1))
+        lock.acquire()
+        self.assertEqual(ImportLock.objects.get().owner, lock.owner)
+        lock.release()
+        self.assertFalse(ImportLock.objects.exists())
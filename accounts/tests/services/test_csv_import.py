@@ -1,8 +1,11 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.files.uploadedfile import SimpleUploadedFile
 from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
-from accounts.services import CSVImportService, CSVImportError
+from accounts.services import CSVImportService, CSVImportError, CSVLineStream
 import io
+from unittest.mock import patch
 from decimal import Decimal
 
 
@@ -125,3 +128,80 @@ REF001,150.75,PAID_IN_FULL,John Doe,123 Main St,123-45-6789
         updated_account = Account.objects.get(client_reference_no="REF001")
         self.assertEqual(updated_account.balance, Decimal("150.75"))
         self.assertEqual(updated_account.status, Account.STATUS_PAID_IN_FULL)
+
+    def _build_csv(self, num_accounts, consumers_per_account=2, prefix="REF"):
+        """Build CSV content with the given number of accounts."""
+        lines = [
+            "client reference no,balance,status,consumer name,consumer address,ssn"
+        ]
+        for i in range(num_accounts):
+            for j in range(consumers_per_account):
+                consumer_no = i * consumers_per_account + j
+                lines.append(
+                    f"{prefix}{i:05d},{i}.25,IN_COLLECTION,Consumer {consumer_no},"
+                    f"{consumer_no} Main St,{consumer_no:03d}-00-0000"
+                )
+        return "\n".join(lines)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Test that the import issues a bounded number of queries."""
+        with CaptureQueriesContext(connection) as small:
+            CSVImportService.process_csv_file(
+                self._build_csv(5), self.agency.id, self.client.id
+            )
+        # Small enough for one INSERT per table under SQLite's 999 parameter limit
+        with CaptureQueriesContext(connection) as large:
+            result = CSVImportService.process_csv_file(
+                self._build_csv(80, prefix="NEW"), self.agency.id, self.client.id
+            )
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(result["accounts_created"], 80)
+        self.assertEqual(result["accounts_updated"], 0)
+        self.assertEqual(result["consumers_created"], 150)
+        self.assertEqual(result["consumer_accounts_linked"], 160)
+        self.assertEqual(AccountConsumer.objects.count(), 170)
+
+    def test_first_occurrence_wins_and_duplicate_links_ignored(self):
+        """Test that repeated account rows keep the first account data."""
+        csv_content = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.00,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF001,999.00,INACTIVE,John Doe,123 Main St,123-45-6789
+REF002,50.00,INACTIVE,Johnny Doe,1 Other St,123-45-6789"""
+
+        result = CSVImportService.process_csv_file(
+            csv_content, self.agency.id, self.client.id
+        )
+
+        self.assertEqual(result["accounts_processed"], 2)
+        self.assertEqual(result["consumers_created"], 1)
+        self.assertEqual(result["consumer_accounts_linked"], 2)
+        account = Account.objects.get(client_reference_no="REF001")
+        self.assertEqual(account.balance, Decimal("100.00"))
+        self.assertEqual(account.status, Account.STATUS_IN_COLLECTION)
+        self.assertEqual(Consumer.objects.get().name, "John Doe")
+
+    def test_line_stream_handles_multibyte_characters_across_chunks(self):
+        """Test that the line stream decodes characters split between chunks."""
+        content = "name\nJosé Núñez\nZoë\n".encode("utf-8")
+
+        lines = list(CSVLineStream(io.BytesIO(content), chunk_size=3))
+
+        self.assertEqual(lines, ["name\n", "José Núñez\n", "Zoë\n"])
+
+    def test_import_streams_uploaded_file(self):
+        """Test importing an uploaded file without reading it in one go."""
+        csv_content = self._build_csv(20).encode("utf-8")
+        csv_file = SimpleUploadedFile("test.csv", csv_content, content_type="text/csv")
+
+        with (
+            patch.object(CSVLineStream, "CHUNK_SIZE", 64),
+            patch.object(csv_file, "chunks", wraps=csv_file.chunks) as chunks,
+        ):
+            result = CSVImportService.process_csv_file(
+                csv_file, self.agency.id, self.client.id
+            )
+
+        chunks.assert_called_once_with(64)
+        self.assertEqual(result["accounts_created"], 20)
+        self.assertEqual(result["consumer_accounts_linked"], 40)
@@ -0,0 +1,123 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.services import CSVImportService
+from decimal import Decimal
+from functools import partial
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF002,200.75,PAID_IN_FULL,Bob Johnson,789 Pine St,555-55-5555
+REF003,0.00,INACTIVE,Jane Smith,456 Oak Ave,987-65-4321"""
+
+
+class DeltaImportTest(TestCase):
+    """Test cases for skipping unchanged accounts on re-import."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self._import(CSV_CONTENT)
+
+    def _import(self, content, client=None):
+        client = client or self.client
+        return CSVImportService(self.agency.id, client.id).import_csv(content)
+
+    def _updated_at(self):
+        return dict(Account.objects.values_list("client_reference_no", "updated_at"))
+
+    def test_reimport_writes_nothing(self):
+        """Test that re-importing the same file skips every account."""
+        before = self._updated_at()
+
+        with CaptureQueriesContext(connection) as context:
+            result = self._import(CSV_CONTENT)
+
+        self.assertEqual(result["accounts_processed"], 3)
+        self.assertEqual(result["accounts_unchanged"], 3)
+        self.assertEqual(result["accounts_updated"], 0)
+        self.assertEqual(result["consumers_created"], 0)
+        self.assertEqual(result["consumer_accounts_linked"], 0)
+        self.assertEqual(self._updated_at(), before)
+        writes = [
+            query["sql"]
+            for query in context.captured_queries
+            if not query["sql"].startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+            # The client's import lock is taken whatever the file contains
+            and "accounts_importlock" not in query["sql"]
+        ]
+        self.assertEqual(writes, [])
+
+    def test_only_changed_accounts_written(self):
+        """Test that balance, status and consumer changes are written."""
+        before = self._updated_at()
+        content = CSV_CONTENT.replace("100.50,IN_COLLECTION", "90.00,IN_COLLECTION")
+        content = content.replace("0.00,INACTIVE", "0.00,PAID_IN_FULL")
+        content += "\nREF002,200.75,PAID_IN_FULL,Ann Lee,1 Elm St,111-22-3333"
+
+        result = self._import(content)
+
+        self.assertEqual(result["accounts_updated"], 3)
+        self.assertEqual(result["accounts_unchanged"], 0)
+        self.assertEqual(result["consumer_accounts_linked"], 1)
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF001").balance,
+            Decimal("90.00"),
+        )
+        self.assertNotEqual(self._updated_at()["REF003"], before["REF003"])
+
+        # The new fingerprints make the next import of the same file a no-op
+        result = self._import(content)
+        self.assertEqual(result["accounts_unchanged"], 3)
+
+    def test_consumers_linked_earlier_are_not_a_change(self):
+        """Test that a file listing fewer of an account's consumers skips it."""
+        # REF002 stays linked to Bob Johnson from the first import
+        content = "\n".join(CSV_CONTENT.splitlines()[:3])
+        service = CSVImportService(self.agency.id, self.client.id)
+
+        dry_run = partial(service.import_csv, dry_run=True)
+        for import_file in (dry_run, service.import_csv, service.import_csv_staged):
+            result = import_file(content)
+
+            self.assertEqual(result["accounts_unchanged"], 2)
+            self.assertEqual(result["accounts_updated"], 0)
+        self.assertEqual(
+            AccountConsumer.objects.filter(
+                account__client_reference_no="REF002"
+            ).count(),
+            2,
+        )
+
+    def test_accounts_of_another_client_are_moved(self):
+        """Test that a matching fingerprint does not skip a change of client."""
+        other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.agency
+        )
+
+        result = self._import(CSV_CONTENT, client=other_client)
+
+        self.assertEqual(result["accounts_updated"], 3)
+        self.assertEqual(other_client.accounts.count(), 3)
+
+    def test_edits_outside_imports_clear_fingerprint(self):
+        """Test that an account changed through the ORM is rewritten."""
+        account = Account.objects.get(client_reference_no="REF001")
+        account.balance = Decimal("1.00")
+        account.save()
+        AccountConsumer.objects.get(account__client_reference_no="REF003").delete()
+        consumer = Consumer.objects.with_ssn("555-55-5555").get()
+        consumer.name = "Robert Johnson"
+        consumer.save()
+
+        result = self._import(CSV_CONTENT)
+
+        self.assertEqual(result["accounts_updated"], 3)
+        self.assertEqual(result["accounts_unchanged"], 0)
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal("100.50"))
@@ -0,0 +1,126 @@
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.services import CSVImportService, ImportDiff
+from decimal import Decimal
+from unittest.mock import patch
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF002,1.00,INACTIVE,Bob Johnson,789 Pine St,555-55-5555
+REF003,10.00,INACTIVE,Jane S.,Elsewhere,987-65-4321
+REF004,10,INACTIVE,Ann Lee,1 Elm St,111-22-3333"""
+
+
+class DryRunImportTest(TestCase):
+    """Test cases for dry-run imports."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.agency
+        )
+
+        jane = Consumer.objects.create(
+            name="Jane Smith", address="456 Oak Ave", ssn="987-65-4321"
+        )
+        # REF002 changes balance and status; REF003 moves from another client
+        account = Account.objects.create(
+            client_reference_no="REF002",
+            balance=Decimal("1.00"),
+            status=Account.STATUS_IN_COLLECTION,
+            client=self.client,
+        )
+        AccountConsumer.objects.create(account=account, consumer=jane)
+        Account.objects.create(
+            client_reference_no="REF003",
+            balance=Decimal("10.00"),
+            status=Account.STATUS_INACTIVE,
+            client=other_client,
+        )
+        # REF004 does not change
+        Account.objects.create(
+            client_reference_no="REF004",
+            balance=Decimal("10.00"),
+            status=Account.STATUS_INACTIVE,
+            client=self.client,
+        )
+
+    def _snapshot(self):
+        return (
+            list(Account.objects.order_by("id").values()),
+            list(Consumer.objects.order_by("id").values()),
+            list(AccountConsumer.objects.order_by("id").values()),
+        )
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run leaves the database untouched."""
+        before = self._snapshot()
+        CSVImportService(self.agency.id, self.client.id).import_csv(
+            CSV_CONTENT, dry_run=True
+        )
+        self.assertEqual(self._snapshot(), before)
+
+    def test_dry_run_matches_import_stats(self):
+        """Test that a dry run predicts the statistics of the real import."""
+        diff = CSVImportService(self.agency.id, self.client.id).import_csv(
+            CSV_CONTENT, dry_run=True
+        )
+        stats = CSVImportService(self.agency.id, self.client.id).import_csv(CSV_CONTENT)
+
+        self.assertTrue(diff.pop("dry_run"))
+        self.assertEqual(diff.pop("balances_changed"), 1)
+        self.assertEqual(diff.pop("statuses_changed"), 1)
+        diff.pop("changes")
+        self.assertEqual(diff, stats)
+
+    def test_dry_run_across_batches(self):
+        """Test that first occurrences and links are tracked across batches."""
+        with patch.object(ImportDiff, "BATCH_SIZE", 2):
+            diff = CSVImportService(self.agency.id, self.client.id).import_csv(
+                CSV_CONTENT, dry_run=True
+            )
+        stats = CSVImportService(self.agency.id, self.client.id).import_csv(CSV_CONTENT)
+
+        for key, value in stats.items():
+            self.assertEqual(diff[key], value, key)
+        self.assertEqual(diff["balances_changed"], 1)
+
+    def test_dry_run_sample_of_changes(self):
+        """Test the sample of account changes."""
+        diff = CSVImportService(self.agency.id, self.client.id).import_csv(
+            CSV_CONTENT, dry_run=True
+        )
+
+        self.assertEqual(
+            diff["changes"],
+            [
+                {
+                    "client_reference_no": "REF001",
+                    "action": "create",
+                    "changes": {"balance": {"old": None, "new": "100.50"}},
+                },
+                {
+                    "client_reference_no": "REF002",
+                    "action": "update",
+                    "changes": {
+                        "balance": {"old": "1.00", "new": "200.75"},
+                        "status": {"old": "IN_COLLECTION", "new": "PAID_IN_FULL"},
+                    },
+                },
+                {
+                    "client_reference_no": "REF003",
+                    "action": "update",
+                    "changes": {
+                        "client_id": {
+                            "old": str(self.client.id + 1),
+                            "new": str(self.client.id),
+                        }
+                    },
+                },
+            ],
+        )
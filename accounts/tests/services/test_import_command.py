@@ -0,0 +1,147 @@
+import gzip
+import io
+import os
+import tempfile
+from unittest.mock import patch
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Account, ImportCheckpoint
+from accounts.services import CSVImportService
+
+HEADER = "client reference no,balance,status,consumer name,consumer address,ssn\n"
+FILES = {
+    "a/accounts-1.csv": HEADER
+    + "REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789\n"
+    + "REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321\n",
+    "a/accounts-2.csv": HEADER
+    + "REF003,5.00,INACTIVE,Bob Johnson,789 Pine St,555-55-5555\n",
+    "b/accounts-3.csv.gz": HEADER
+    + "REF004,7.25,INACTIVE,Ann Lee,1 Elm St,111-22-3333\n",
+}
+
+
+class ImportAccountsCommandTest(TestCase):
+    """Test cases for the import_accounts management command."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for name, content in FILES.items():
+            self._write(name, content)
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = content.encode()
+        with open(path, "wb") as f:
+            f.write(gzip.compress(data) if name.endswith(".gz") else data)
+        return path
+
+    def _call(self, *paths, **options):
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "import_accounts",
+            *paths,
+            agency=self.agency.id,
+            client=self.client.id,
+            stdout=out,
+            stderr=err,
+            **options,
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_import_files_and_globs(self):
+        """Test that files and glob patterns are imported once each."""
+        pattern = os.path.join(self.directory.name, "**", "*.csv*")
+        first = os.path.join(self.directory.name, "a/accounts-1.csv")
+
+        out, _ = self._call(first, pattern)
+
+        self.assertEqual(
+            sorted(Account.objects.values_list("client_reference_no", flat=True)),
+            ["REF001", "REF002", "REF003", "REF004"],
+        )
+        self.assertIn("accounts-1.csv: accounts_processed=2, accounts_created=2", out)
+        self.assertIn("Imported 4 rows from 3 of 3 files", out)
+        self.assertIn("rows/sec", out)
+
+    def test_failed_file_does_not_stop_others(self):
+        """Test that an invalid file is reported and the others are imported."""
+        bad = self._write("a/bad.csv", HEADER + "REF009,abc,INACTIVE,X,Y,000-00-0000\n")
+        good = os.path.join(self.directory.name, "a/accounts-2.csv")
+
+        with self.assertRaises(CommandError) as context:
+            self._call(bad, good)
+
+        self.assertEqual(str(context.exception), "1 of 2 files failed to import.")
+        self.assertEqual(
+            list(Account.objects.values_list("client_reference_no", flat=True)),
+            ["REF003"],
+        )
+
+    def test_commit_every_and_dry_run(self):
+        """Test that chunked imports and dry runs are passed to the service."""
+        path = os.path.join(self.directory.name, "a/accounts-1.csv")
+
+        out, _ = self._call(path, dry_run=True)
+        self.assertIn("accounts_created=2", out)
+        self.assertEqual(Account.objects.count(), 0)
+
+        self._call(path, commit_every=1)
+        self.assertEqual(Account.objects.count(), 2)
+        self.assertEqual(ImportCheckpoint.objects.get().rows_committed, 2)
+
+    def test_parse_workers(self):
+        """Test that plain CSV files are parsed in parallel and others as usual."""
+        pattern = os.path.join(self.directory.name, "**", "*.csv*")
+
+        out, _ = self._call(pattern, parse_workers=2)
+
+        self.assertEqual(Account.objects.count(), 4)
+        self.assertIn("Imported 4 rows from 3 of 3 files", out)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+        with self.assertRaisesMessage(CommandError, "cannot be combined"):
+            self._call(pattern, parse_workers=2, dry_run=True)
+        with self.assertRaisesMessage(CommandError, "at least 1"):
+            self._call(pattern, parse_workers=0)
+
+    def test_staged(self):
+        """Test that every file is imported through the staging table."""
+        pattern = os.path.join(self.directory.name, "**", "*.csv*")
+
+        with patch.object(CSVImportService, "import_csv", side_effect=AssertionError):
+            out, _ = self._call(pattern, staged=True)
+
+        self.assertEqual(Account.objects.count(), 4)
+        self.assertIn("accounts-3.csv.gz: accounts_processed=1", out)
+        self.assertIn("Imported 4 rows from 3 of 3 files", out)
+
+        with self.assertRaisesMessage(
+            CommandError, "--commit-every and --staged cannot be combined."
+        ):
+            self._call(pattern, staged=True, commit_every=10)
+
+    def test_empty_file(self):
+        """Test that an empty file is reported as an error."""
+        path = self._write("empty.csv", "")
+
+        with self.assertRaises(CommandError):
+            self._call(path)
+
+    def test_invalid_arguments(self):
+        """Test that missing files and unknown clients are rejected."""
+        path = os.path.join(self.directory.name, "a/accounts-1.csv")
+
+        with self.assertRaisesMessage(CommandError, "No files match"):
+            self._call(os.path.join(self.directory.name, "*.parquet"))
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            self._call(os.path.join(self.directory.name, "missing.csv"))
+        with self.assertRaisesMessage(CommandError, "does not exist"):
+            call_command("import_accounts", path, agency=self.agency.id, client=0)
+        self.assertEqual(Account.objects.count(), 0)
@@ -0,0 +1,95 @@
+import os
+import tempfile
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Account, Consumer, AccountConsumer
+from accounts.parallel import find_partitions, read_headers
+from accounts.services import CSVImportService, CSVImportError
+from decimal import Decimal
+
+HEADER = "client reference no,balance,status,consumer name,consumer address,ssn\n"
+
+
+class ParallelImportTest(TestCase):
+    """Test cases for parsing and validating CSV files on several cores."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+
+    def _write_csv(self, rows):
+        """Write rows to a temporary CSV file and return its path."""
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w") as csv_file:
+            csv_file.write(HEADER + "".join(rows))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _build_rows(self, count):
+        """Build rows where every account appears in both halves of the file."""
+        rows = [
+            f"REF{i % (count // 2):04d},{i}.00,IN_COLLECTION,Consumer {i},"
+            f"{i} Main St,{i % 7:03d}-00-0000\n"
+            for i in range(count)
+        ]
+        return rows
+
+    def test_partitions_start_on_line_boundaries(self):
+        """Test that partitions cover the data and start at the start of a line."""
+        path = self._write_csv(self._build_rows(50))
+        headers, data_start = read_headers(path)
+
+        partitions = find_partitions(path, data_start, 4)
+
+        self.assertEqual(headers[0], "client reference no")
+        self.assertEqual(partitions[0][0], data_start)
+        self.assertEqual(partitions[-1][1], os.path.getsize(path))
+        with open(path, "rb") as csv_file:
+            content = csv_file.read()
+        for (start, end), (next_start, _) in zip(partitions, partitions[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(content[next_start - 1 : next_start], b"\n")
+
+    def test_parallel_import_matches_serial_import(self):
+        """Test that the parallel import gives the same result as the serial one."""
+        path = self._write_csv(self._build_rows(200))
+        service = CSVImportService(self.agency.id, self.client.id)
+
+        result = service.import_csv_parallel(path, workers=3)
+
+        self.assertEqual(
+            result,
+            {
+                "accounts_processed": 100,
+                "accounts_created": 100,
+                "accounts_updated": 0,
+                "accounts_unchanged": 0,
+                "consumers_created": 7,
+                "consumer_accounts_linked": 200,
+            },
+        )
+        # The first occurrence wins, even though it is in another partition
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF0099").balance,
+            Decimal("99.00"),
+        )
+        self.assertEqual(
+            Consumer.objects.with_ssn("003-00-0000").get().name, "Consumer 3"
+        )
+        self.assertEqual(AccountConsumer.objects.count(), 200)
+
+    def test_parallel_import_reports_file_row_number(self):
+        """Test that errors carry the row number in the whole file."""
+        rows = self._build_rows(100)
+        rows[80] = rows[80].replace("IN_COLLECTION", "UNKNOWN")
+        path = self._write_csv(rows)
+        service = CSVImportService(self.agency.id, self.client.id)
+
+        for workers in (4, 1):
+            with self.assertRaises(CSVImportError) as context:
+                service.import_csv_parallel(path, workers=workers)
+
+            self.assertIn("Row 82: Invalid status 'UNKNOWN'", str(context.exception))
+        self.assertEqual(Account.objects.count(), 0)
@@ -0,0 +1,150 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from accounts.jobs import run_import_job
+from accounts.services import CSVImportService
+from accounts.models import CollectionAgency, Client, Account, ImportJob
+
+CSV_CONTENT = b"""client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321"""
+
+
+@override_settings(IMPORT_JOB_STALE_AFTER=3600)
+class RecoverImportJobsCommandTest(TestCase):
+    """Test cases for the recover_import_jobs management command."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+
+    def _job(self, status=ImportJob.STATUS_PENDING, age=timedelta(hours=2)):
+        path = os.path.join(self.spool_dir, f"{ImportJob.objects.count()}.csv")
+        with open(path, "wb") as f:
+            f.write(CSV_CONTENT)
+        job = ImportJob.objects.create(
+            collection_agency=self.agency,
+            client=self.client,
+            file_name="test.csv",
+            file_path=path,
+            status=status,
+        )
+        ImportJob.objects.filter(id=job.id).update(updated_at=timezone.now() - age)
+        return job
+
+    def _call(self, **options):
+        out = io.StringIO()
+        call_command("recover_import_jobs", stdout=out, **options)
+        return out.getvalue()
+
+    def test_runs_lost_jobs(self):
+        """Test that stale pending and running jobs are run again."""
+        pending = self._job()
+        running = self._job(status=ImportJob.STATUS_RUNNING)
+        fresh = self._job(age=timedelta(minutes=5))
+
+        output = self._call()
+
+        self.assertIn("Recovered 2 import jobs (0 failed).", output)
+        for job in (pending, running):
+            job.refresh_from_db()
+            self.assertEqual(job.status, ImportJob.STATUS_SUCCEEDED)
+            self.assertEqual(job.stats["accounts_processed"], 2)
+            self.assertFalse(os.path.exists(job.file_path))
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, ImportJob.STATUS_PENDING)
+        self.assertEqual(Account.objects.count(), 2)
+
+        self.assertIn("No lost import jobs.", self._call())
+
+    def test_fail_lost_jobs(self):
+        """Test that --fail marks the lost jobs as failed without importing."""
+        job = self._job(status=ImportJob.STATUS_RUNNING)
+
+        output = self._call(fail=True)
+
+        self.assertIn("Recovered 1 import jobs (1 failed).", output)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+        self.assertIn("Interrupted", job.error)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(Account.objects.count(), 0)
+        self.assertFalse(os.path.exists(job.file_path))
+
+    @override_settings(IMPORT_JOB_COMMIT_EVERY=1)
+    def test_resumes_interrupted_job(self):
+        """Test that an interrupted job resumes after its last committed chunk."""
+        job = self._job()
+        report_progress = CSVImportService._report_progress
+
+        def stop_after_first_chunk(service, rows_written):
+            if service.rows_written:
+                raise SystemExit
+            report_progress(service, rows_written)
+
+        with patch.object(
+            CSVImportService,
+            "_report_progress",
+            autospec=True,
+            side_effect=stop_after_first_chunk,
+        ):
+            with self.assertRaises(SystemExit):
+                run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_RUNNING)
+        self.assertEqual(job.checkpoint.rows_committed, 1)
+        ImportJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(hours=2)
+        )
+        # A restart would import the changed first row again
+        with open(job.file_path, "wb") as f:
+            f.write(CSV_CONTENT.replace(b"100.50", b"999.99"))
+
+        output = self._call()
+
+        self.assertIn("(0 failed)", output)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.stats["accounts_created"], 2)
+        self.assertEqual(job.rows_written, 2)
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF001").balance,
+            Decimal("100.50"),
+        )
+        self.assertEqual(Account.objects.count(), 2)
+        self.assertFalse(os.path.exists(job.file_path))
+
+    def test_missing_spooled_file_fails_job(self):
+        """Test that a lost job whose file is gone is failed."""
+        job = self._job(age=timedelta(hours=2))
+        os.remove(job.file_path)
+
+        output = self._call(stale_after=60)
+
+        self.assertIn("(1 failed)", output)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.STATUS_FAILED)
+
+    def test_job_runs_once(self):
+        """Test that a job that is no longer pending is not run again."""
+        job = self._job()
+        self.assertEqual(run_import_job(job.id).status, ImportJob.STATUS_SUCCEEDED)
+
+        with open(job.file_path, "wb") as f:
+            f.write(CSV_CONTENT)
+        job = run_import_job(job.id)
+
+        self.assertEqual(job.status, ImportJob.STATUS_SUCCEEDED)
+        self.assertTrue(os.path.exists(job.file_path))
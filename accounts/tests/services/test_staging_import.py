@@ -0,0 +1,126 @@
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from accounts.services import CSVImportService, CSVImportError
+from decimal import Decimal
+
+CSV_CONTENT = """client reference no,balance,status,consumer name,consumer address,ssn
+REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789
+REF002,200.75,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321
+REF001,999.99,INACTIVE,Bob Johnson,789 Pine St,555-55-5555
+REF003,0.00,INACTIVE,Jane S.,Elsewhere,987-65-4321
+REF003,0.00,INACTIVE,Jane S.,Elsewhere,987-65-4321"""
+
+
+class StagingImportTest(TestCase):
+    """Test cases for imports merged through a staging table."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.other_client = Client.objects.create(
+            name="Other Client", collection_agency=self.agency
+        )
+
+        # REF002 exists for another client and is already linked to Jane
+        jane = Consumer.objects.create(
+            name="Jane Smith", address="456 Oak Ave", ssn="987-65-4321"
+        )
+        account = Account.objects.create(
+            client_reference_no="REF002",
+            balance=Decimal("1.00"),
+            status=Account.STATUS_IN_COLLECTION,
+            client=self.other_client,
+        )
+        AccountConsumer.objects.create(account=account, consumer=jane)
+
+    def test_staged_import_matches_bulk_import(self):
+        """Test that the staging path gives the same results as import_csv."""
+        staged = CSVImportService(self.agency.id, self.client.id).import_csv_staged(
+            CSV_CONTENT
+        )
+        staged_rows = self._snapshot()
+
+        AccountConsumer.objects.all().delete()
+        Account.objects.exclude(client_reference_no="REF002").delete()
+        Consumer.objects.exclude(
+            id__in=Consumer.objects.with_ssn("987-65-4321")
+        ).delete()
+        account = Account.objects.get(client_reference_no="REF002")
+        account.balance = Decimal("1.00")
+        account.status = Account.STATUS_IN_COLLECTION
+        account.client = self.other_client
+        account.save()
+        AccountConsumer.objects.create(account=account, consumer=Consumer.objects.get())
+
+        bulk = CSVImportService(self.agency.id, self.client.id).import_csv(CSV_CONTENT)
+
+        self.assertEqual(
+            staged,
+            {
+                "accounts_processed": 3,
+                "accounts_created": 2,
+                "accounts_updated": 1,
+                "accounts_unchanged": 0,
+                "consumers_created": 2,
+                "consumer_accounts_linked": 3,
+            },
+        )
+        self.assertEqual(staged, bulk)
+        self.assertEqual(staged_rows, self._snapshot())
+
+    def test_staged_import_skips_unchanged_accounts(self):
+        """Test that staged imports fingerprint accounts and skip unchanged ones."""
+        service = CSVImportService(self.agency.id, self.client.id)
+        service.import_csv_staged(CSV_CONTENT)
+        fingerprints = dict(
+            Account.objects.values_list("client_reference_no", "fingerprint")
+        )
+        self.assertNotIn("", fingerprints.values())
+
+        # Both import paths recognize the accounts the other one wrote
+        self.assertEqual(service.import_csv(CSV_CONTENT)["accounts_unchanged"], 3)
+        account = Account.objects.get(client_reference_no="REF001")
+        untouched = Account.objects.get(client_reference_no="REF002")
+        stats = service.import_csv_staged(CSV_CONTENT.replace("100.50", "100.25"))
+
+        self.assertEqual(stats["accounts_unchanged"], 2)
+        self.assertEqual(stats["accounts_updated"], 1)
+        self.assertEqual(stats["accounts_created"], 0)
+        updated = Account.objects.get(client_reference_no="REF001")
+        self.assertEqual(updated.balance, Decimal("100.25"))
+        self.assertNotEqual(updated.fingerprint, fingerprints["REF001"])
+        self.assertGreater(updated.updated_at, account.updated_at)
+        self.assertEqual(
+            Account.objects.get(client_reference_no="REF002").updated_at,
+            untouched.updated_at,
+        )
+        self.assertEqual(service.import_csv(CSV_CONTENT)["accounts_updated"], 1)
+
+    def test_staged_import_invalid_row_rolls_back(self):
+        """Test that a validation error leaves the database untouched."""
+        content = CSV_CONTENT + "\nREF004,-5,INACTIVE,Al,Nowhere,111-11-1111"
+
+        with self.assertRaises(CSVImportError) as context:
+            CSVImportService(self.agency.id, self.client.id).import_csv_staged(content)
+
+        self.assertIn("Row 7: Balance must be non-negative", str(context.exception))
+        self.assertEqual(Account.objects.count(), 1)
+        self.assertEqual(Consumer.objects.count(), 1)
+
+    def _snapshot(self):
+        """Return the imported data in a comparable form."""
+        accounts = sorted(
+            Account.objects.values_list(
+                "client_reference_no", "balance", "status", "client_id"
+            )
+        )
+        consumers = sorted(Consumer.objects.values_list("ssn", "name", "address"))
+        links = sorted(
+            AccountConsumer.objects.values_list(
+                "account__client_reference_no", "consumer__ssn"
+            )
+        )
+        return accounts, consumers, links
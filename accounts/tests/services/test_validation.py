@@ -0,0 +1,101 @@
+from django.test import TestCase
+from accounts.models import CollectionAgency, Client, Account
+from accounts.services import CSVImportService, CSVImportError, CSVValidationError
+from accounts.validation import ColumnBlockValidator, REQUIRED_FIELDS
+from decimal import Decimal
+from unittest.mock import patch
+
+HEADER = "client reference no,balance,status,consumer name,consumer address,ssn"
+
+INVALID_ROWS = [
+    ["REF001", "100.50", "IN_COLLECTION", "John Doe", "123 Main St", "123-45-6789"],
+    ["REF002", "abc", "IN_COLLECTION", "Jane Smith", "456 Oak Ave", "987-65-4321"],
+    ["REF003", "-1", "INACTIVE", "Bob Johnson", "789 Pine St", "555-55-5555"],
+    ["REF004", "1e3", "UNKNOWN", "Bob Johnson", "789 Pine St", "555-55-5555"],
+    ["", "5", "INACTIVE", "", "789 Pine St", "555555555"],
+    ["REF006", "7.", "PAID_IN_FULL", "Ann Lee", "1 Elm St", "111-22-3333"],
+    ["REF007", "12"],
+]
+
+
+class ValidationReportTest(TestCase):
+    """Test cases for block validation and the full error report."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.agency = CollectionAgency.objects.create(name="Test Agency")
+        self.client = Client.objects.create(
+            name="Test Client", collection_agency=self.agency
+        )
+        self.service = CSVImportService(self.agency.id, self.client.id)
+
+    def test_block_validator_matches_row_validation(self):
+        """Test that the block validator accepts and rejects the same rows."""
+        records, errors = ColumnBlockValidator(REQUIRED_FIELDS).validate(
+            INVALID_ROWS, 2
+        )
+
+        first_errors = {}
+        for error in errors:
+            first_errors.setdefault(error.row_num, str(error))
+        for i, row in enumerate(INVALID_ROWS):
+            row_data = dict(zip(REQUIRED_FIELDS, row + [""] * 6))
+            try:
+                CSVImportService.validate_row_data(row_data, i + 2)
+            except CSVImportError as e:
+                self.assertIsNone(records[i])
+                self.assertEqual(first_errors[i + 2], str(e))
+            else:
+                self.assertNotIn(i + 2, first_errors)
+                self.assertEqual(records[i][1], Decimal(row[1]))
+
+        self.assertEqual(
+            [error.row_num for error in errors], [3, 4, 5, 6, 6, 6, 8, 8, 8, 8]
+        )
+
+    def test_all_errors_reported_in_one_pass(self):
+        """Test that an import reports every invalid row, not only the first."""
+        csv_content = "\n".join([HEADER] + [",".join(row) for row in INVALID_ROWS])
+
+        with self.assertRaises(CSVValidationError) as context:
+            self.service.import_csv(csv_content)
+
+        exception = context.exception
+        self.assertEqual(exception.error_count, 10)
+        self.assertEqual(
+            str(exception),
+            "Row 3: Invalid balance 'abc'. Must be a number. (and 9 more errors)",
+        )
+        self.assertIn(
+            "Row 6: Invalid SSN format. Must be XXX-XX-XXXX.",
+            [str(error) for error in exception.errors],
+        )
+        self.assertEqual(self.service.rows_parsed, len(INVALID_ROWS))
+        self.assertEqual(Account.objects.count(), 0)
+
+    def test_invalid_ssn_rejected(self):
+        """Test that SSNs must be in XXX-XX-XXXX format."""
+        csv_content = f"{HEADER}\nREF001,1.00,INACTIVE,John Doe,123 Main St,123456789"
+
+        with self.assertRaises(CSVValidationError) as context:
+            self.service.import_csv(csv_content)
+
+        self.assertEqual(
+            str(context.exception), "Row 2: Invalid SSN format. Must be XXX-XX-XXXX."
+        )
+
+    def test_error_list_is_capped(self):
+        """Test that errors beyond the limit are counted but not listed."""
+        bad_row = "REF001,abc,INACTIVE,John Doe,123 Main St,123-45-6789"
+        csv_content = "\n".join([HEADER] + [bad_row] * 25)
+
+        with (
+            patch.object(CSVImportService, "MAX_ERRORS", 10),
+            patch.object(CSVImportService, "BLOCK_SIZE", 4),
+        ):
+            with self.assertRaises(CSVValidationError) as context:
+                self.service.import_csv(csv_content)
+
+        self.assertEqual(len(context.exception.errors), 10)
+        self.assertEqual(context.exception.error_count, 25)
+        self.assertEqual(context.exception.errors[-1].row_num, 11)
@@ -1,3 +1,4 @@
+import gzip
 from django.test import TestCase
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
@@ -128,3 +129,57 @@ class AccountsAPITest(APITestCase):
 
         # Verify the service was never called
         mock_process.assert_not_called()
+
+    def test_upload_csv_dry_run(self):
+        """Test that a dry-run upload reports the changes without importing."""
+        csv_content = (
+            b"client reference no,balance,status,consumer name,consumer address,ssn\n"
+            b"REF001,100.50,IN_COLLECTION,John Doe,123 Main St,123-45-6789\n"
+            b"REF002,50.00,PAID_IN_FULL,Jane Smith,456 Oak Ave,987-65-4321\n"
+            b"REF004,300.25,IN_COLLECTION,Test User,789 Pine St,456-78-9012"
+        )
+        data = {
+            "file": SimpleUploadedFile(
+                "test.csv", csv_content, content_type="text/csv"
+            ),
+            "collection_agency_id": self.collection_agency.id,
+            "client_id": self.client_obj.id,
+            "dry_run": "true",
+        }
+        response = self.client.post(self.upload_csv_url, data, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["dry_run"])
+        self.assertEqual(response.data["accounts_created"], 1)
+        self.assertEqual(response.data["accounts_updated"], 2)
+        self.assertEqual(response.data["balances_changed"], 1)
+        self.assertEqual(response.data["consumers_created"], 1)
+        self.assertEqual(response.data["consumer_accounts_linked"], 1)
+        self.assertEqual(
+            [change["client_reference_no"] for change in response.data["changes"]],
+            ["REF002", "REF004"],
+        )
+        self.assertFalse(Account.objects.filter(client_reference_no="REF004").exists())
+        self.account2.refresh_from_db()
+        self.assertEqual(self.account2.balance, Decimal("200.75"))
+
+    def test_upload_gzipped_csv(self):
+        """Test that a gzip-compressed upload is decompressed and imported."""
+        csv_content = (
+            b"client reference no,balance,status,consumer name,consumer address,ssn\n"
+            b"REF004,300.25,IN_COLLECTION,Test User,789 Pine St,456-78-9012"
+        )
+        data = {
+            "file": SimpleUploadedFile(
+                "test.csv.gz",
+                gzip.compress(csv_content),
+                content_type="application/gzip",
+            ),
+            "collection_agency_id": self.collection_agency.id,
+            "client_id": self.client_obj.id,
+        }
+        response = self.client.post(self.upload_csv_url, data, format="multipart")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["accounts_created"], 1)
+        self.assertTrue(Account.objects.filter(client_reference_no="REF004").exists())
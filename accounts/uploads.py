@@ -0,0 +1,119 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+from .models import ImportJob, ImportUpload
+
+
+class HashingUploadMixin:
+    """
+    Computes the SHA-256 of an uploaded file while Django receives it.
+
+    The digest is set as ``sha256`` on the uploaded file, so it is known before
+    the file is read again and costs no extra pass over the data.
+    """
+
+    def new_file(self, *args, **kwargs) -> None:
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def stores_data(self) -> bool:
+        return True
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> Optional[bytes]:
+        if self.stores_data():
+            self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size: int) -> Any:
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self.sha256.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadMixin, MemoryFileUploadHandler):
+    """
+    MemoryFileUploadHandler that also hashes the files it keeps.
+    """
+
+    def stores_data(self) -> bool:
+        # Larger uploads are passed on to the temporary file handler
+        return self.activated
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadMixin, TemporaryFileUploadHandler):
+    """
+    TemporaryFileUploadHandler that also hashes the files it writes.
+    """
+
+
+def get_file_digest(uploaded_file: Any) -> str:
+    """
+    Return the SHA-256 of an uploaded file.
+
+    Uses the digest computed by the upload handlers when there is one; otherwise
+    the file is read once to compute it.
+
+    Args:
+        uploaded_file: Django UploadedFile
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = getattr(uploaded_file, "sha256", None)
+    if digest is None:
+        sha256 = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            sha256.update(chunk)
+        uploaded_file.seek(0)
+        digest = uploaded_file.sha256 = sha256.hexdigest()
+    return digest
+
+
+def find_imported_upload(client_id: int, sha256: str) -> Optional[ImportUpload]:
+    """
+    Return the registry entry of a file already imported for a client, if any.
+    """
+    return ImportUpload.objects.filter(client_id=client_id, sha256=sha256).first()
+
+
+def register_upload(
+    client_id: int,
+    sha256: str,
+    stats: Dict[str, Any],
+    file_name: str = "",
+    size: int = 0,
+    import_job: Optional[ImportJob] = None,
+) -> ImportUpload:
+    """
+    Record that a file has been imported for a client.
+
+    A forced re-import of the same file replaces the recorded statistics.
+
+    Args:
+        client_id: ID of the client
+        sha256: SHA-256 of the file
+        stats: Import statistics to return for later uploads of the file
+        file_name: Name of the uploaded file
+        size: Size of the file in bytes
+        import_job: Background job that imported the file, if any
+
+    Returns:
+        The registry entry
+    """
+    upload, _ = ImportUpload.objects.update_or_create(
+        client_id=client_id,
+        sha256=sha256,
+        defaults={
+            "stats": stats,
+            "file_name": file_name or "",
+            "size": size or 0,
+            "import_job": import_job,
+        },
+    )
+    return upload
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
     CollectionAgencyViewSet,
     ClientViewSet,
     ConsumerViewSet,
     AccountViewSet,
+    ImportJobViewSet,
+    stats,
 )
 
 # Create a router and register our viewsets
@@ -14,7 +17,16 @@ router.register(r"collection-agencies", CollectionAgencyViewSet)
 router.register(r"clients", ClientViewSet)
 router.register(r"consumers", ConsumerViewSet)
 router.register(r"accounts", AccountViewSet)
+router.register(r"import-jobs", ImportJobViewSet)
 
 urlpatterns = [
+    path("stats/", stats, name="stats"),
+    # Async versions of the account list and retrieve, for ASGI servers
+    path("async/accounts/", async_views.account_list, name="account-list-async"),
+    path(
+        "async/accounts/<str:pk>/",
+        async_views.account_detail,
+        name="account-detail-async",
+    ),
     path("", include(router.urls)),
 ]
@@ -1,25 +1,89 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import QueryDict, StreamingHttpResponse
 from django.shortcuts import render
-from django.db.models import Q
-from rest_framework import viewsets, filters, status, parsers
+from django.db.models import Prefetch, Q
+from rest_framework import viewsets, filters, status, parsers, exceptions
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, parser_classes
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, CharFilter
 from django_filters import NumberFilter
+from django_filters.utils import translate_validation
 from decimal import Decimal
 from typing import Any, Dict, Optional, List
 
-from .models import CollectionAgency, Client, Consumer, Account, AccountConsumer
+from .models import (
+    CollectionAgency,
+    Client,
+    Consumer,
+    Account,
+    AccountConsumer,
+    BalanceRollup,
+    ImportJob,
+)
 from .serializers import (
     CollectionAgencySerializer,
     ClientSerializer,
     ConsumerSerializer,
     AccountSerializer,
     AccountConsumerSerializer,
+    ImportJobSerializer,
+    account_values_serializer,
 )
-from .services import CSVImportService, CSVImportError
+from .caching import AccountListCache, etag_matches, make_etag
+from .exports import StreamingExport
+from .services import CSVImportService, CSVImportError, CSVValidationError
+from .jobs import create_import_job
+from .uploads import find_imported_upload, get_file_digest, register_upload
 from .pagination import AccountCursorPagination
 
 
+def parse_bool(value: Any) -> bool:
+    """
+    Interpret a query or form parameter as a boolean flag.
+    """
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def parse_sparse_fields(params: QueryDict) -> Optional[List[str]]:
+    """
+    Return the account fields requested by the ``fields`` and ``expand`` query
+    parameters, or None for all of them.
+
+    ``fields`` is a comma separated list of the fields to return. Nested objects
+    (client and consumers) are returned if listed in ``fields`` or in ``expand``;
+    ``expand`` without ``fields`` returns the account's own fields and the listed
+    objects.
+
+    Raises:
+        ValidationError: If a field is unknown or cannot be expanded
+    """
+    if "fields" not in params and "expand" not in params:
+        return None
+
+    def names(param: str) -> List[str]:
+        values = ",".join(params.getlist(param)).split(",")
+        return [value.strip() for value in values if value.strip()]
+
+    available = list(AccountSerializer().fields)
+    expandable = account_values_serializer.expandable
+    requested, expand = names("fields"), names("expand")
+    errors = {}
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        errors["fields"] = [f"Unknown field: {name}" for name in unknown]
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        errors["expand"] = [f"Cannot expand: {name}" for name in unknown]
+    if errors:
+        raise exceptions.ValidationError(errors)
+
+    if "fields" not in params:
+        requested = [name for name in available if name not in expandable]
+    selected = set(requested) | set(expand)
+    return [name for name in available if name in selected]
+
+
 class AccountFilter(FilterSet):
     """
     Filter set for the Account model with custom filters for min_balance, max_balance,
@@ -46,30 +110,67 @@ class AccountFilter(FilterSet):
 
         Returns:
             Filtered queryset of accounts that have consumers with names containing the value
+
+        NOTE: Matching accounts are selected with an ``id IN`` subquery over the
+        consumer name search index rather than a join, so no DISTINCT is needed.
         """
         if not value:
             return queryset
-        return queryset.filter(consumers__name__icontains=value).distinct()
+        return queryset.filter(
+            id__in=AccountConsumer.objects.filter(
+                consumer__in=Consumer.objects.name_contains(value)
+            ).values("account_id")
+        )
+
+
+def validate_list_params(request: Any) -> None:
+    """
+    Check the filters and count mode of an account list request, before anything
+    is looked up.
+
+    A matching If-None-Match is answered with 304 before the page is built, so
+    invalid parameters have to be rejected first to always get a 400.
+
+    Raises:
+        ValidationError: If a filter or the count mode is invalid
+    """
+    filterset = AccountFilter(request.query_params, queryset=Account.objects.none())
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    AccountCursorPagination().get_count_mode(request)
 
 
 class AccountViewSet(viewsets.ModelViewSet):
     """
     API endpoint for accounts with filtering capabilities.
-    
+
     TODO: Add authentication and permissions for production use
     TODO: Consider adding rate limiting for API endpoints
     NOTE: The select_related and prefetch_related are used to optimize database queries
+    NOTE: List responses are cached until the data behind them changes (see
+    AccountListCache)
+    NOTE: Unless ACCOUNT_LIST_FAST_SERIALIZER is off, lists are serialized from
+    ``.values()`` rows by account_values_serializer, with the same output as
+    AccountSerializer
+    NOTE: List and retrieve responses carry an ETag derived from the client data
+    generations; a matching If-None-Match is answered with 304 before anything is
+    serialized, but only once the query parameters are found valid
+    NOTE: ``?fields=`` and ``?expand=`` limit list and retrieve responses to some
+    fields, and the queries to what those fields show (see get_sparse_fields())
     """
 
     queryset = (
-        Account.objects.all()
-        .select_related("client__collection_agency")
-        .prefetch_related("consumers")
+        Account.objects.all().select_related("client__collection_agency")
+        # In ID order, like the fast path (see ValuesSerializer)
+        .prefetch_related(Prefetch("consumers", Consumer.objects.order_by("id")))
     )
     serializer_class = AccountSerializer
     filterset_class = AccountFilter
     pagination_class = AccountCursorPagination
 
+    # Actions whose responses ?fields= and ?expand= apply to
+    SPARSE_FIELDS_ACTIONS = ("list", "retrieve", "export")
+
     def get_queryset(self):
         """
         Get the queryset for this view.
@@ -79,6 +180,13 @@ class AccountViewSet(viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # Load only the columns and relations the response shows
+            queryset = account_values_serializer.project(
+                queryset, fields, extra=self._ordering_columns()
+            )
+
         # If there are no filters, return all accounts
         if not self.request.query_params:
             return queryset
@@ -91,6 +199,145 @@ class AccountViewSet(viewsets.ModelViewSet):
         # Return filtered queryset
         return filter_instance.qs
 
+    def get_sparse_fields(self) -> Optional[List[str]]:
+        """
+        Return the fields requested for a list, retrieve or export response, or
+        None for all of them (see parse_sparse_fields()).
+
+        Raises:
+            ValidationError: If a field is unknown or cannot be expanded
+        """
+        if self.request.method not in ("GET", "HEAD"):
+            return None
+        if self.action not in self.SPARSE_FIELDS_ACTIONS:
+            return None
+        return parse_sparse_fields(self.request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def _ordering_columns(self) -> List[str]:
+        # Cursors are built from the ordering columns, so they are always loaded
+        return [name.lstrip("-") for name in self.pagination_class.ordering]
+
+    def list(self, request, *args, **kwargs):
+        """
+        List accounts, answering repeated requests from the response cache.
+        """
+        # Invalid parameters get a 400 even if the client's copy matches
+        self.get_sparse_fields()
+        validate_list_params(request)
+        cache = AccountListCache()
+        # The cache key already identifies the page and the data behind it
+        key = cache.get_key(request)
+        etag = make_etag(key, request.accepted_media_type)
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+
+        data = cache.get(key) if cache.enabled else None
+        if data is not None:
+            response = Response(data)
+        else:
+            response = self._list_page(request, *args, **kwargs)
+            if cache.enabled and response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+    def _list_page(self, request, *args, **kwargs):
+        """
+        Return a page of accounts, serialized through the fast path if enabled.
+        """
+        if not settings.ACCOUNT_LIST_FAST_SERIALIZER:
+            return super().list(request, *args, **kwargs)
+        fields = self.get_sparse_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            account_values_serializer.get_values(
+                queryset, fields, extra=self._ordering_columns()
+            )
+        )
+        return self.get_paginated_response(
+            account_values_serializer.serialize(page, fields)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return an account, or 304 if the client's copy is current.
+        """
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            # Every change to the account or what is shown with it bumps the
+            # generation of its client
+            version = (
+                Account.objects.filter(pk=lookup)
+                .values_list("updated_at", "client_id", "client__data_generation")
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            version = None
+        if version is None:
+            # Let the usual lookup answer 404
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag(request.get_full_path(), version, request.accepted_media_type)
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
+
+    def _not_modified(self, etag: str) -> Response:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    @action(detail=False, methods=["GET"], url_path="export")
+    def export(self, request):
+        """
+        Stream every account matching the filters as CSV or NDJSON.
+
+        Request Parameters:
+            export_format: "csv" (default) or "ndjson"
+            fields, expand: Fields to export, like for the list
+            min_balance, max_balance, consumer_name, status: Filters, like for the
+                list
+
+        Returns:
+            Streamed attachment with the matching accounts in ID order: a JSON
+            object per line like the list's results for NDJSON, or for CSV a line
+            per account and consumer (see StreamingExport)
+
+        NOTE: Rows are read through a server-side cursor and serialized
+        ACCOUNT_EXPORT_CHUNK_SIZE at a time, so memory use does not depend on the
+        number of accounts exported
+        """
+        file_format = request.query_params.get("export_format", "csv")
+        if file_format not in StreamingExport.FORMATS:
+            return Response(
+                {"error": "export_format must be csv or ndjson"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        export = StreamingExport(
+            account_values_serializer,
+            self.filter_queryset(self.get_queryset()).order_by("id"),
+            self.get_sparse_fields(),
+            chunk_size=settings.ACCOUNT_EXPORT_CHUNK_SIZE,
+        )
+        response = StreamingHttpResponse(
+            export.stream(file_format),
+            content_type=f"{StreamingExport.FORMATS[file_format]}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="accounts.{file_format}"'
+        )
+        return response
+
     @action(
         detail=False,
         methods=["POST"],
@@ -100,17 +347,26 @@ class AccountViewSet(viewsets.ModelViewSet):
     def upload_csv(self, request):
         """
         Upload a CSV file to import account data.
-        
+
         Request Parameters:
             file: The CSV file to upload
             collection_agency_id: ID of the collection agency
             client_id: ID of the client
-            
+            background: If true, spool the file and import it in the background
+            dry_run: If true, return what the import would change without writing
+                anything (always synchronous)
+            force: If true, import the file even if it has already been imported
+                for the client
+
         Returns:
-            Dictionary with import statistics or error message
-            
-        TODO: For large files, consider implementing asynchronous processing with Celery
-        NOTE: Current implementation processes files synchronously which may timeout for very large datasets
+            Dictionary with import statistics or error message. Invalid rows are all
+            listed under "errors". Background imports return 202 with the import
+            job; poll /api/import-jobs/<id>/ for progress. A file that has already
+            been imported for the client is not imported again: the original
+            statistics are returned with "duplicate" set.
+
+        NOTE: Synchronous imports may time out for very large datasets; use background
+        imports for those
         """
         # Validate required parameters
         if "file" not in request.FILES:
@@ -135,13 +391,59 @@ class AccountViewSet(viewsets.ModelViewSet):
             collection_agency_id = int(request.data["collection_agency_id"])
             client_id = int(request.data["client_id"])
 
+            if parse_bool(request.data.get("dry_run", False)):
+                service = CSVImportService(collection_agency_id, client_id)
+                return Response(
+                    service.import_csv(csv_file, dry_run=True),
+                    status=status.HTTP_200_OK,
+                )
+
+            # The digest was computed by the upload handlers as the file arrived
+            sha256 = get_file_digest(csv_file)
+            if not parse_bool(request.data.get("force", False)):
+                upload = find_imported_upload(client_id, sha256)
+                if upload:
+                    return Response(
+                        {
+                            **upload.stats,
+                            "duplicate": True,
+                            "upload_id": upload.id,
+                            "imported_at": upload.updated_at,
+                        },
+                        status=status.HTTP_200_OK,
+                    )
+
+            if parse_bool(request.data.get("background", False)):
+                job = create_import_job(
+                    csv_file, collection_agency_id, client_id, file_sha256=sha256
+                )
+                return Response(
+                    ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED
+                )
+
             # Process CSV file
             result = CSVImportService.process_csv_file(
                 csv_file, collection_agency_id, client_id
             )
+            register_upload(
+                client_id,
+                sha256,
+                result,
+                file_name=csv_file.name,
+                size=csv_file.size,
+            )
 
             return Response(result, status=status.HTTP_200_OK)
 
+        except CSVValidationError as e:
+            return Response(
+                {
+                    "error": str(e),
+                    "error_count": e.error_count,
+                    "errors": [str(error) for error in e.errors],
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except CSVImportError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -151,6 +453,80 @@ class AccountViewSet(viewsets.ModelViewSet):
             )
 
 
+@api_view(["GET"])
+def stats(request):
+    """
+    Return the number and total balance of accounts per client and status.
+
+    Request Parameters:
+        collection_agency_id: Only include the clients of this collection agency
+        client_id: Only include this client
+
+    Returns:
+        Totals over all included clients, and the clients with their own totals,
+        each with a breakdown by status
+
+    NOTE: The totals come from the balance rollups, one row per client and status,
+    so the accounts themselves are never scanned
+    """
+    clients = Client.objects.order_by("id")
+    for param, field in (
+        ("collection_agency_id", "collection_agency_id"),
+        ("client_id", "id"),
+    ):
+        if param in request.query_params:
+            try:
+                clients = clients.filter(**{field: int(request.query_params[param])})
+            except ValueError:
+                return Response(
+                    {"error": f"{param} must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+    def empty_totals() -> Dict[str, Any]:
+        return {
+            "account_count": 0,
+            "total_balance": Decimal("0.00"),
+            "by_status": {
+                value: {"account_count": 0, "total_balance": Decimal("0.00")}
+                for value, _ in Account.STATUS_CHOICES
+            },
+        }
+
+    def add(totals: Dict[str, Any], rollup: BalanceRollup) -> None:
+        for entry in (totals, totals["by_status"][rollup.status]):
+            entry["account_count"] += rollup.account_count
+            entry["total_balance"] += rollup.total_balance
+
+    overall = empty_totals()
+    by_client = {
+        client["id"]: {**client, **empty_totals()}
+        for client in clients.values("id", "name", "collection_agency_id")
+    }
+    for rollup in BalanceRollup.objects.filter(client__in=clients.values("id")):
+        # Skip clients created since they were listed
+        if rollup.client_id in by_client:
+            add(by_client[rollup.client_id], rollup)
+            add(overall, rollup)
+
+    data = {**overall, "clients": list(by_client.values())}
+    # Balances are rendered like account balances
+    for totals in [data, *data["clients"]]:
+        for entry in [totals, *totals["by_status"].values()]:
+            entry["total_balance"] = f"{entry['total_balance']:.2f}"
+    return Response(data)
+
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the status and progress of background CSV imports.
+    """
+
+    queryset = ImportJob.objects.all()
+    serializer_class = ImportJobSerializer
+    pagination_class = AccountCursorPagination
+
+
 class ConsumerViewSet(viewsets.ModelViewSet):
     """
     API endpoint for consumers.
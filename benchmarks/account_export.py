@@ -0,0 +1,90 @@
+"""
+Rows/sec and peak memory of streaming GET /api/accounts/export/.
+
+Usage:
+    python -m benchmarks.account_export --accounts 10000 100000 --format csv ndjson
+
+Each size runs against a fresh test database filled with synthetic accounts. The
+export is streamed to nowhere through the view, once timed and once with
+tracemalloc (which slows it down) to measure peak memory, which should stay flat
+as the number of accounts grows.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.account_list import populate  # sets up Django
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from accounts.views import AccountViewSet  # noqa: E402
+
+
+def stream_export(file_format: str) -> int:
+    """
+    Stream one export and return its size in bytes.
+    """
+    view = AccountViewSet.as_view({"get": "export"})
+    request = APIRequestFactory().get(
+        "/api/accounts/export/", {"export_format": file_format}
+    )
+    return sum(len(chunk) for chunk in view(request).streaming_content)
+
+
+def peak_memory(file_format: str) -> float:
+    """
+    Return the peak memory (MB) allocated while streaming one export.
+    """
+    tracemalloc.start()
+    try:
+        stream_export(file_format)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--consumers-per-account", type=int, default=2)
+    parser.add_argument(
+        "--format", nargs="+", choices=["csv", "ndjson"], default=["csv", "ndjson"]
+    )
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    print(
+        f"{'format':>8} {'accounts':>9} {'seconds':>8} {'rows/sec':>10} "
+        f"{'MB out':>8} {'peak MB':>8}"
+    )
+    for accounts in args.accounts:
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                directory, "benchmark.sqlite3"
+            )
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                populate(accounts, args.consumers_per_account)
+                for file_format in args.format:
+                    started = time.perf_counter()
+                    size = stream_export(file_format)
+                    elapsed = time.perf_counter() - started
+                    peak = peak_memory(file_format)
+                    print(
+                        f"{file_format:>8} {accounts:>9} {elapsed:>8.2f} "
+                        f"{accounts / elapsed:>10,.0f} {size / (1024 * 1024):>8.1f} "
+                        f"{peak:>8.1f}"
+                    )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
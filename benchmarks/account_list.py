@@ -0,0 +1,128 @@
+"""
+Time to serialize and render a page of the account list, with AccountSerializer
+and with the .values() fast path.
+
+Usage:
+    python -m benchmarks.account_list --page-size 1000 --consumers-per-account 2
+
+Runs against a fresh test database filled with synthetic accounts. Each round
+fetches and renders one page of the list, like GET /api/accounts/ does, and the
+best of ``--repeat`` rounds is reported.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+import django
+
+os.environ.pop("DATABASE_URL", None)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from accounts.models import (  # noqa: E402
+    Account,
+    AccountConsumer,
+    Client,
+    CollectionAgency,
+    Consumer,
+)
+from accounts.serializers import (  # noqa: E402
+    AccountSerializer,
+    account_values_serializer,
+)
+from accounts.views import AccountViewSet  # noqa: E402
+
+
+def populate(accounts: int, consumers_per_account: int) -> None:
+    agency = CollectionAgency.objects.create(name="Benchmark Agency")
+    client = Client.objects.create(name="Benchmark Client", collection_agency=agency)
+    Account.objects.bulk_create(
+        Account(
+            client_reference_no=f"REF{n:08d}",
+            balance=Decimal(n % 100000) / 100,
+            status=Account.STATUS_IN_COLLECTION,
+            client=client,
+        )
+        for n in range(accounts)
+    )
+    Consumer.objects.bulk_create(
+        Consumer(
+            name=f"Consumer {n}",
+            address=f"{n} Main St",
+            ssn=f"{n // 1_000_000 % 1000:03d}-{n // 10_000 % 100:02d}-{n % 10_000:04d}",
+        )
+        for n in range(accounts * consumers_per_account)
+    )
+    account_ids = list(Account.objects.order_by("id").values_list("id", flat=True))
+    consumer_ids = list(Consumer.objects.order_by("id").values_list("id", flat=True))
+    AccountConsumer.objects.bulk_create(
+        AccountConsumer(account_id=account_id, consumer_id=consumer_id)
+        for n, account_id in enumerate(account_ids)
+        for consumer_id in consumer_ids[
+            n * consumers_per_account : (n + 1) * consumers_per_account
+        ]
+    )
+
+
+def render_serializer(page_size: int) -> bytes:
+    page = list(AccountViewSet.queryset.order_by("created_at")[:page_size])
+    return JSONRenderer().render(AccountSerializer(page, many=True).data)
+
+
+def render_values(page_size: int) -> bytes:
+    queryset = account_values_serializer.get_values(
+        AccountViewSet.queryset.order_by("created_at")
+    )
+    return JSONRenderer().render(
+        account_values_serializer.serialize(list(queryset[:page_size]))
+    )
+
+
+def best_of(repeat: int, func, *args) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--consumers-per-account", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            directory, "benchmark.sqlite3"
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            populate(args.page_size, args.consumers_per_account)
+            if render_serializer(args.page_size) != render_values(args.page_size):
+                raise SystemExit("The two paths rendered different output")
+
+            slow = best_of(args.repeat, render_serializer, args.page_size)
+            fast = best_of(args.repeat, render_values, args.page_size)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"{'path':>16} {'ms/page':>9} {'speedup':>8}")
+    print(f"{'serializer':>16} {slow * 1000:>9.1f} {1:>7.2f}x")
+    print(f"{'values':>16} {fast * 1000:>9.1f} {slow / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Rows/sec of reading and validating the same data as CSV and as Parquet.
+
+Usage:
+    python -m benchmarks.columnar --rows 1000000
+
+Requires pyarrow.
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+django.setup()
+
+import pyarrow.csv  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+from accounts.columnar import ColumnarReader  # noqa: E402
+from accounts.services import CSVImportService, CSVLineStream  # noqa: E402
+from accounts.validation import ColumnBlockValidator  # noqa: E402
+from benchmarks.synthetic import write_synthetic_csv  # noqa: E402
+
+
+# Only parsing and validation are timed; nothing is written to the database
+def read_csv(content: bytes) -> None:
+    reader = csv.reader(CSVLineStream(io.BytesIO(content)))
+    validator = ColumnBlockValidator(next(reader))
+    size = CSVImportService.BLOCK_SIZE
+    row_num = 2
+    while True:
+        block = list(itertools.islice(reader, size))
+        if not block:
+            break
+        validator.validate(block, row_num)
+        row_num += len(block)
+
+
+def read_columnar(content: bytes) -> None:
+    reader = ColumnarReader(io.BytesIO(content))
+    row_num = 1
+    for batch in reader.iter_batches():
+        reader.validate(batch, row_num)
+        row_num += batch.num_rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    buffer = io.StringIO()
+    write_synthetic_csv(buffer, args.rows)
+    csv_content = buffer.getvalue().encode()
+
+    # Balances as decimals and statuses dictionary-encoded, as an export would be
+    table = pyarrow.csv.read_csv(
+        io.BytesIO(csv_content),
+        convert_options=pyarrow.csv.ConvertOptions(
+            column_types={
+                "balance": pyarrow.decimal128(12, 2),
+                "ssn": pyarrow.string(),
+            }
+        ),
+    )
+    parquet_buffer = io.BytesIO()
+    pyarrow.parquet.write_table(table, parquet_buffer)
+    parquet_content = parquet_buffer.getvalue()
+
+    print(f"{'mode':>8} {'MB':>7} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+    baseline = None
+    for mode, read, content in (
+        ("csv", read_csv, csv_content),
+        ("parquet", read_columnar, parquet_content),
+    ):
+        started = time.perf_counter()
+        read(content)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(
+            f"{mode:>8} {len(content) / 1e6:>7.1f} {elapsed:>9.2f} "
+            f"{args.rows / elapsed:>12,.0f} {baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Rows/sec, SQL queries and peak memory of CSVImportService.import_csv.
+
+Usage:
+    python -m benchmarks.import_throughput --rows 10000 100000 1000000 \\
+        --database sqlite postgresql --output results.json
+
+Every case runs in a fresh process against a fresh test database (created and
+migrated like the test suite does), so peak memory and the query count belong to
+that import alone. PostgreSQL is reached through ``--postgres-url`` (or the
+BENCHMARK_POSTGRES_URL environment variable); the user must be allowed to create
+databases. Results are written as JSON; ``--baseline`` compares them with an
+earlier results file. ``--no-ssn-encryption`` stores SSNs in plain text, to
+measure what encrypting them costs.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+DEFAULT_POSTGRES_URL = "postgres://localhost/collection_agency"
+
+# Parameters that identify a case when comparing with a baseline
+CASE_KEYS = [
+    "database",
+    "rows",
+    "consumers_per_account",
+    "duplicate_ratio",
+    "existing_ratio",
+    "consumer_pool",
+    "commit_every",
+    "seed",
+    "ssn_encryption",
+]
+
+# Values of case parameters that older results files do not record
+CASE_DEFAULTS = {"ssn_encryption": True}
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _disable_ssn_encryption() -> None:
+    # Store SSNs as they are and use them as their own blind index
+    from accounts import crypto, models, services, staging
+
+    def plain(value: str) -> str:
+        return value
+
+    crypto.encrypt = crypto.decrypt = plain
+    crypto.blind_index = models.blind_index = plain
+    services.blind_index = staging.blind_index = staging.encrypt = plain
+
+
+def run_case(case: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Import one synthetic file and measure it. Runs in its own process.
+    """
+    if case["database"] == "postgresql":
+        os.environ["DATABASE_URL"] = case["postgres_url"]
+    else:
+        os.environ.pop("DATABASE_URL", None)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from accounts.models import Account, Client, CollectionAgency
+    from accounts.services import CSVImportService
+    from benchmarks.synthetic import synthetic_references, write_synthetic_csv
+
+    # Keep the query log from growing with the import
+    settings.DEBUG = False
+
+    if not case["ssn_encryption"]:
+        _disable_ssn_encryption()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == "sqlite":
+            # On disk, like a real deployment, rather than in memory
+            connection.settings_dict["TEST"]["NAME"] = os.path.join(
+                directory, "benchmark.sqlite3"
+            )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            agency = CollectionAgency.objects.create(name="Benchmark Agency")
+            client = Client.objects.create(
+                name="Benchmark Client", collection_agency=agency
+            )
+            references = synthetic_references(
+                case["rows"], case["consumers_per_account"], case["existing_ratio"]
+            )
+            Account.objects.bulk_create(
+                (
+                    Account(
+                        client_reference_no=reference,
+                        balance=0,
+                        status=Account.STATUS_INACTIVE,
+                        client=client,
+                    )
+                    for reference in references
+                ),
+                batch_size=5000,
+            )
+
+            csv_path = os.path.join(directory, "accounts.csv")
+            with open(csv_path, "w") as csv_file:
+                write_synthetic_csv(
+                    csv_file,
+                    case["rows"],
+                    seed=case["seed"],
+                    consumers_per_account=case["consumers_per_account"],
+                    duplicate_ratio=case["duplicate_ratio"],
+                    consumer_pool=case["consumer_pool"],
+                )
+
+            queries = 0
+
+            def count_queries(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            service = CSVImportService(agency.id, client.id)
+            baseline_rss = _rss_mb()
+            with open(csv_path, "rb") as csv_file:
+                with connection.execute_wrapper(count_queries):
+                    started = time.perf_counter()
+                    stats = service.import_csv(
+                        csv_file, commit_every=case["commit_every"]
+                    )
+                    elapsed = time.perf_counter() - started
+
+            return {
+                **case,
+                "database": connection.vendor,
+                "database_version": ".".join(
+                    map(str, connection.get_database_version())
+                ),
+                "existing_accounts": len(references),
+                "seconds": round(elapsed, 3),
+                "rows_per_sec": round(case["rows"] / elapsed, 1),
+                "queries": queries,
+                "peak_rss_mb": round(_rss_mb(), 1),
+                "baseline_rss_mb": round(baseline_rss, 1),
+                "stats": stats,
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def run_in_subprocess(case: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run run_case() in a fresh process and return its result.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.import_throughput"]
+        + ["--case", json.dumps(case)],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode:
+        sys.stderr.write(completed.stderr)
+        sys.exit(f"{case['database']} with {case['rows']} rows failed")
+    result = json.loads(completed.stdout.splitlines()[-1])
+    # Credentials stay out of the results file
+    del result["postgres_url"]
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_baseline(path: str) -> Dict[tuple, float]:
+    # Only results of the same case (database, size and data shape) are compared
+    with open(path) as f:
+        results = json.load(f)["results"]
+    return {
+        tuple(r.get(key, CASE_DEFAULTS.get(key)) for key in CASE_KEYS): r[
+            "rows_per_sec"
+        ]
+        for r in results
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--database",
+        nargs="+",
+        choices=["sqlite", "postgresql"],
+        default=["sqlite"],
+    )
+    parser.add_argument(
+        "--postgres-url",
+        default=os.environ.get("BENCHMARK_POSTGRES_URL", DEFAULT_POSTGRES_URL),
+    )
+    parser.add_argument("--consumers-per-account", type=int, default=2)
+    parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=0.0,
+        help="Share of rows that repeat the previous row",
+    )
+    parser.add_argument(
+        "--existing-ratio",
+        type=float,
+        default=0.0,
+        help="Share of the file's accounts that exist before the import",
+    )
+    parser.add_argument(
+        "--consumer-pool",
+        type=int,
+        help="Number of distinct consumers (defaults to the number of rows)",
+    )
+    parser.add_argument("--commit-every", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-ssn-encryption",
+        dest="ssn_encryption",
+        action="store_false",
+        help="Store SSNs in plain text",
+    )
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Results file to compare with")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    baseline = _load_baseline(args.baseline) if args.baseline else {}
+    print(
+        f"{'database':>10} {'rows':>9} {'seconds':>9} {'rows/sec':>10} "
+        f"{'queries':>8} {'peak MB':>8}" + (f" {'vs base':>8}" if baseline else "")
+    )
+    results: List[Dict[str, Any]] = []
+    for database in args.database:
+        for rows in args.rows:
+            case = {
+                "database": database,
+                "postgres_url": args.postgres_url,
+                "rows": rows,
+                "consumers_per_account": args.consumers_per_account,
+                "duplicate_ratio": args.duplicate_ratio,
+                "existing_ratio": args.existing_ratio,
+                "consumer_pool": args.consumer_pool,
+                "commit_every": args.commit_every,
+                "seed": args.seed,
+                "ssn_encryption": args.ssn_encryption,
+            }
+            result = run_in_subprocess(case)
+            results.append(result)
+
+            line = (
+                f"{database:>10} {rows:>9} {result['seconds']:>9.2f} "
+                f"{result['rows_per_sec']:>10,.0f} {result['queries']:>8} "
+                f"{result['peak_rss_mb']:>8.1f}"
+            )
+            key = tuple(case[key] for key in CASE_KEYS)
+            if key in baseline:
+                line += f" {result['rows_per_sec'] / baseline[key]:>7.2f}x"
+            print(line)
+            sys.stdout.flush()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "benchmark": "import_throughput",
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "git_commit": _git_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
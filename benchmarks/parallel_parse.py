@@ -0,0 +1,54 @@
+"""
+Rows/sec of parsing and validating a CSV file with different worker counts.
+
+Usage:
+    python -m benchmarks.parallel_parse --rows 1000000 --workers 1 2 4 8 16
+
+Worker counts above the number of CPUs share cores, so they cannot be faster than
+one worker; they are marked with an asterisk.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+django.setup()
+
+from accounts.parallel import parse_csv_in_parallel  # noqa: E402
+from benchmarks.synthetic import write_synthetic_csv  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as csv_file:
+        write_synthetic_csv(csv_file, args.rows)
+    try:
+        cpus = os.cpu_count() or 1
+        print(f"{cpus} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            parse_csv_in_parallel(csv_file.name, workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(
+                f"{workers:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} "
+                f"{baseline / elapsed:>7.2f}x{' *' if workers > cpus else ''}"
+            )
+            sys.stdout.flush()
+    finally:
+        os.remove(csv_file.name)
+
+
+if __name__ == "__main__":
+    main()
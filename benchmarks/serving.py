@@ -0,0 +1,276 @@
+"""
+Requests/sec and latency of the account list and retrieve endpoints served over
+WSGI and over ASGI, under concurrent load.
+
+Usage:
+    python -m benchmarks.serving --accounts 20000 --workers 2 --concurrency 8 64
+
+Fills a fresh test database with synthetic accounts and starts gunicorn on it,
+one configuration at a time:
+- wsgi: collection_agency.wsgi with sync workers, serving /api/accounts/
+- asgi: collection_agency.asgi with uvicorn workers, serving /api/accounts/
+- asgi-async: the same server, serving the async views under /api/async/accounts/
+
+A local load generator then keeps ``--concurrency`` connections busy for
+``--duration`` seconds, fetching the list (with ``--query``) or random accounts,
+and reports requests/sec and median and 99th percentile latencies. The list
+cache is disabled so that every request queries the database. The load
+generator shares the machine with the servers, so compare configurations with
+each other rather than with production numbers.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.account_list import populate  # sets up Django
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from accounts.models import Account  # noqa: E402
+
+# Name: (application, gunicorn worker class, URL prefix of the endpoints)
+CONFIGURATIONS = {
+    "wsgi": ("collection_agency.wsgi", "sync", "/api/accounts/"),
+    "asgi": (
+        "collection_agency.asgi:application",
+        "uvicorn_worker.UvicornWorker",
+        "/api/accounts/",
+    ),
+    "asgi-async": (
+        "collection_agency.asgi:application",
+        "uvicorn_worker.UvicornWorker",
+        "/api/async/accounts/",
+    ),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    application: str, worker_class: str, workers: int, port: int, database: str, log
+) -> subprocess.Popen:
+    """
+    Start gunicorn and return once it accepts connections.
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="benchmarks.serving_settings",
+        BENCHMARK_DATABASE=database,
+        ACCOUNT_LIST_CACHE_TIMEOUT="0",
+    )
+    env.pop("DATABASE_URL", None)
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            application,
+            "--worker-class",
+            worker_class,
+            "--workers",
+            str(workers),
+            "--bind",
+            f"127.0.0.1:{port}",
+        ],
+        env=env,
+        stdout=log,
+        stderr=log,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            break
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    stop_server(server)
+    log.seek(0)
+    raise RuntimeError(f"gunicorn did not start:\n{log.read().decode()}")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def fetch(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str
+) -> Tuple[int, bool]:
+    """
+    Send a GET request on a connection and read the response.
+
+    Returns:
+        Tuple of (status code, whether the connection can be reused)
+    """
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+        "Accept: application/json\r\n\r\n".encode()
+    )
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+    status = int(head[0].split()[1])
+    headers: Dict[str, str] = {}
+    for line in head[1:]:
+        if line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get("connection", "").lower() != "close"
+
+
+async def run_load(
+    port: int, paths: List[str], concurrency: int, duration: float
+) -> Tuple[List[float], int]:
+    """
+    Fetch random paths from ``concurrency`` connections for ``duration`` seconds.
+
+    Returns:
+        Tuple of (latency of every successful request in seconds, number of
+        failed requests)
+    """
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client() -> None:
+        nonlocal errors
+        connection: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.open_connection("127.0.0.1", port)
+                status, keep_alive = await fetch(*connection, random.choice(paths))
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                status, keep_alive = None, False
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            if not keep_alive and connection is not None:
+                connection[1].close()
+                connection = None
+        if connection is not None:
+            connection[1].close()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=20_000)
+    parser.add_argument("--consumers-per-account", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument(
+        "--endpoint", nargs="+", choices=["list", "detail"], default=["list", "detail"]
+    )
+    parser.add_argument("--query", default="", help="Query string of the list requests")
+    parser.add_argument(
+        "--config",
+        nargs="+",
+        choices=list(CONFIGURATIONS),
+        default=list(CONFIGURATIONS),
+    )
+    args = parser.parse_args()
+
+    settings.DEBUG = False
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            directory, "benchmark.sqlite3"
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            populate(args.accounts, args.consumers_per_account)
+            account_ids = list(Account.objects.values_list("id", flat=True))
+            database = connection.settings_dict["NAME"]
+            # The servers open their own connections
+            connection.close()
+
+            print(
+                f"{'config':>10} {'endpoint':>8} {'conc':>5} {'requests':>9} "
+                f"{'req/sec':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"
+            )
+            for name in args.config:
+                application, worker_class, prefix = CONFIGURATIONS[name]
+                paths = {
+                    "list": [prefix + (f"?{args.query}" if args.query else "")],
+                    "detail": [f"{prefix}{pk}/" for pk in account_ids],
+                }
+                port = free_port()
+                with tempfile.TemporaryFile() as log:
+                    server = start_server(
+                        application, worker_class, args.workers, port, database, log
+                    )
+                    try:
+                        for endpoint in args.endpoint:
+                            # Warm up every worker
+                            asyncio.run(run_load(port, paths[endpoint], 4, 1))
+                            for concurrency in args.concurrency:
+                                latencies, errors = asyncio.run(
+                                    run_load(
+                                        port,
+                                        paths[endpoint],
+                                        concurrency,
+                                        args.duration,
+                                    )
+                                )
+                                if not latencies:
+                                    print(f"{name:>10} {endpoint:>8} no responses")
+                                    continue
+                                print(
+                                    f"{name:>10} {endpoint:>8} {concurrency:>5} "
+                                    f"{len(latencies):>9} "
+                                    f"{len(latencies) / args.duration:>9,.0f} "
+                                    f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+                                    f"{percentile(latencies, 0.99) * 1000:>8.1f} "
+                                    f"{errors:>7}"
+                                )
+                    finally:
+                        stop_server(server)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Settings of the servers started by benchmarks.serving: production-like (DEBUG off,
+no HTTPS redirect on the loopback interface) against the benchmark database.
+"""
+
+import os
+
+from collection_agency.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1"]
+DATABASES["default"]["NAME"] = os.environ["BENCHMARK_DATABASE"]  # noqa: F405
@@ -0,0 +1,96 @@
+"""
+Cost of encrypting consumer SSNs: per value, and on a full import.
+
+Usage:
+    python -m benchmarks.ssn_encryption --rows 100000 --database sqlite
+
+Times crypto.encrypt(), decrypt() and blind_index() on their own, then imports
+the same synthetic file with and without SSN encryption (see
+benchmarks.import_throughput) and prints the difference.
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+django.setup()
+
+from accounts import crypto  # noqa: E402
+from benchmarks.import_throughput import (  # noqa: E402
+    DEFAULT_POSTGRES_URL,
+    run_in_subprocess,
+)
+
+
+def time_per_call(func, values) -> float:
+    """Return microseconds per call of func over values."""
+    started = time.perf_counter()
+    for value in values:
+        func(value)
+    return (time.perf_counter() - started) / len(values) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000])
+    parser.add_argument(
+        "--database",
+        nargs="+",
+        choices=["sqlite", "postgresql"],
+        default=["sqlite"],
+    )
+    parser.add_argument(
+        "--postgres-url",
+        default=os.environ.get("BENCHMARK_POSTGRES_URL", DEFAULT_POSTGRES_URL),
+    )
+    parser.add_argument("--values", type=int, default=100_000)
+    args = parser.parse_args()
+
+    ssns = [
+        f"{n // 1_000_000 % 1000:03d}-{n // 10_000 % 100:02d}-{n % 10_000:04d}"
+        for n in range(args.values)
+    ]
+    tokens = [crypto.encrypt(ssn) for ssn in ssns]
+    print(f"{'operation':>12} {'us/value':>9}")
+    for name, func, values in (
+        ("encrypt", crypto.encrypt, ssns),
+        ("decrypt", crypto.decrypt, tokens),
+        ("blind_index", crypto.blind_index, ssns),
+    ):
+        print(f"{name:>12} {time_per_call(func, values):>9.2f}")
+
+    print()
+    print(
+        f"{'database':>10} {'rows':>9} {'plain r/s':>10} {'encrypted':>10} {'overhead':>9}"
+    )
+    for database in args.database:
+        for rows in args.rows:
+            results = {}
+            for ssn_encryption in (False, True):
+                results[ssn_encryption] = run_in_subprocess(
+                    {
+                        "database": database,
+                        "postgres_url": args.postgres_url,
+                        "rows": rows,
+                        "consumers_per_account": 2,
+                        "duplicate_ratio": 0.0,
+                        "existing_ratio": 0.0,
+                        "consumer_pool": None,
+                        "commit_every": None,
+                        "seed": 0,
+                        "ssn_encryption": ssn_encryption,
+                    }
+                )
+            plain, encrypted = results[False], results[True]
+            overhead = encrypted["seconds"] / plain["seconds"] - 1
+            print(
+                f"{database:>10} {rows:>9} {plain['rows_per_sec']:>10,.0f} "
+                f"{encrypted['rows_per_sec']:>10,.0f} {overhead:>8.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import csv
+import random
+from typing import List, Optional, TextIO
+
+HEADERS = [
+    "client reference no",
+    "balance",
+    "status",
+    "consumer name",
+    "consumer address",
+    "ssn",
+]
+STATUSES = ["IN_COLLECTION", "PAID_IN_FULL", "INACTIVE"]
+
+
+def write_synthetic_csv(
+    out: TextIO,
+    rows: int,
+    seed: int = 0,
+    consumers_per_account: int = 2,
+    duplicate_ratio: float = 0.0,
+    consumer_pool: Optional[int] = None,
+) -> None:
+    """
+    Write a deterministic CSV file in the client upload format.
+
+    Accounts are numbered in file order (see synthetic_references()) and each one
+    gets ``consumers_per_account`` consecutive rows. Consumers are drawn at random
+    from a pool, so the same consumer is linked to several accounts.
+
+    Args:
+        out: Text file to write to
+        rows: Number of data rows
+        seed: Seed for the random number generator
+        consumers_per_account: Number of rows (consumers) per account
+        duplicate_ratio: Share of rows that repeat the previous row, like a
+            record sent twice
+        consumer_pool: Number of distinct consumers to draw from (defaults to
+            ``rows``)
+    """
+    rng = random.Random(seed)
+    pool = consumer_pool or rows
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(HEADERS)
+    row = None
+    account_no = 0
+    account_rows = 0
+    for _ in range(rows):
+        if duplicate_ratio and row and rng.random() < duplicate_ratio:
+            writer.writerow(row)
+            continue
+        consumer_no = rng.randrange(pool)
+        row = [
+            f"REF{account_no:09d}",
+            f"{rng.randrange(1_000_000) / 100:.2f}",
+            rng.choice(STATUSES),
+            f"Consumer {consumer_no}",
+            f"{consumer_no} Main St",
+            f"{consumer_no // 1_000_000:03d}-{consumer_no // 10_000 % 100:02d}-"
+            f"{consumer_no % 10_000:04d}",
+        ]
+        writer.writerow(row)
+        account_rows += 1
+        if account_rows == consumers_per_account:
+            account_no += 1
+            account_rows = 0
+
+
+def synthetic_references(
+    rows: int, consumers_per_account: int = 2, share: float = 1.0
+) -> List[str]:
+    """
+    Return account references of a synthetic file, spread evenly over the file.
+
+    Used to create accounts that already exist before the file is imported.
+
+    Args:
+        rows: Number of data rows of the file
+        consumers_per_account: As passed to write_synthetic_csv()
+        share: Share of the file's accounts to return
+
+    Returns:
+        Account references
+    """
+    accounts = -(-rows // consumers_per_account)
+    return [
+        f"REF{account_no:09d}"
+        for account_no in range(accounts)
+        if int((account_no + 1) * share) > int(account_no * share)
+    ]
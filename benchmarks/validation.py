@@ -0,0 +1,66 @@
+"""
+Rows/sec of validating a CSV file row by row and in column blocks.
+
+Usage:
+    python -m benchmarks.validation --rows 1000000
+"""
+
+import argparse
+import csv
+import io
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "collection_agency.settings")
+django.setup()
+
+from accounts.services import CSVImportService, ImportRow  # noqa: E402
+from accounts.validation import ColumnBlockValidator  # noqa: E402
+from benchmarks.synthetic import write_synthetic_csv  # noqa: E402
+
+
+def validate_by_row(rows, headers):
+    for row_num, row in enumerate(rows, start=2):
+        row_data = dict(zip(headers, row))
+        CSVImportService.validate_row_data(row_data, row_num)
+        ImportRow.from_csv_row(row_data)
+
+
+def validate_by_block(rows, headers):
+    validator = ColumnBlockValidator(headers)
+    size = CSVImportService.BLOCK_SIZE
+    for start in range(0, len(rows), size):
+        records, _ = validator.validate(rows[start : start + size], start + 2)
+        list(map(ImportRow._make, records))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    buffer = io.StringIO()
+    write_synthetic_csv(buffer, args.rows)
+    buffer.seek(0)
+    reader = csv.reader(buffer)
+    headers = next(reader)
+    # Parsing is the same for both, so only validation is timed
+    rows = list(reader)
+
+    print(f"{'mode':>8} {'seconds':>9} {'rows/sec':>12} {'speedup':>8}")
+    baseline = None
+    for mode, validate in (("row", validate_by_row), ("block", validate_by_block)):
+        started = time.perf_counter()
+        validate(rows, headers)
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(
+            f"{mode:>8} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} "
+            f"{baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
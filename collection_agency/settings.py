@@ -86,13 +86,25 @@ if os.environ.get("DATABASE_URL"):
     # Production database settings
     import dj_database_url
 
-    DATABASES = {"default": dj_database_url.config(conn_max_age=600)}
+    # Seconds to keep connections open between requests. Django advises against
+    # persistent connections under ASGI, so set it to 0 when serving over ASGI
+    DATABASES = {
+        "default": dj_database_url.config(
+            conn_max_age=int(os.environ.get("DATABASE_CONN_MAX_AGE", "600"))
+        )
+    }
 else:
     # Development database settings
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # Seconds a connection waits for another one's write lock. Imports
+            # and rollup rebuilds take the lock up front (accounts.locks.write_transaction)
+            "OPTIONS": {"timeout": 20},
+            # A file rather than shared-cache memory, so that the concurrent
+            # import tests see real SQLite locking
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
         }
     }
 
@@ -150,6 +162,70 @@ REST_FRAMEWORK = {
     "DEFAULT_CURSOR_QUERY_PARAM": "cursor",
 }
 
+# Uploads are hashed as they are received so repeated CSV uploads can be recognized
+FILE_UPLOAD_HANDLERS = [
+    "accounts.uploads.HashingMemoryFileUploadHandler",
+    "accounts.uploads.HashingTemporaryFileUploadHandler",
+]
+
+# Caches
+# Local memory by default; point CACHE_BACKEND and CACHE_LOCATION at a shared
+# cache (e.g. django.core.cache.backends.redis.RedisCache) to share cached
+# responses between processes
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+# Responses of GET /api/accounts/ are cached in this cache for this many seconds
+# (0 disables the cache); writes invalidate them right away
+ACCOUNT_LIST_CACHE = os.environ.get("ACCOUNT_LIST_CACHE", "default")
+ACCOUNT_LIST_CACHE_TIMEOUT = int(os.environ.get("ACCOUNT_LIST_CACHE_TIMEOUT", "300"))
+
+# Serialize account lists from .values() rows instead of model instances; the
+# output is identical to AccountSerializer's
+ACCOUNT_LIST_FAST_SERIALIZER = (
+    os.environ.get("ACCOUNT_LIST_FAST_SERIALIZER", "True").lower() == "true"
+)
+# Lists return a count with ?count=exact or ?count=estimate. Exact counts that
+# take longer than LIST_COUNT_TIMEOUT seconds are replaced with an estimate, and
+# estimates that are not from the PostgreSQL planner are cached for
+# LIST_COUNT_CACHE_TIMEOUT seconds
+LIST_COUNT_TIMEOUT = float(os.environ.get("LIST_COUNT_TIMEOUT", "1"))
+LIST_COUNT_CACHE_TIMEOUT = int(os.environ.get("LIST_COUNT_CACHE_TIMEOUT", "300"))
+# GET /api/accounts/export/ reads and serializes this many accounts at a time
+ACCOUNT_EXPORT_CHUNK_SIZE = int(os.environ.get("ACCOUNT_EXPORT_CHUNK_SIZE", "2000"))
+
+# Background CSV imports
+# Uploads are spooled here and imported by a thread pool inside the web process
+IMPORT_SPOOL_DIR = os.environ.get(
+    "IMPORT_SPOOL_DIR", os.path.join(BASE_DIR, "import_spool")
+)
+IMPORT_JOB_WORKERS = int(os.environ.get("IMPORT_JOB_WORKERS", "2"))
+# Background imports commit every N rows so progress is visible while they run
+IMPORT_JOB_COMMIT_EVERY = int(os.environ.get("IMPORT_JOB_COMMIT_EVERY", "50000"))
+# A job that has not reported progress for IMPORT_JOB_STALE_AFTER seconds is
+# assumed lost with the process that ran it (see the recover_import_jobs command)
+IMPORT_JOB_STALE_AFTER = float(os.environ.get("IMPORT_JOB_STALE_AFTER", "3600"))
+
+# Imports of the same client run one at a time; another import waits up to
+# IMPORT_LOCK_TIMEOUT seconds for the lock. On databases without advisory locks
+# (SQLite) a lock older than IMPORT_LOCK_MAX_AGE seconds is assumed to belong to
+# a crashed import and is taken over
+IMPORT_LOCK_TIMEOUT = float(os.environ.get("IMPORT_LOCK_TIMEOUT", "600"))
+IMPORT_LOCK_MAX_AGE = float(os.environ.get("IMPORT_LOCK_MAX_AGE", "21600"))
+
+# Consumer SSN encryption
+# PII_ENCRYPTION_KEY is 32 URL-safe base64 encoded bytes for AES-GCM, and
+# PII_BLIND_INDEX_KEY any secret string. Both are derived from SECRET_KEY when
+# unset; set them in production so that rotating SECRET_KEY does not make stored
+# SSNs unreadable
+PII_ENCRYPTION_KEY = os.environ.get("PII_ENCRYPTION_KEY", "")
+PII_BLIND_INDEX_KEY = os.environ.get("PII_BLIND_INDEX_KEY", "")
+
 # Test runner
 TEST_RUNNER = "accounts.test_runner.NoWarningsTestRunner"
 